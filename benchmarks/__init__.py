@@ -0,0 +1,4 @@
+"""
+Benchmarks for LSMD Dashboard
+Latency, subprocess and allocation measurements for collectors and routes
+"""
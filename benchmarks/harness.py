@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for collectors, modules and endpoints
+"""
+
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+from web_modules.perf import Histogram
+
+@contextmanager
+def count_subprocesses():
+    """Count every subprocess.Popen started inside the block"""
+    counter = {'count': 0}
+    original_init = subprocess.Popen.__init__
+
+    def counting_init(self, *args, **kwargs):
+        counter['count'] += 1
+        original_init(self, *args, **kwargs)
+
+    subprocess.Popen.__init__ = counting_init
+    try:
+        yield counter
+    finally:
+        subprocess.Popen.__init__ = original_init
+
+class Benchmark:
+    """A named callable measured over a number of iterations"""
+
+    def __init__(self, name, func, iterations=20, warmup=1):
+        self.name = name
+        self.func = func
+        self.iterations = iterations
+        self.warmup = warmup
+
+    def run(self, iterations=None):
+        """Run the benchmark and return its result dict"""
+        iterations = iterations or self.iterations
+        for _ in range(self.warmup):
+            self.func()
+
+        histogram = Histogram()
+        errors = 0
+        with count_subprocesses() as spawned:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                result = self.func()
+                histogram.record(time.perf_counter() - start)
+                if isinstance(result, dict) and 'error' in result:
+                    errors += 1
+
+        # Allocations are measured in a separate pass: tracemalloc slows calls down
+        tracemalloc.start()
+        try:
+            allocated = 0
+            peak = 0
+            for _ in range(min(iterations, 5)):
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+                self.func()
+                current, call_peak = tracemalloc.get_traced_memory()
+                allocated += max(current - before, 0)
+                peak = max(peak, call_peak - before)
+            allocation_runs = min(iterations, 5)
+        finally:
+            tracemalloc.stop()
+
+        summary = histogram.summary()
+        summary.update({
+            'iterations': iterations,
+            'errors': errors,
+            'subprocesses_per_call': round(spawned['count'] / iterations, 2),
+            'retained_bytes_per_call': allocated // allocation_runs,
+            'peak_bytes_per_call': peak
+        })
+        return summary
+
+def run_benchmarks(benchmarks, iterations=None, name_filter=None, log=print):
+    """Run benchmarks whose name contains name_filter and return a report"""
+    results = {}
+    for benchmark in benchmarks:
+        if name_filter and name_filter not in benchmark.name:
+            continue
+        try:
+            results[benchmark.name] = benchmark.run(iterations)
+        except Exception as e:
+            results[benchmark.name] = {'error': str(e)}
+        if log:
+            log(format_result(benchmark.name, results[benchmark.name]))
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'hostname': platform.node(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count()
+        },
+        'results': results
+    }
+
+def format_result(name, result):
+    if 'error' in result:
+        return f"{name:<45} ERROR {result['error']}"
+    return (f"{name:<45} p50 {result['p50_ms']:>9.3f} ms  p95 {result['p95_ms']:>9.3f} ms  "
+            f"p99 {result['p99_ms']:>9.3f} ms  subproc {result['subprocesses_per_call']:>5}  "
+            f"peak {result['peak_bytes_per_call'] / 1024:>9.1f} KB")
+
+def save_baseline(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+def compare(report, baseline, threshold=0.25, min_delta_ms=1.0):
+    """Return a list of regressions of report against baseline"""
+    regressions = []
+    for name, current in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or 'error' in current or 'error' in previous:
+            continue
+
+        # Latency: relative growth above threshold and above the noise floor
+        for key in ('p50_ms', 'p95_ms'):
+            delta = current[key] - previous[key]
+            if delta > min_delta_ms and current[key] > previous[key] * (1 + threshold):
+                regressions.append({
+                    'benchmark': name, 'metric': key,
+                    'baseline': previous[key], 'current': current[key]
+                })
+
+        if current['subprocesses_per_call'] > previous['subprocesses_per_call']:
+            regressions.append({
+                'benchmark': name, 'metric': 'subprocesses_per_call',
+                'baseline': previous['subprocesses_per_call'],
+                'current': current['subprocesses_per_call']
+            })
+
+        if current['peak_bytes_per_call'] > max(previous['peak_bytes_per_call'] * (1 + threshold),
+                                                previous['peak_bytes_per_call'] + 64 * 1024):
+            regressions.append({
+                'benchmark': name, 'metric': 'peak_bytes_per_call',
+                'baseline': previous['peak_bytes_per_call'],
+                'current': current['peak_bytes_per_call']
+            })
+    return regressions
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Flight recorder storage benchmark
+
+Feeds the recorder a simulated host for a stretch of ticks and
+extrapolates bytes per day. Each tick carries what the live recorder
+sees: process churn with busy and idle processes, sampler metrics,
+RateEngine rates (per disk, per NIC, total and per-core CPU), a cgroup
+section in CgroupCollector's format, and a SnapshotStore holding the
+system-info, disk-info, system-health, users and alert payloads:
+
+    python3 -m benchmarks.recorder_storage --processes 2000 --interval 5 --hours 1
+
+--dashboard adds the payloads an open dashboard keeps fresh (large
+files, backups, current user) and refreshes everything at the
+dashboard's intervals instead of the recorder's once a minute; the
+recorder still reads all but the alerts once per slow_interval.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.synthetic_host import PROCESS_MIX
+from web_modules.recorder import FlightRecorder, Recording
+from web_modules.snapshots import SnapshotStore
+
+TARGET_BYTES_PER_DAY = 50 * 1024 * 1024
+
+# Seconds between refreshes of each snapshot: the recorder's refreshers
+# re-run their payloads once a minute when nothing else asks for them
+RECORDER_REFRESH = {
+    'system-info': 60,
+    'disk-info': 60,
+    'system-health': 60,
+    'users': 60,
+    'alerts-active': 60,
+}
+
+# ... and the dashboard's sections poll faster and publish a few more
+DASHBOARD_REFRESH = {
+    'system-info': 3,
+    'system-health': 5,
+    'disk-info': 10,
+    'large-files': 300,
+    'backups': 30,
+    'users': 60,
+    'users-current': 300,
+    'alerts-active': 5,
+}
+
+MOUNTS = ['/', '/boot', '/home', '/var', '/srv/data']
+CGROUP_PARENTS = ['system.slice', 'user.slice', 'kubepods.slice']
+
+def _gb(value):
+    return round(value / 1024 ** 3, 2)
+
+def _human(value):
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if value < 1024.0:
+            return f"{value:.2f} {unit}"
+        value /= 1024.0
+    return f"{value:.2f} TB"
+
+class SimulatedSampler:
+    """Stands in for Sampler: metrics, rates and processes that drift each tick"""
+
+    def __init__(self, processes, cores=8, disks=4, nics=3, cgroups=200, users=200,
+                 busy_share=0.05, seed=42):
+        self.rng = random.Random(seed)
+        self.cores = cores
+        self.disks = ['nvme0n1'] + [f'sd{chr(97 + i)}' for i in range(disks - 1)]
+        self.nics = ['lo', 'eth0'] + [f'veth{i}' for i in range(nics - 2)]
+        self.busy_share = busy_share
+        self.next_pid = 300
+        self.table = {}
+        for _ in range(processes):
+            self._spawn()
+        self.mount_used = {mount: self.rng.uniform(0.2, 0.8) for mount in MOUNTS}
+        self.net_totals = {nic: [self.rng.randrange(1 << 40), self.rng.randrange(1 << 40)] for nic in self.nics}
+        self.cgroup_paths = list(CGROUP_PARENTS) + [
+            f"{self.rng.choice(CGROUP_PARENTS)}/unit{index:04d}.service" for index in range(cgroups)]
+        # Resident memory and task count per cgroup
+        self.cgroup_sizes = {path: (self.rng.randrange(16, 528) << 20, self.rng.randrange(1, 41))
+                             for path in self.cgroup_paths}
+        self.cgroup_busy = set(self.rng.sample(self.cgroup_paths, max(1, len(self.cgroup_paths) // 10)))
+        self.users = [{
+            'username': f'user{uid:06d}', 'uid': uid, 'gid': uid, 'home': f'/home/user{uid:06d}',
+            'shell': '/bin/bash', 'gecos': f'User {uid}'
+        } for uid in range(1000, 1000 + users)]
+        self.alerts = {}
+        self.metrics = {}
+        self.rates = None
+        self.processes = []
+        self.now = time.time()
+
+    def _spawn(self):
+        name, _, rss_mb = self.rng.choices(PROCESS_MIX, [share for _, share, _ in PROCESS_MIX])[0]
+        pid = self.next_pid
+        self.next_pid += 1
+        self.table[pid] = {
+            'pid': pid, 'ppid': self.rng.choice([1, 2, 300]), 'name': name, 'state': 'S',
+            'uid': self.rng.randrange(1000, 1100), 'user': f'user{self.rng.randrange(100):03d}',
+            'start_ticks': pid * 7, 'rss_bytes': int(rss_mb * 1024 * 1024 * self.rng.uniform(0.5, 1.5)),
+            'cpu': 0.0, 'memory': 0.1, 'status': 'sleeping',
+            'io_read': 0.0, 'io_write': 0.0, 'sockets': self.rng.randrange(3), 'io_age': 0.0
+        }
+
+    def _cpu_breakdown(self, busy):
+        rng = self.rng
+        iowait = round(rng.uniform(0, 2), 1)
+        system = round(busy * rng.uniform(0.1, 0.3), 1)
+        idle = round(100.0 - busy - iowait, 1)
+        return {'user': round(busy - system, 1), 'system': system, 'iowait': iowait,
+                'steal': round(rng.uniform(0, 0.3), 1), 'idle': idle, 'busy': round(busy, 1)}
+
+    def _rates(self, interval):
+        rng = self.rng
+        disks = {}
+        for device in self.disks:
+            reads, writes = rng.expovariate(1 / 20), rng.expovariate(1 / 40)
+            disks[device] = {
+                'read_iops': round(reads, 2),
+                'write_iops': round(writes, 2),
+                'read_bytes_per_sec': round(reads * rng.choice([4096, 16384, 131072]), 1),
+                'write_bytes_per_sec': round(writes * rng.choice([4096, 16384, 131072]), 1),
+                'await_ms': round(rng.uniform(0.1, 5), 2) if reads + writes else 0.0,
+                'util_percent': round(min((reads + writes) / 5, 100.0), 1)
+            }
+        network = {}
+        for nic in self.nics:
+            recv, sent = rng.expovariate(1 / 200000), rng.expovariate(1 / 100000)
+            self.net_totals[nic][0] += int(recv * interval)
+            self.net_totals[nic][1] += int(sent * interval)
+            network[nic] = {
+                'bytes_recv_per_sec': round(recv, 1),
+                'bytes_sent_per_sec': round(sent, 1),
+                'packets_recv_per_sec': round(recv / 800, 2),
+                'packets_sent_per_sec': round(sent / 600, 2),
+                'errors_per_sec': 0.0,
+                'drops_per_sec': round(rng.choice([0.0] * 19 + [0.2]), 2)
+            }
+        per_core = []
+        for core in range(self.cores):
+            breakdown = self._cpu_breakdown(rng.uniform(2, 60))
+            breakdown['core'] = core
+            per_core.append(breakdown)
+        total = self._cpu_breakdown(sum(core['busy'] for core in per_core) / self.cores)
+        return {
+            'timestamp': self.now,
+            'disks': disks,
+            'network': network,
+            'cpu': {'total': total, 'per_core': per_core}
+        }
+
+    def tick(self, now, interval):
+        rng = self.rng
+        self.now = now
+        # A few processes exit and start every tick
+        for pid in rng.sample(list(self.table), 2):
+            del self.table[pid]
+        for _ in range(2):
+            self._spawn()
+        for proc in self.table.values():
+            if rng.random() < self.busy_share:
+                proc['cpu'] = round(rng.uniform(0.1, 60), 1)
+                proc['rss_bytes'] += rng.randrange(-16, 17) * 4096
+                proc['memory'] = round(proc['rss_bytes'] * 100 / (64 << 30), 1)
+                proc['io_read'] = round(rng.expovariate(1 / 50000), 1)
+                proc['io_write'] = round(rng.expovariate(1 / 20000), 1)
+                proc['state'], proc['status'] = ('R', 'running')
+            elif proc['cpu']:
+                proc['cpu'] = 0.0
+                proc['io_read'] = proc['io_write'] = 0.0
+                proc['state'], proc['status'] = ('S', 'sleeping')
+        self.processes = [dict(proc) for proc in self.table.values()]
+        self.rates = self._rates(interval)
+        for mount in MOUNTS:
+            self.mount_used[mount] = min(0.99, self.mount_used[mount] + rng.uniform(-1e-5, 2e-5))
+
+        # The keys Sampler.collect() fills in
+        cpu = self.rates['cpu']['total']
+        self.metrics = {
+            'cpu.percent': cpu['busy'],
+            'memory.percent': round(rng.uniform(50, 52), 1),
+            'memory.available_bytes': rng.randrange(30 << 30, 31 << 30),
+            'swap.percent': 1.2, 'swap.in_bytes': 1 << 20, 'swap.out_bytes': 2 << 20,
+            'load.1': round(rng.uniform(0.5, 4), 2), 'load.5': round(rng.uniform(1, 3), 2),
+        }
+        for mount, used in self.mount_used.items():
+            self.metrics[f'disk.{mount}.percent'] = round(used * 100, 1)
+            self.metrics[f'disk.{mount}.free_percent'] = round(100.0 - used * 100, 1)
+        for nic, (recv, sent) in self.net_totals.items():
+            self.metrics[f'net.{nic}.bytes_recv'] = recv
+            self.metrics[f'net.{nic}.bytes_sent'] = sent
+        self.metrics['cpu.iowait_percent'] = cpu['iowait']
+        self.metrics['cpu.steal_percent'] = cpu['steal']
+        for device, disk in self.rates['disks'].items():
+            self.metrics[f'diskio.{device}.util_percent'] = disk['util_percent']
+            self.metrics[f'diskio.{device}.await_ms'] = disk['await_ms']
+        for proc in sorted(self.processes, key=lambda p: p['rss_bytes'], reverse=True)[:10]:
+            self.metrics[f"proc.{proc['pid']}:{proc['name']}.rss_bytes"] = proc['rss_bytes']
+
+        # Now and then a rule starts or stops firing
+        if rng.random() < 0.01:
+            series = f"diskio.{rng.choice(self.disks)}.util_percent"
+            if series in self.alerts:
+                del self.alerts[series]
+            else:
+                self.alerts[series] = datetime.fromtimestamp(now).isoformat()
+
+    # Payloads in the shape of the SystemManager methods that publish them
+
+    def _usage(self, mount, total):
+        used = int(total * self.mount_used[mount])
+        return {'total': total, 'used': used, 'free': total - used, 'percent': round(self.mount_used[mount] * 100, 1)}
+
+    def system_info(self):
+        memory_total = 64 << 30
+        memory_used = memory_total - self.metrics['memory.available_bytes']
+        memory = {'total': memory_total, 'used': memory_used, 'free': memory_total - memory_used,
+                  'percent': self.metrics['memory.percent']}
+        disk = self._usage('/', 500 << 30)
+        cpu = self.rates['cpu']['total']['busy']
+        return {
+            'cpu_usage': cpu, 'cpu_cores': self.cores, 'memory': memory, 'disk': disk,
+            'uptime': f"{int(self.now // 86400) % 100} days, 3:14:15",
+            'load_avg': [self.metrics['load.1'], self.metrics['load.5'], 1.5],
+            'hostname': 'bench-host', 'users': 3,
+            'timestamp': datetime.fromtimestamp(self.now).strftime('%Y-%m-%d %H:%M:%S'),
+            'memory_total_gb': _gb(memory_total), 'memory_used_gb': _gb(memory_used),
+            'memory_percent': memory['percent'],
+            'disk_total_gb': _gb(disk['total']), 'disk_used_gb': _gb(disk['used']), 'disk_usage': disk['percent'],
+            'cpu_percent': cpu
+        }
+
+    def disk_info(self):
+        disks = []
+        for index, mount in enumerate(MOUNTS):
+            usage = self._usage(mount, (index + 1) * 200 << 30)
+            disks.append({
+                'filesystem': f'/dev/{self.disks[index % len(self.disks)]}p{index + 1}',
+                'size': _human(usage['total']), 'used': _human(usage['used']),
+                'available': _human(usage['free']), 'use_percent': f"{usage['percent']}%", 'mounted': mount
+            })
+        return disks
+
+    def system_health(self):
+        rates = self.rates
+        memory = self.system_info()['memory']
+        disk = self._usage('/', 500 << 30)
+        return {
+            'cpu': {
+                'percent': rates['cpu']['total']['busy'], 'cores': self.cores,
+                'breakdown': rates['cpu']['total'], 'per_core': rates['cpu']['per_core'],
+                'frequency': {'current': round(self.rng.uniform(2000, 3500), 3), 'max': 3500.0}
+            },
+            'memory': {
+                'total': _gb(memory['total']), 'used': _gb(memory['used']), 'free': _gb(memory['free']),
+                'percent': memory['percent'], 'swap_total': 8.0, 'swap_used': 0.1,
+                'swap_percent': self.metrics['swap.percent']
+            },
+            'disk': {
+                'total': _gb(disk['total']), 'used': _gb(disk['used']), 'free': _gb(disk['free']),
+                'percent': disk['percent'],
+                'read_bytes': int(self.now * 1000), 'write_bytes': int(self.now * 3000),
+                'read_bytes_per_sec': sum(d['read_bytes_per_sec'] for d in rates['disks'].values()),
+                'write_bytes_per_sec': sum(d['write_bytes_per_sec'] for d in rates['disks'].values()),
+                'devices': rates['disks']
+            },
+            'network': {
+                'bytes_sent': sum(sent for _, sent in self.net_totals.values()),
+                'bytes_recv': sum(recv for recv, _ in self.net_totals.values()),
+                'bytes_sent_per_sec': sum(n['bytes_sent_per_sec'] for n in rates['network'].values()),
+                'bytes_recv_per_sec': sum(n['bytes_recv_per_sec'] for n in rates['network'].values()),
+                'interfaces': rates['network']
+            },
+            'system': {
+                'uptime': self.system_info()['uptime'], 'boot_time': '2026-01-01T00:00:00',
+                'load_avg': [self.metrics['load.1'], self.metrics['load.5'], 1.5]
+            },
+            'timestamp': datetime.fromtimestamp(self.now).isoformat()
+        }
+
+    def get_users(self):
+        return self.users
+
+    def active_alerts(self):
+        return {'active': [{
+            'rule': f'{series} > 90 for 60s', 'series': series, 'state': 'firing',
+            'value': round(self.rng.uniform(90, 100), 3), 'threshold': 90.0,
+            'started': started, 'resolved': None, 'message': f'{series} is high ({series} > 90 for 60s)'
+        } for series, started in self.alerts.items()]}
+
+    def large_files(self):
+        return [{'size': f'{100 + index * 37}M', 'file': f'/home/user001000/data/archive{index}.bin'}
+                for index in range(10)]
+
+    def backups(self):
+        return [{'name': f'/var/backups/lsmd/backup_2026010{index}_0300.tar.gz', 'size': str(1 << 30),
+                 'date': f'Jan {index} 03:00'} for index in range(1, 8)]
+
+    def current_user(self):
+        return {'username': 'lsmd', 'uid': 999, 'gid': 999, 'home': '/var/lib/lsmd', 'shell': '/usr/sbin/nologin'}
+
+    def cgroups(self):
+        """A CgroupCollector.latest() result"""
+        rng = self.rng
+        cgroups = {}
+        for path in self.cgroup_paths:
+            busy = path in self.cgroup_busy
+            # Idle services still wake up now and then
+            cpu = round(rng.uniform(1, 80), 1) if busy else (0.1 if rng.random() < 0.1 else 0.0)
+            io_read = round(rng.expovariate(1 / 100000), 1) if busy else 0.0
+            io_write = round(rng.expovariate(1 / 50000), 1) if busy else 0.0
+            memory, pids = self.cgroup_sizes[path]
+            cgroups[path] = {
+                'path': '/' + path, 'name': path.rsplit('/', 1)[-1],
+                'cpu': cpu, 'cpu_user': round(cpu * 0.8, 1), 'cpu_system': round(cpu * 0.2, 1), 'throttled': 0.0,
+                'memory': memory, 'memory_max': None,
+                'io_read': io_read, 'io_write': io_write, 'io': round(io_read + io_write, 1),
+                'iops': round((io_read + io_write) / 4096, 2), 'pids': pids
+            }
+        return {'timestamp': self.now, 'root': '/sys/fs/cgroup', 'count': len(cgroups),
+                'truncated': False, 'cgroups': cgroups}
+
+def payloads(sampler, dashboard):
+    """Snapshot name -> provider, as published by the recorder's refreshers or the dashboard"""
+    providers = {
+        'system-info': sampler.system_info,
+        'disk-info': sampler.disk_info,
+        'system-health': sampler.system_health,
+        'users': sampler.get_users,
+        'alerts-active': sampler.active_alerts,
+    }
+    if dashboard:
+        providers.update({
+            'large-files': sampler.large_files,
+            'backups': sampler.backups,
+            'users-current': sampler.current_user,
+        })
+    return providers
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure flight recorder bytes per day')
+    parser.add_argument('--processes', type=int, default=2000)
+    parser.add_argument('--cgroups', type=int, default=200)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--interval', type=float, default=5.0, help='sampler interval, seconds')
+    parser.add_argument('--hours', type=float, default=1.0, help='recorded span to simulate')
+    parser.add_argument('--busy-share', type=float, default=0.05,
+                        help='share of processes whose usage changes each tick')
+    parser.add_argument('--dashboard', action='store_true',
+                        help='refresh payloads at the dashboard\'s intervals, as with the page open')
+    args = parser.parse_args(argv)
+
+    sampler = SimulatedSampler(args.processes, cgroups=args.cgroups, users=args.users,
+                               busy_share=args.busy_share)
+    providers = payloads(sampler, args.dashboard)
+    periods = DASHBOARD_REFRESH if args.dashboard else RECORDER_REFRESH
+    store = SnapshotStore()
+    directory = tempfile.mkdtemp(prefix='lsmd-recorder-')
+    path = os.path.join(directory, 'flight.rec')
+    # Snapshot ages run on the wall clock, so the refreshers' schedule is
+    # replayed below on the simulated one instead of handing them over
+    recorder = FlightRecorder(path, store, max_bytes=1 << 40, sections={'cgroups': sampler.cgroups})
+
+    ticks = int(args.hours * 3600 / args.interval)
+    now = time.time()
+    refreshed = {}
+    encode_seconds = 0.0
+    for i in range(ticks):
+        sampler.tick(now, args.interval)
+        for name, provider in providers.items():
+            if now - refreshed.get(name, 0) >= periods[name]:
+                store.publish(name, provider())
+                refreshed[name] = now
+        start = time.perf_counter()
+        recorder.write(recorder.capture(sampler, now), now)
+        encode_seconds += time.perf_counter() - start
+        now += args.interval
+
+    size = os.path.getsize(path)
+    per_day = size * 86400 / (ticks * args.interval)
+    recording = Recording(path)
+    start = time.perf_counter()
+    state = recording.state_at(now - args.interval * ticks / 2)
+    seek_ms = (time.perf_counter() - start) * 1000
+
+    print(f"processes:        {args.processes}")
+    print(f"cgroups:          {len(sampler.cgroup_paths)}")
+    print(f"snapshots:        {', '.join(sorted(state['snapshots']))}")
+    print(f"refreshed by:     {'dashboard' if args.dashboard else 'recorder'}")
+    print(f"ticks:            {ticks} every {args.interval:g} s ({args.hours:g} h)")
+    print(f"recorded:         {size / 1024 / 1024:.2f} MB")
+    print(f"per day:          {per_day / 1024 / 1024:.1f} MB "
+          f"({'within' if per_day <= TARGET_BYTES_PER_DAY else 'over'} the 50 MB target)")
+    print(f"encode per tick:  {encode_seconds / ticks * 1000:.2f} ms")
+    print(f"random seek:      {seek_ms:.1f} ms")
+    return 0 if per_day <= TARGET_BYTES_PER_DAY else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+LSMD Benchmark Runner
+
+Usage (from the project root):
+    python3 -m benchmarks.run                      # run everything
+    python3 -m benchmarks.run --filter route.      # only Flask routes
+    python3 -m benchmarks.run --save benchmarks/baseline.json
+    python3 -m benchmarks.run --compare benchmarks/baseline.json
+    python3 -m benchmarks.run --host-root /tmp/lsmd-host   # synthetic host only
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import tempfile
+
+from benchmarks.harness import Benchmark, run_benchmarks, save_baseline, load_baseline, compare
+
+# Anything that blocks on a 1 s CPU sample gets few iterations
+SLOW = 3
+FAST = 20
+
+def uncached(method):
+    """A @cached method's body, so every iteration does the work instead of hitting the cache"""
+    return functools.partial(method.__wrapped__, method.__self__)
+
+def shell_manager_benchmarks():
+    from web_app.app import system_manager as manager
+
+    def shell(module, action, convert=None):
+        # The script itself, not whichever backend the router would pick
+        def call():
+            result = manager.run_module(module, action, gated=False)
+            return convert(result) if convert else result
+        return call
+
+    def routed(operation):
+        return lambda: manager.router.call(operation)
+
+    return [
+        # Shell script path vs psutil fallback for each read operation
+        Benchmark('shell.get_system_info', shell('system', 'info', manager._convert_system_info), SLOW),
+        Benchmark('fallback.get_system_info', manager._get_system_info_fallback, SLOW),
+        Benchmark('shell.get_process_list', shell('processes', 'list'), FAST),
+        Benchmark('fallback.get_process_list', manager._get_process_list_fallback, FAST),
+        Benchmark('shell.get_disk_info', shell('disk', 'usage'), FAST),
+        Benchmark('fallback.get_disk_info', manager._get_disk_info_fallback, FAST),
+        Benchmark('shell.get_large_files', lambda: manager.run_module('disk', 'large_files'), SLOW),
+        Benchmark('fallback.get_large_files', manager._get_large_files_fallback, SLOW),
+        Benchmark('shell.get_users', shell('users', 'list'), FAST),
+        Benchmark('fallback.get_users', manager._get_users_fallback, FAST),
+        Benchmark('shell.list_backups', uncached(manager.list_backups), FAST),
+        Benchmark('shell.get_system_health', manager.get_system_health, SLOW),
+        # What the dashboard gets: the router's pick, falling through on failure
+        Benchmark('router.system-info', routed('system-info'), SLOW),
+        Benchmark('router.processes', routed('processes'), FAST),
+        Benchmark('router.disk-info', routed('disk-info'), FAST),
+        Benchmark('router.users', routed('users'), FAST),
+    ]
+
+def web_module_benchmarks():
+    from web_modules.system_monitor import SystemMonitor
+    from web_modules.disk_monitor import DiskMonitor
+    from web_modules.process_manager import ProcessManager
+    from web_modules.user_manager import UserManager
+    from web_modules.backup_manager import BackupManager
+
+    system = SystemMonitor()
+    disk = DiskMonitor()
+    processes = ProcessManager()
+    users = UserManager()
+
+    # Back up a small scratch tree into a scratch directory, never the real home
+    scratch = tempfile.mkdtemp(prefix='lsmd-bench-')
+    backups = BackupManager(backup_dir=f"{scratch}/backups")
+    source = f"{scratch}/source"
+    os.makedirs(source, exist_ok=True)
+    for i in range(50):
+        with open(f"{source}/file_{i}.txt", 'w') as f:
+            f.write('x' * 4096)
+
+    return [
+        Benchmark('SystemMonitor.get_system_overview', system.get_system_overview, SLOW),
+        Benchmark('SystemMonitor.get_detailed_cpu_info', system.get_detailed_cpu_info, SLOW),
+        Benchmark('DiskMonitor.get_disk_usage', disk.get_disk_usage, FAST),
+        Benchmark('DiskMonitor.get_large_files', lambda: disk.get_large_files(source), FAST),
+        Benchmark('ProcessManager.get_all_processes', processes.get_all_processes, FAST),
+        Benchmark('ProcessManager.search_processes', lambda: processes.search_processes('python'), FAST),
+        Benchmark('UserManager.list_users', users.list_users, FAST),
+        Benchmark('UserManager.get_user_groups', lambda: users.get_user_groups('root'), FAST),
+        Benchmark('BackupManager.create_full_backup', lambda: backups.create_full_backup(source), SLOW),
+        Benchmark('BackupManager.list_backups', backups.list_backups, FAST),
+    ]
+
+def route_benchmarks():
+    from web_app.app import app
+
+    # The background sampler and probe would add noise to every route measurement
+    app.config['LSMD_SAMPLER'] = False
+    app.config['LSMD_PROBE'] = False
+    client = app.test_client()
+
+    def get(url, headers=None):
+        def call():
+            response = client.get(url, headers=headers or {})
+            if response.status_code != 200:
+                return {'error': f'HTTP {response.status_code}'}
+            return response.data
+        return call
+
+    columnar = {'Accept': 'application/vnd.lsmd.columnar+json', 'Accept-Encoding': 'gzip'}
+    return [
+        Benchmark('route.system-info', get('/api/system-info'), SLOW),
+        Benchmark('route.system-health', get('/api/system-health'), SLOW),
+        Benchmark('route.processes', get('/api/processes'), FAST),
+        Benchmark('route.processes.columnar-gzip', get('/api/processes', columnar), FAST),
+        Benchmark('route.disk-info', get('/api/disk-info'), FAST),
+        Benchmark('route.large-files', get('/api/large-files'), SLOW),
+        Benchmark('route.backups', get('/api/backups'), FAST),
+        Benchmark('route.users', get('/api/users'), FAST),
+        Benchmark('route.users-current', get('/api/users/current'), FAST),
+        Benchmark('route.health', get('/health'), FAST),
+    ]
+
+def synthetic_host_benchmarks(root):
+    from web_app.app import ShellSystemManager
+    from web_modules.connections import ConnectionTable
+    from web_modules.disk_monitor import DiskMonitor
+    from web_modules.process_tracker import ProcessTracker
+    from web_modules.user_manager import UserManager
+    from web_modules.backup_manager import BackupManager
+    from benchmarks.synthetic_host import SyntheticHost
+
+    host = SyntheticHost(root)
+    manager = ShellSystemManager(proc_root=host.proc_root, passwd_file=host.passwd_file,
+                                 scan_root=host.files_root, cgroup_root=host.cgroup_root)
+    tracker = ProcessTracker(host.proc_root, host.passwd_file)
+    # max_age=0: every call parses the tables and updates the fd index
+    connections = ConnectionTable(host.proc_root, tracker, max_age=0)
+    users = UserManager(passwd_file=host.passwd_file, group_file=host.group_file)
+    disk = DiskMonitor()
+    backups = BackupManager(backup_dir=tempfile.mkdtemp(prefix='lsmd-bench-backups-'))
+    # Back up one leaf directory; a full multi-million file tree would take hours
+    leaf = host.files_root
+    while True:
+        subdirs = sorted(d for d in os.listdir(leaf) if os.path.isdir(os.path.join(leaf, d)))
+        if not subdirs:
+            break
+        leaf = os.path.join(leaf, subdirs[0])
+
+    return [
+        Benchmark('synthetic.get_process_list', uncached(manager.get_process_list), SLOW),
+        Benchmark('synthetic.ProcessTracker.sample', tracker.sample, SLOW),
+        Benchmark('synthetic.ProcessTracker.top.io_read', lambda: tracker.top(20, 'io_read'), SLOW),
+        Benchmark('synthetic.CgroupCollector.collect', manager.cgroups.collect, SLOW),
+        Benchmark('synthetic.ConnectionTable.query', connections.query, SLOW),
+        Benchmark('synthetic.get_users', uncached(manager.get_users), SLOW),
+        Benchmark('synthetic.UserManager.list_users', users.list_users, SLOW),
+        Benchmark('synthetic.UserManager.get_user_groups',
+                  lambda: users.get_user_groups('user000001'), SLOW),
+        Benchmark('synthetic.get_large_files', uncached(manager.get_large_files), SLOW),
+        Benchmark('synthetic.DiskMonitor.get_large_files',
+                  lambda: disk.get_large_files(host.files_root), SLOW),
+        Benchmark('synthetic.DiskMonitor.find_duplicates',
+                  lambda: disk.find_duplicates(host.files_root), SLOW),
+        Benchmark('synthetic.BackupManager.create_full_backup',
+                  lambda: backups.create_full_backup(leaf), SLOW),
+    ]
+
+SUITES = {
+    'shell': shell_manager_benchmarks,
+    'modules': web_module_benchmarks,
+    'routes': route_benchmarks,
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run LSMD benchmarks')
+    parser.add_argument('--suite', choices=sorted(SUITES), action='append',
+                        help='suite to run (repeatable, default: all)')
+    parser.add_argument('--filter', help='only run benchmarks whose name contains this')
+    parser.add_argument('--iterations', type=int, help='override iterations per benchmark')
+    parser.add_argument('--save', metavar='PATH', help='write results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a saved baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative slowdown that counts as a regression (default 0.25)')
+    parser.add_argument('--host-root', metavar='PATH',
+                        help='also benchmark against a host built by benchmarks.synthetic_host')
+    args = parser.parse_args(argv)
+
+    benchmarks = []
+    if args.host_root and args.suite:
+        suites = args.suite
+    elif args.host_root:
+        suites = []
+    else:
+        suites = args.suite or sorted(SUITES)
+    for suite in suites:
+        benchmarks.extend(SUITES[suite]())
+    if args.host_root:
+        benchmarks.extend(synthetic_host_benchmarks(args.host_root))
+
+    report = run_benchmarks(benchmarks, args.iterations, args.filter)
+
+    if args.save:
+        save_baseline(report, args.save)
+        print(f"Baseline saved to {args.save}")
+
+    if args.compare:
+        regressions = compare(report, load_baseline(args.compare), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.compare}:")
+            for regression in regressions:
+                print('  ' + json.dumps(regression))
+            return 1
+        print(f"No regressions against {args.compare}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Synthetic host fixture for scale testing
+
+Builds a fake procfs, large passwd/group files and a deep file tree under
+one root so the collectors can be benchmarked at host sizes a laptop does
+not have:
+
+    python3 -m benchmarks.synthetic_host /tmp/lsmd-host \\
+        --processes 50000 --users 100000 --files 5000000
+
+Point the dashboard at it with LSMD_PROC_ROOT=/tmp/lsmd-host/proc,
+LSMD_PASSWD_FILE=/tmp/lsmd-host/etc/passwd,
+LSMD_CGROUP_ROOT=/tmp/lsmd-host/sys/fs/cgroup and
+LSMD_SCAN_ROOT=/tmp/lsmd-host/files, or run the benchmarks with
+--host-root /tmp/lsmd-host.
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+
+# (command, share of processes, typical RSS in MB)
+PROCESS_MIX = [
+    ('php-fpm', 0.20, 40),
+    ('nginx', 0.08, 12),
+    ('postgres', 0.10, 80),
+    ('python3', 0.12, 60),
+    ('java', 0.04, 900),
+    ('node', 0.08, 150),
+    ('bash', 0.10, 4),
+    ('sshd', 0.05, 6),
+    ('kworker/u8:2', 0.15, 0),
+    ('containerd-shim', 0.05, 15),
+    ('systemd-journal', 0.03, 30),
+]
+
+# Upper bound of open sockets per command; anything else holds at most one
+SOCKETS = {'nginx': 64, 'php-fpm': 4, 'postgres': 8, 'java': 128, 'node': 32, 'sshd': 2}
+
+STATES = 'SSSSSSSSRRDZI'
+MEMORY_TOTAL_KB = 64 * 1024 * 1024
+PAGE_SIZE = 4096
+
+class SyntheticHost:
+    """Paths of a generated host under root"""
+
+    def __init__(self, root):
+        self.root = root
+        self.proc_root = os.path.join(root, 'proc')
+        self.passwd_file = os.path.join(root, 'etc', 'passwd')
+        self.group_file = os.path.join(root, 'etc', 'group')
+        self.cgroup_root = os.path.join(root, 'sys', 'fs', 'cgroup')
+        self.files_root = os.path.join(root, 'files')
+
+def _stat_line(pid, comm, state, ppid, utime, stime, starttime, rss_pages, threads):
+    # 52 fields as in proc(5); the ones the collectors read carry real values
+    fields = [str(pid), f"({comm})", state, str(ppid), str(pid), str(pid), '0', '-1', '4194560',
+              '1200', '0', '3', '0', str(utime), str(stime), '0', '0', '20', '0', str(threads), '0',
+              str(starttime), str(rss_pages * PAGE_SIZE * 4), str(rss_pages)]
+    fields += ['18446744073709551615'] + ['0'] * 27
+    return ' '.join(fields[:52]) + '\n'
+
+def _io_text(rng):
+    read_bytes = int(rng.lognormvariate(16, 3))
+    write_bytes = int(rng.lognormvariate(15, 3))
+    return (f"rchar: {read_bytes * 2}\nwchar: {write_bytes * 2}\nsyscr: {rng.randrange(10 ** 6)}\n"
+            f"syscw: {rng.randrange(10 ** 6)}\nread_bytes: {read_bytes}\nwrite_bytes: {write_bytes}\n"
+            f"cancelled_write_bytes: 0\n")
+
+def build_procfs(proc_root, processes, users=1000, seed=1):
+    """Create proc_root with the given number of /proc/[pid] directories; returns (pid, socket inode) pairs"""
+    rng = random.Random(seed)
+    os.makedirs(proc_root, exist_ok=True)
+
+    with open(os.path.join(proc_root, 'meminfo'), 'w') as f:
+        f.write(f"MemTotal:       {MEMORY_TOTAL_KB} kB\n"
+                f"MemFree:        {MEMORY_TOTAL_KB // 4} kB\n"
+                f"MemAvailable:   {MEMORY_TOTAL_KB // 2} kB\n")
+    with open(os.path.join(proc_root, 'stat'), 'w') as f:
+        f.write('cpu  4705 150 1120 16250 520 0 30 0 0 0\n')
+    with open(os.path.join(proc_root, 'uptime'), 'w') as f:
+        f.write('86400.00 300000.00\n')
+
+    commands = [entry[0] for entry in PROCESS_MIX]
+    weights = [entry[1] for entry in PROCESS_MIX]
+    rss_mb = {entry[0]: entry[2] for entry in PROCESS_MIX}
+    pids = []
+    sockets = []
+
+    for index in range(processes):
+        pid = index + 1
+        if pid == 1:
+            comm, ppid = 'systemd', 0
+        else:
+            comm = rng.choices(commands, weights)[0]
+            # Workers cluster under recent parents, giving deep and wide trees
+            ppid = pids[int(len(pids) * rng.random() ** 3)] if rng.random() < 0.7 else 1
+        pids.append(pid)
+
+        uid = 0 if rng.random() < 0.3 else 1000 + rng.randrange(max(users, 1))
+        rss_pages = int(rss_mb.get(comm, 8) * rng.lognormvariate(0, 0.5) * 1024 * 1024 / PAGE_SIZE)
+        cmdline = f"{comm}\0--worker\0{index}\0"
+        state = rng.choice(STATES)
+
+        base = os.path.join(proc_root, str(pid))
+        os.makedirs(base, exist_ok=True)
+        with open(os.path.join(base, 'stat'), 'w') as f:
+            f.write(_stat_line(pid, comm, state, ppid, rng.randrange(100000), rng.randrange(20000),
+                               rng.randrange(8640000), rss_pages, rng.randrange(1, 64)))
+        with open(os.path.join(base, 'status'), 'w') as f:
+            f.write(f"Name:\t{comm[:15]}\nState:\t{state}\nTgid:\t{pid}\nPid:\t{pid}\nPPid:\t{ppid}\n"
+                    f"Uid:\t{uid}\t{uid}\t{uid}\t{uid}\nGid:\t{uid}\t{uid}\t{uid}\t{uid}\n"
+                    f"VmRSS:\t{rss_pages * PAGE_SIZE // 1024} kB\nThreads:\t1\n")
+        with open(os.path.join(base, 'cmdline'), 'w') as f:
+            f.write(cmdline)
+        with open(os.path.join(base, 'io'), 'w') as f:
+            f.write(_io_text(rng))
+        # fd entries are dangling symlinks, as sockets and pipes are in procfs
+        fd_dir = os.path.join(base, 'fd')
+        os.makedirs(fd_dir, exist_ok=True)
+        for fd in range(rng.randrange(SOCKETS.get(comm, 1) + 1)):
+            inode = 10 ** 6 + len(sockets)
+            os.symlink(f"socket:[{inode}]", os.path.join(fd_dir, str(fd + 3)))
+            sockets.append((pid, inode, comm))
+    return sockets
+
+def _inet_address(rng, ipv6):
+    if ipv6:
+        return ''.join(f"{rng.randrange(1 << 32):08X}" for _ in range(4))
+    # Clients cluster in a few thousand addresses, as behind NAT and in office networks
+    return f"{rng.randrange(1, 4000):04X}000A"
+
+def _inet_line(slot, local, local_port, remote, remote_port, state, uid, inode):
+    return (f"{slot:4d}: {local}:{local_port:04X} {remote}:{remote_port:04X} {state:02X} "
+            f"00000000:00000000 00:00000000 00000000 {uid:5d}        0 {inode} 1 0000000000000000 20 4 30 10 -1\n")
+
+def build_net(proc_root, sockets, connections=0, seed=1):
+    """Write /proc/net tables for the fd sockets plus `connections` held by one proxy process"""
+    rng = random.Random(seed)
+    sockets = list(sockets)
+    proxy = next((pid for pid, _, comm in sockets if comm == 'nginx'), sockets[0][0] if sockets else 1)
+    if connections:
+        fd_dir = os.path.join(proc_root, str(proxy), 'fd')
+        first = 10 ** 6 + len(sockets)
+        for i in range(connections):
+            os.symlink(f"socket:[{first + i}]", os.path.join(fd_dir, str(1000 + i)))
+            sockets.append((proxy, first + i, 'proxy'))
+
+    tables = {'tcp': [], 'tcp6': [], 'udp': [], 'udp6': [], 'unix': []}
+    local_v4 = '0100007F'
+    for pid, inode, comm in sockets:
+        if comm == 'proxy':
+            tables['tcp'].append((local_v4, 443, _inet_address(rng, False), rng.randrange(1024, 65536), 0x01, 33, inode))
+            continue
+        kind = rng.random()
+        if kind < 0.45:
+            state = 0x0A if rng.random() < 0.2 else rng.choice([0x01, 0x01, 0x01, 0x08, 0x06])
+            tables['tcp'].append((local_v4, rng.choice([80, 443, 5432, 8080, 9000]),
+                                  _inet_address(rng, False), rng.randrange(1024, 65536), state, 0, inode))
+        elif kind < 0.6:
+            tables['tcp6'].append(('0' * 24 + '01000000', rng.choice([443, 8443]),
+                                   _inet_address(rng, True), rng.randrange(1024, 65536), 0x01, 0, inode))
+        elif kind < 0.7:
+            tables['udp'].append((local_v4, rng.choice([53, 123, 514]), '00000000', 0, 0x07, 0, inode))
+        else:
+            path = f"/run/{comm}/{inode}.sock" if rng.random() < 0.3 else ''
+            flags = '00010000' if path else '00000000'
+            tables['unix'].append(f"0000000000000000: 00000002 00000000 {flags} 0001 {'01' if path else '03'} "
+                                  f"{inode} {path}".rstrip() + '\n')
+    # Closed connections linger in TIME_WAIT without an owner
+    for _ in range(len(tables['tcp']) // 5):
+        tables['tcp'].append((local_v4, 443, _inet_address(rng, False), rng.randrange(1024, 65536), 0x06, 0, 0))
+
+    net_dir = os.path.join(proc_root, 'net')
+    os.makedirs(net_dir, exist_ok=True)
+    header = ("  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt"
+              "   uid  timeout inode\n")
+    for protocol in ('tcp', 'tcp6', 'udp', 'udp6'):
+        with open(os.path.join(net_dir, protocol), 'w') as f:
+            f.write(header)
+            f.writelines(_inet_line(slot, *row) for slot, row in enumerate(tables[protocol]))
+    with open(os.path.join(net_dir, 'unix'), 'w') as f:
+        f.write("Num       RefCount Protocol Flags    Type St Inode Path\n")
+        f.writelines(tables['unix'])
+
+def build_passwd(passwd_file, group_file, users, groups=None, seed=1):
+    """Write passwd with system accounts plus `users` regular users, and a group file"""
+    rng = random.Random(seed)
+    groups = groups or max(users // 50, 1)
+    os.makedirs(os.path.dirname(passwd_file), exist_ok=True)
+
+    with open(passwd_file, 'w') as f:
+        f.write('root:x:0:0:root:/root:/bin/bash\n')
+        f.write('daemon:x:1:1:daemon:/usr/sbin:/usr/sbin/nologin\n')
+        f.write('nobody:x:65534:65534:nobody:/nonexistent:/usr/sbin/nologin\n')
+        for index in range(users):
+            uid = 1000 + index
+            f.write(f"user{index:06d}:x:{uid}:{uid}:Synthetic User {index},,,:"
+                    f"/home/user{index:06d}:/bin/bash\n")
+
+    with open(group_file, 'w') as f:
+        f.write('root:x:0:\n')
+        for index in range(groups):
+            members = ','.join(f"user{rng.randrange(users):06d}" for _ in range(rng.randrange(0, 20)))
+            f.write(f"group{index:05d}:x:{100000 + index}:{members}\n")
+
+def file_size(rng, distribution, median):
+    """Draw one file size in bytes"""
+    if distribution == 'pareto':
+        return int(median / (2 ** (1 / 1.16)) * rng.paretovariate(1.16))
+    if distribution == 'uniform':
+        return rng.randrange(0, median * 2)
+    return int(rng.lognormvariate(math.log(median), 2.0))
+
+def build_file_tree(files_root, files, fanout=16, files_per_dir=64, distribution='lognormal',
+                    median_size=64 * 1024, max_size=16 * 1024 ** 3, sparse=True, seed=1):
+    """Create `files` files spread over a directory tree under files_root"""
+    rng = random.Random(seed)
+    directories = max(math.ceil(files / files_per_dir), 1)
+    depth = max(math.ceil(math.log(directories, fanout)), 1) if directories > 1 else 1
+
+    for index in range(files):
+        # The directory index written in base `fanout` gives the nested path
+        directory = index // files_per_dir
+        parts = []
+        for _ in range(depth):
+            parts.append(f"d{directory % fanout:02d}")
+            directory //= fanout
+        path = os.path.join(files_root, *reversed(parts))
+        if index % files_per_dir == 0:
+            os.makedirs(path, exist_ok=True)
+
+        size = min(file_size(rng, distribution, median_size), max_size)
+        filepath = os.path.join(path, f"f{index:08d}.dat")
+        with open(filepath, 'wb') as f:
+            if sparse:
+                f.truncate(size)
+            else:
+                remaining = size
+                while remaining > 0:
+                    chunk = min(remaining, 1024 * 1024)
+                    f.write(os.urandom(chunk))
+                    remaining -= chunk
+
+def _cgroup_files(directory, rng, pids):
+    os.makedirs(directory, exist_ok=True)
+    usage = rng.randrange(10 ** 10)
+    files = {
+        'cgroup.controllers': 'cpuset cpu io memory pids\n',
+        'cpu.stat': (f"usage_usec {usage}\nuser_usec {usage * 3 // 4}\nsystem_usec {usage // 4}\n"
+                     f"nr_periods 0\nnr_throttled 0\nthrottled_usec {rng.randrange(10 ** 6)}\n"),
+        'memory.current': f"{int(rng.lognormvariate(18, 2))}\n",
+        'memory.max': 'max\n',
+        'io.stat': (f"8:0 rbytes={rng.randrange(10 ** 11)} wbytes={rng.randrange(10 ** 11)} "
+                    f"rios={rng.randrange(10 ** 7)} wios={rng.randrange(10 ** 7)} dbytes=0 dios=0\n"),
+        'pids.current': f"{len(pids)}\n",
+        'cgroup.procs': ''.join(f"{pid}\n" for pid in pids),
+    }
+    for name, content in files.items():
+        with open(os.path.join(directory, name), 'w') as f:
+            f.write(content)
+
+def build_cgroupfs(cgroup_root, cgroups, proc_root=None, processes=0, seed=1):
+    """Create a cgroup v2 tree of about `cgroups` services, sessions and containers"""
+    rng = random.Random(seed)
+    leaves = []
+    for index in range(cgroups):
+        kind = rng.random()
+        if kind < 0.4:
+            leaves.append(f"system.slice/service{index:05d}.service")
+        elif kind < 0.6:
+            leaves.append(f"user.slice/user-{1000 + index % 50}.slice/session-{index}.scope")
+        else:
+            leaves.append(f"kubepods.slice/pod{index // 4:05d}.slice/cri-containerd-{index:012x}.scope")
+
+    # Spread the synthetic PIDs over the leaves and point /proc/[pid]/cgroup at them
+    members = {leaf: [] for leaf in leaves}
+    for pid in range(1, processes + 1):
+        leaf = leaves[rng.randrange(len(leaves))] if leaves else ''
+        if leaf:
+            members[leaf].append(pid)
+        if proc_root and os.path.isdir(os.path.join(proc_root, str(pid))):
+            with open(os.path.join(proc_root, str(pid), 'cgroup'), 'w') as f:
+                f.write(f"0::/{leaf}\n")
+
+    directories = {''}
+    for leaf in leaves:
+        parts = leaf.split('/')
+        for depth in range(1, len(parts) + 1):
+            directories.add('/'.join(parts[:depth]))
+    for directory in sorted(directories):
+        _cgroup_files(os.path.join(cgroup_root, directory), rng, members.get(directory, []))
+
+def build_host(root, processes=2000, users=1000, files=10000, cgroups=200, connections=0, **tree_options):
+    """Build every part of a synthetic host and return its paths"""
+    host = SyntheticHost(root)
+    sockets = build_procfs(host.proc_root, processes, users)
+    build_net(host.proc_root, sockets, connections)
+    build_cgroupfs(host.cgroup_root, cgroups, host.proc_root, processes)
+    build_passwd(host.passwd_file, host.group_file, users)
+    build_file_tree(host.files_root, files, **tree_options)
+    return host
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build a synthetic host for scale testing')
+    parser.add_argument('root', help='directory to build the host in')
+    parser.add_argument('--processes', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--files', type=int, default=10000)
+    parser.add_argument('--cgroups', type=int, default=200)
+    parser.add_argument('--connections', type=int, default=0,
+                        help='extra established connections held by one proxy process')
+    parser.add_argument('--fanout', type=int, default=16, help='subdirectories per directory')
+    parser.add_argument('--files-per-dir', type=int, default=64)
+    parser.add_argument('--size-distribution', choices=['lognormal', 'pareto', 'uniform'],
+                        default='lognormal')
+    parser.add_argument('--median-size', type=int, default=64 * 1024, help='bytes')
+    parser.add_argument('--dense', action='store_true',
+                        help='write real data instead of sparse files')
+    args = parser.parse_args(argv)
+
+    host = build_host(args.root, args.processes, args.users, args.files, args.cgroups, args.connections,
+                      fanout=args.fanout, files_per_dir=args.files_per_dir,
+                      distribution=args.size_distribution, median_size=args.median_size,
+                      sparse=not args.dense)
+    print(f"proc root:   {host.proc_root}")
+    print(f"passwd file: {host.passwd_file}")
+    print(f"group file:  {host.group_file}")
+    print(f"cgroup root: {host.cgroup_root}")
+    print(f"file tree:   {host.files_root}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -32,6 +32,22 @@ SHOW_SUCCESS_NOTIFICATIONS=true
 SHOW_ERROR_NOTIFICATIONS=true
 NOTIFICATION_TIMEOUT=3
 
+# Web dashboard sampler and alerts
+SAMPLER_INTERVAL=5  # seconds
+SAMPLER_BUDGET_PERCENT=1  # sampler CPU budget, percent of one core
+SAMPLER_MAX_INTERVAL=60  # seconds; the interval never widens past this
+ALERT_RULES="cpu > 90 for 5m; memory > 90 for 2m; disk free < 10% on any mount; rate(swap.out_bytes) > 1048576 for 1m"
+ALERT_LOG_FILE="./logs/lsmd.log"
+ALERT_WEBHOOK_URL=""  # e.g. http://127.0.0.1:9000/alerts
+
+# Flight recorder: every sampler tick, delta-compressed, in two rolling files
+FLIGHT_RECORDER=true
+FLIGHT_RECORDER_FILE="./logs/flight.rec"
+FLIGHT_RECORDER_MAX_MB=100  # both files together
+
+# Log files served by /api/logs/<name>
+LOG_FILES="lsmd=./logs/lsmd.log; backup=./logs/backup_logs.txt; syslog=/var/log/syslog"
+
 # Function to apply styles
 apply_styles() {
     echo "Applying LSMD styles..."
@@ -52,3 +68,6 @@ validate_modules() {
     done
     return 0
 }
+
+# Terminal client (python3 -m web_modules.terminal) talks to the server here; empty disables
+CLI_SOCKET="./logs/lsmd.sock"
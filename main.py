@@ -4,6 +4,9 @@ LSMD Web Dashboard Launcher
 Simple version to get started
 """
 
+import argparse
+import importlib
+import importlib.util
 import os
 import sys
 import webbrowser
@@ -12,17 +15,54 @@ import time
 
 def check_dependencies():
     """Check if required Python packages are installed"""
-    try:
-        import flask
-        import psutil
-        print("✅ All dependencies are installed")
-        return True
-    except ImportError as e:
-        print(f"❌ Missing dependency: {e}")
+    # find_spec locates packages without paying for importing them twice
+    missing = [name for name in ('flask', 'psutil') if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"❌ Missing dependency: {', '.join(missing)}")
         print("Please install with: pip3 install flask psutil")
         return False
+    print("✅ All dependencies are installed")
+    return True
+
+def startup_profile():
+    """Print import, probe and first-response timings"""
+    imports = []
+    for name in ('flask', 'psutil', 'web_app.app'):
+        start = time.perf_counter()
+        importlib.import_module(name)
+        imports.append((name, time.perf_counter() - start))
+    
+    from web_app.app import app, system_manager, startup
+    probe_start = time.perf_counter()
+    system_manager.capabilities.start().wait()
+    probe_seconds = time.perf_counter() - probe_start
+    app.test_client().get('/health')
+    report = system_manager.capabilities.report()
+    
+    print("Imports:")
+    for name, seconds in imports:
+        print(f"  {name:<24} {seconds * 1000:8.1f} ms")
+    print(f"Probe ({probe_seconds * 1000:.1f} ms wall, cache {report['cache_file']}):")
+    for name, tool in report['tools'].items():
+        state = 'found' if tool['available'] else 'missing'
+        print(f"  {name:<24} {state:<8} {'cached' if tool['cached'] else ''}")
+    for key, module in report['modules'].items():
+        state = 'ok' if module['ok'] else 'failed'
+        print(f"  {key:<24} {state:<8} {module['ms']:8.1f} ms {'cached' if module['cached'] else ''}")
+    print(f"App imported {startup['ready_ms']} ms after process start")
 
 def main():
+    parser = argparse.ArgumentParser(description='LSMD Web Dashboard')
+    parser.add_argument('--startup-profile', action='store_true',
+                        help='print an import and capability probe breakdown before serving')
+    parser.add_argument('--replay', metavar='RECORDING',
+                        help='serve a flight recording (e.g. logs/flight.rec) instead of this host')
+    args = parser.parse_args()
+    
+    if args.replay:
+        # Read by web_app.app at import, and inherited by the debug reloader
+        os.environ['LSMD_REPLAY'] = os.path.abspath(args.replay)
+    
     print("🚀 Starting LSMD Web Dashboard...")
     print("=" * 50)
     
@@ -30,9 +70,17 @@ def main():
     if not check_dependencies():
         sys.exit(1)
     
+    if args.startup_profile:
+        startup_profile()
+    
     # Import and run the app
     try:
-        from web_app.app import app
+        from web_app.app import app, start_local_socket
+        from werkzeug.serving import is_running_from_reloader
+        
+        # With the debug reloader only the serving child takes the socket
+        if is_running_from_reloader():
+            start_local_socket()
         
         # Open browser after delay
         def open_browser():
@@ -44,6 +92,7 @@ def main():
         browser_thread.start()
         
         print("🌐 Web dashboard starting at: http://localhost:5000")
+        print("💻 Terminal views: python3 -m web_modules.terminal")
         print("⏹️  Press Ctrl+C to stop the server")
         print("=" * 50)
         
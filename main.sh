@@ -22,12 +22,30 @@ A comprehensive system management tool with:\n\
 
 # Function to show system info in header
 get_system_status() {
-    local cpu_usage=$(mpstat 1 1 | tail -1 | awk '{printf "%.1f%%", 100 - $12}')
-    local memory_usage=$(free | awk 'NR==2{printf "%.1f%%", $3*100/$2}')
-    local disk_usage=$(df / | awk 'NR==2{printf "%.1f%%", $5}')
-    local uptime=$(uptime -p | sed 's/up //')
-    
-    echo "🖥️ CPU: $cpu_usage | 🧠 Memory: $memory_usage | 💾 Disk: $disk_usage | ⏰ Uptime: $uptime"
+    # Read from the dashboard server's sampler when it runs, so a redraw never blocks on mpstat
+    python3 -m web_modules.terminal --status 2>/dev/null || echo "🖥️ System status unavailable"
+}
+
+# Function to show terminal client views in a text window
+show_view() {
+    local title="$1"
+    shift
+    python3 -m web_modules.terminal "$@" 2>&1 | zenity --text-info \
+        --title="$title" \
+        --width=800 \
+        --height=550 \
+        --font="monospace 9"
+}
+
+# Function to show a module script's listing in a text window
+show_module_output() {
+    local title="$1"
+    shift
+    bash "$@" 2>&1 | zenity --text-info \
+        --title="$title" \
+        --width=700 \
+        --height=500 \
+        --font="monospace 9"
 }
 
 # Function to create main menu
@@ -54,24 +72,19 @@ show_main_menu() {
         
         case $choice in
             "📊 Process Manager")
-                zenity --info --title="Launching..." --text="Opening Process Manager..." --timeout=1 --width=200
-                bash modules/process_manager.sh
+                show_view "📊 Process Manager" --once processes --limit 40
                 ;;
             "💿 Disk Monitor")
-                zenity --info --title="Launching..." --text="Opening Disk Monitor..." --timeout=1 --width=200
-                bash modules/disk_monitor.sh
+                show_view "💿 Disk Monitor" --once disks
                 ;;
             "💾 Backup Module")
-                zenity --info --title="Launching..." --text="Opening Backup Module..." --timeout=1 --width=200
-                bash modules/backup_module.sh
+                show_module_output "💾 Backups" modules/backup.sh list
                 ;;
             "❤️ System Health")
-                zenity --info --title="Launching..." --text="Opening System Health Monitor..." --timeout=1 --width=200
-                bash modules/health_monitor.sh
+                show_view "❤️ System Health" --once system
                 ;;
             "👥 User Management")
-                zenity --info --title="Launching..." --text="Opening User Management..." --timeout=1 --width=200
-                bash modules/user_management.sh
+                show_module_output "👥 Users" modules/users.sh list
                 ;;
             "🔧 System Info")
                 show_system_info
@@ -150,7 +163,7 @@ $(free -h | awk 'NR<=2 {print "• " $0}' | sed 's/Total/Total:/' | sed 's/Used/
 # Function to check if required commands are available
 check_dependencies() {
     local missing=()
-    local commands=("zenity" "mpstat" "free" "df" "uptime")
+    local commands=("zenity" "python3" "free" "df" "uptime")
     
     for cmd in "${commands[@]}"; do
         if ! command -v "$cmd" &> /dev/null; then
@@ -198,6 +211,11 @@ main() {
         exit 1
     fi
     
+    # Without a display (e.g. over SSH) run the terminal client instead of the zenity menu
+    if [ "$1" = "--tui" ] || { [ -z "$DISPLAY" ] && [ -z "$WAYLAND_DISPLAY" ]; } || ! command -v zenity &> /dev/null; then
+        exec python3 -m web_modules.terminal
+    fi
+    
     # Check dependencies
     check_dependencies
     
@@ -220,4 +238,4 @@ main() {
 trap 'zenity --info --text="👋 Goodbye!" --timeout=1 --width=200; exit 0' INT
 
 # Start the application
-main
\ No newline at end of file
+main "$@"
\ No newline at end of file
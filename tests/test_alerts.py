@@ -0,0 +1,24 @@
+from web_modules.alerts import AlertEngine
+
+
+def test_rate_rules_on_one_series_each_evaluate():
+    engine = AlertEngine(['rate(swap.out_bytes) > 100', 'rate(swap.out_bytes) > 1000'])
+    engine.evaluate(None, {'swap.out_bytes': 0}, now=100.0)
+    fired = engine.evaluate(None, {'swap.out_bytes': 50000}, now=110.0)
+    assert sorted(alert['rule'] for alert in fired) == ['rate(swap.out_bytes) > 100',
+                                                        'rate(swap.out_bytes) > 1000']
+
+
+def test_alert_on_a_series_that_disappears_is_resolved():
+    engine = AlertEngine(['proc.*.rss_bytes > 1000'], expire_after=60.0)
+    fired = engine.evaluate(None, {'proc.42:java.rss_bytes': 5000, 'proc.7:sshd.rss_bytes': 10}, now=1000.0)
+    assert [alert['series'] for alert in fired] == ['proc.42:java.rss_bytes']
+
+    # The process exited; a gap shorter than expire_after keeps the alert
+    assert engine.evaluate(None, {'proc.7:sshd.rss_bytes': 10}, now=1030.0) == []
+    assert len(engine.get_alerts('active')['active']) == 1
+
+    resolved = engine.evaluate(None, {'proc.7:sshd.rss_bytes': 10}, now=1090.0)
+    assert [(alert['series'], alert['state']) for alert in resolved] == [('proc.42:java.rss_bytes', 'resolved')]
+    assert engine.active == {}
+    assert list(engine._state) == [('proc.*.rss_bytes > 1000', 'proc.7:sshd.rss_bytes')]
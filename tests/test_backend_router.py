@@ -0,0 +1,38 @@
+import time
+
+from web_modules.backend_router import BackendRouter
+
+
+def test_requests_only_use_timed_backends_and_explore_times_the_rest():
+    calls = []
+
+    def backend(name, seconds):
+        def run():
+            calls.append(name)
+            time.sleep(seconds)
+            return {'backend': name}
+        return run
+
+    router = BackendRouter(explore_after=60.0)
+    router.register('info', 'slow', backend('slow', 0.02))
+    router.register('info', 'fast', backend('fast', 0.0))
+
+    # Nothing timed yet: registration order, and only the first backend runs
+    assert [router.call('info')['backend'] for _ in range(3)] == ['slow'] * 3
+    assert calls == ['slow'] * 3
+
+    calls.clear()
+    router.explore()
+    assert calls == ['fast']
+    assert router.call('info') == {'backend': 'fast'}
+
+    # A stale timing is refreshed by explore(), never by a request
+    for backend in router.operations['info']:
+        backend.last_measured -= 120.0
+    calls.clear()
+    assert [router.call('info')['backend'] for _ in range(3)] == ['fast'] * 3
+    assert calls == ['fast'] * 3
+    # The requests re-timed 'fast'; only 'slow' is left to refresh
+    calls.clear()
+    router.explore()
+    assert calls == ['slow']
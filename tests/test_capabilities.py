@@ -0,0 +1,44 @@
+import json
+
+from web_modules import capabilities
+from web_modules.capabilities import CapabilityProbe
+
+SCRIPTS = {
+    'good': 'echo \'{"ok": true}\'',
+    'slow': 'sleep 5; echo \'{}\'',
+    'broken': 'if then fi',
+    'missing': 'no-such-lsmd-tool; echo \'{"ok": true\'',
+}
+
+
+def make_probe(tmp_path, monkeypatch):
+    modules_dir = tmp_path / 'modules'
+    modules_dir.mkdir()
+    for name, body in SCRIPTS.items():
+        (modules_dir / f'{name}.sh').write_text(f'#!/bin/bash\n{body}\n')
+    monkeypatch.setattr(capabilities, 'MODULE_PROBES', [(name, 'info') for name in SCRIPTS])
+    monkeypatch.setattr(capabilities, 'TOOLS', ['bash'])
+    return CapabilityProbe(str(modules_dir), str(tmp_path / 'cache.json'), timeout=0.5)
+
+
+def test_only_deterministic_failures_close_the_gate(tmp_path, monkeypatch):
+    probe = make_probe(tmp_path, monkeypatch)
+    probe.probe()
+    assert probe.module_ok('good', 'info')
+    # A timeout may pass next time, so the action stays open
+    assert probe.module_ok('slow', 'info')
+    assert not probe.module_ok('broken', 'info')
+    assert not probe.module_ok('missing', 'info')
+
+
+def test_transient_failures_are_not_cached(tmp_path, monkeypatch):
+    probe = make_probe(tmp_path, monkeypatch)
+    probe.probe()
+    with open(tmp_path / 'cache.json') as f:
+        cached = json.load(f)['modules']
+    assert set(cached) == {'good:info', 'broken:info', 'missing:info'}
+
+    again = CapabilityProbe(probe.modules_dir, probe.cache_file, timeout=0.5)
+    report = again.probe()
+    assert report['modules']['good:info']['cached']
+    assert not report['modules']['slow:info']['cached']
@@ -0,0 +1,62 @@
+import os
+import shutil
+
+from web_modules.connections import SocketIndex
+
+
+def add_fd(proc_root, pid, fd, target):
+    fd_dir = os.path.join(proc_root, str(pid), 'fd')
+    os.makedirs(fd_dir, exist_ok=True)
+    path = os.path.join(fd_dir, str(fd))
+    if os.path.lexists(path):
+        os.remove(path)
+    os.symlink(target, path)
+
+
+def test_new_and_closed_sockets(tmp_path):
+    proc_root = str(tmp_path)
+    add_fd(proc_root, 100, 3, 'socket:[500]')
+    add_fd(proc_root, 100, 4, 'pipe:[9]')
+    index = SocketIndex(proc_root)
+    index.update({b'500'}, [100])
+    assert index.owners == {b'500': 100}
+
+    add_fd(proc_root, 100, 5, 'socket:[501]')
+    index.update({b'500', b'501'}, [100])
+    assert index.owners == {b'500': 100, b'501': 100}
+
+    # fd 3 closed and its number reused for a new socket
+    add_fd(proc_root, 100, 3, 'socket:[502]')
+    index.update({b'501', b'502'}, [100])
+    assert index.owners == {b'501': 100, b'502': 100}
+
+
+def test_exited_and_restarted_processes_are_forgotten(tmp_path):
+    proc_root = str(tmp_path)
+    add_fd(proc_root, 100, 3, 'socket:[500]')
+    index = SocketIndex(proc_root)
+    index.update({b'500'}, [100], {100: 1})
+    index.update({b'500'}, [], {})
+    assert index.owners == {}
+
+    index.update({b'500'}, [100], {100: 1})
+    add_fd(proc_root, 100, 3, 'socket:[600]')
+    # Same PID, new process: the old fd table must not be trusted
+    index.update({b'600'}, [100], {100: 2})
+    assert index.owners == {b'600': 100}
+
+
+def test_unreadable_fd_table_drops_its_sockets(tmp_path):
+    proc_root = str(tmp_path)
+    add_fd(proc_root, 100, 3, 'socket:[500]')
+    add_fd(proc_root, 200, 3, 'socket:[600]')
+    index = SocketIndex(proc_root)
+    index.update({b'500'}, [100])
+    assert index.owners == {b'500': 100}
+
+    # pid 100 vanishes between the pid listing and its rescan
+    shutil.rmtree(os.path.join(proc_root, '100'))
+    index.update({b'500', b'600'}, [100, 200])
+    assert index.owners == {b'600': 200}
+    index.update({b'600'}, [100, 200])
+    assert index.owners == {b'600': 200}
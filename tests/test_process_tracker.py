@@ -0,0 +1,38 @@
+from benchmarks.synthetic_host import build_procfs
+from web_modules.process_tracker import ProcessTracker
+from web_modules.signaller import ProcessSignaller
+
+
+def test_top_does_not_reorder_the_snapshot(tmp_path):
+    proc_root = str(tmp_path / 'proc')
+    build_procfs(proc_root, 200)
+    tracker = ProcessTracker(proc_root)
+    tracker.top(20, 'memory')
+    _, processes, _ = tracker.snapshot()
+    assert [proc['pid'] for proc in processes] == tracker.pids()
+
+
+def test_top_is_sorted_and_limited(tmp_path):
+    proc_root = str(tmp_path / 'proc')
+    build_procfs(proc_root, 200)
+    tracker = ProcessTracker(proc_root)
+    rows = tracker.top(15, 'memory')
+    assert len(rows) == 15
+    assert [row['memory'] for row in rows] == sorted((row['memory'] for row in rows), reverse=True)
+
+
+def test_request_path_reads_leave_the_sampler_baseline_alone(tmp_path):
+    proc_root = str(tmp_path / 'proc')
+    build_procfs(proc_root, 50)
+    tracker = ProcessTracker(proc_root)
+    tracker.sample()
+    baseline = tracker._baselines['sampler']
+
+    tracker.top(10, 'cpu')
+    taken, processes, rollup = tracker.snapshot()
+    tracker._snapshot = (taken - 60.0, processes, rollup)
+    tracker.table(0, 10)
+    ProcessSignaller(tracker).select(pids=[processes[0]['pid']])
+
+    assert tracker._baselines['sampler'] is baseline
+    assert 'request' in tracker._baselines
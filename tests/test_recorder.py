@@ -0,0 +1,119 @@
+import os
+
+from web_modules.recorder import HEADER, DELTA, FlightRecorder, Recording, diff, patch
+from web_modules.snapshots import SnapshotStore
+
+
+def _state(when, names, load=1.0):
+    return {'time': when, 'metrics': {'load.1': load}, 'rates': None,
+            'processes': {str(pid): {'pid': pid, 'name': name, 'cpu': when % 7}
+                          for pid, name in enumerate(names, 100)},
+            'sections': {}, 'snapshots': {}}
+
+
+def test_diff_patch_round_trip():
+    old = {'a': 1, 'b': {'x': 1, 'y': [1, 2]}, 'c': 'gone', 'd': {'keep': True}}
+    new = {'a': 2, 'b': {'x': 1, 'y': [1, 2, 3], 'z': None}, 'd': {'keep': True}, 'e': {'new': 1}}
+    changes = diff(old, new)
+    assert patch(old, changes) == new
+    assert old['b'] == {'x': 1, 'y': [1, 2]}
+    assert diff(new, new) == {}
+
+
+def test_keyframes_and_deltas_replay_every_state(tmp_path):
+    path = str(tmp_path / 'flight.rec')
+    recorder = FlightRecorder(path, keyframe_interval=100)
+    written = {}
+    for when in (0.0, 5.0, 10.0, 15.0, 120.0, 125.0):
+        names = ['init', 'sshd'] + (['cron'] if when >= 10 else []) + (['backup'] if 5 <= when < 125 else [])
+        written[when] = _state(when, names, load=when / 10)
+        recorder.write(written[when], when)
+
+    recording = Recording(path)
+    info = recording.info()
+    assert (info['frames'], info['keyframes'], info['start'], info['end']) == (6, 2, 0.0, 125.0)
+    assert recording.state_at(-1) is None
+    # Forwards, backwards and between frames
+    for when in (0.0, 5.0, 10.0, 15.0, 120.0, 125.0, 10.0, 0.0):
+        assert recording.state_at(when) == written[when]
+    assert recording.state_at(17.5) == written[15.0]
+
+
+def test_rolls_over_to_the_previous_file(tmp_path):
+    path = str(tmp_path / 'flight.rec')
+    recorder = FlightRecorder(path, max_bytes=4096)
+    def state(tick):
+        return _state(float(tick), [f'proc{tick}-{i}' for i in range(5)])
+
+    for tick in range(200):
+        recorder.write(state(tick), float(tick))
+
+    assert os.path.exists(path + '.1')
+    # Each file is cut once it passes half of max_bytes, so the pair stays near the bound
+    assert os.path.getsize(path) + os.path.getsize(path + '.1') <= 4096 + 2 * recorder.last_frame_bytes
+
+    recording = Recording(path)
+    info = recording.info()
+    assert 0 < info['start'] < info['end'] == 199.0
+    # The oldest frame left is a keyframe at the start of the previous file
+    assert recording.state_at(info['start']) == state(int(info['start']))
+    assert recording.state_at(199.0) == state(199)
+
+
+def test_half_written_frame_is_ignored_then_cut(tmp_path):
+    path = str(tmp_path / 'flight.rec')
+    recorder = FlightRecorder(path)
+    for when in (1.0, 2.0, 3.0):
+        recorder.write(_state(when, ['init', f'job{when}']), when)
+    recorder._file.close()
+    complete = os.path.getsize(path)
+
+    # A crash in the middle of the next frame leaves its header and part of the payload
+    with open(path, 'ab') as f:
+        f.write(HEADER.pack(DELTA, 4.0, 1000) + b'\x00' * 10)
+
+    recording = Recording(path)
+    assert recording.info()['frames'] == 3
+    assert recording.state_at(10.0) == _state(3.0, ['init', 'job3.0'])
+
+    # The next run continues the file from the last complete frame
+    recorder = FlightRecorder(path)
+    recorder.write(_state(5.0, ['init']), 5.0)
+    recorder._file.close()
+    assert os.path.getsize(path) == complete + recorder.last_frame_bytes
+
+    recording = Recording(path)
+    assert recording.info()['frames'] == 4
+    assert recording.state_at(4.0) == _state(3.0, ['init', 'job3.0'])
+    assert recording.state_at(5.0) == _state(5.0, ['init'])
+
+
+class _Sampler:
+    def __init__(self, processes):
+        self.metrics = {'load.1': 1.0}
+        self.rates = None
+        self.processes = processes
+
+
+def test_idle_jitter_and_slow_parts_write_no_delta(tmp_path):
+    store = SnapshotStore()
+    calls = []
+    recorder = FlightRecorder(str(tmp_path / 'flight.rec'), store,
+                              sections={'cgroups': lambda: calls.append(1) or len(calls)})
+    proc = {'pid': 100, 'name': 'sshd', 'state': 'S', 'cpu': 0.1, 'rss_bytes': 104857600}
+    store.publish('disk-info', [{'mounted': '/', 'use_percent': '40%'}])
+    store.publish('alerts-active', {'active': []})
+    first = recorder.capture(_Sampler([proc]), 1000.0)
+
+    # A stray tick of CPU and a few pages of RSS; the disk payload and the section change too
+    store.publish('disk-info', [{'mounted': '/', 'use_percent': '41%'}])
+    store.publish('alerts-active', {'active': [{'series': 'cpu.percent'}]})
+    second = recorder.capture(_Sampler([dict(proc, cpu=0.3, rss_bytes=104857600 + 3 * 4096)]), 1005.0)
+    changes = diff(first, second)
+    assert set(changes['p']) == {'snapshots'} and changes['s'] == {'time': 1005.0}
+    assert changes['p']['snapshots'] == {'p': {'alerts-active': {'s': {'active': [{'series': 'cpu.percent'}]}}}}
+
+    # A minute on, the slow parts are read again
+    third = recorder.capture(_Sampler([proc]), 1060.0)
+    assert third['sections'] == {'cgroups': 2}
+    assert third['snapshots']['disk-info'] == [{'mounted': '/', 'use_percent': '41%'}]
@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+
+from web_modules.recorder import FlightRecorder
+from web_modules.result_cache import ResultCache
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports the app with LSMD_REPLAY set, so it runs in its own interpreter
+CLIENT = '''
+import json, sys, threading
+sys.path.insert(0, sys.argv[1])
+from web_app.app import app
+
+def names(client, at):
+    return [proc['name'] for proc in client.get(f'/api/processes?at={at}').get_json()]
+
+client = app.test_client()
+sequence = [(at, client.get(f'/api/processes?at={at}').headers['X-Replay-Time'], names(client, at))
+            for at in (1500, 2500, 1500)]
+mixed = []
+
+def worker(at, expected):
+    own = app.test_client()
+    for _ in range(50):
+        got = names(own, at)
+        if got != [expected]:
+            mixed.append(got)
+
+threads = [threading.Thread(target=worker, args=args) for args in ((1500, 'alpha'), (2500, 'beta'))]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(json.dumps({'sequence': sequence, 'mixed': len(mixed)}))
+'''
+
+
+def _process(pid, name):
+    return {'pid': pid, 'ppid': 1, 'name': name, 'state': 'S', 'uid': 0, 'user': 'root',
+            'start_ticks': pid, 'rss_bytes': 4096, 'cpu': 1.0, 'memory': 0.1}
+
+
+def test_replayed_process_list_follows_the_requested_time(tmp_path):
+    path = str(tmp_path / 'flight.rec')
+    recorder = FlightRecorder(path)
+    for when, name in ((1000.0, 'alpha'), (2000.0, 'beta')):
+        recorder.write({'time': when, 'metrics': {'cpu.percent': 1.0}, 'rates': None,
+                        'processes': {'10': _process(10, name)}, 'sections': {}, 'snapshots': {}}, when)
+    recorder._file.close()
+
+    env = dict(os.environ, LSMD_REPLAY=path, LSMD_PROBE='0')
+    output = subprocess.run([sys.executable, '-c', CLIENT, PROJECT_ROOT], env=env, cwd=str(tmp_path),
+                            capture_output=True, text=True, timeout=60, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    assert [[at, names] for at, _, names in result['sequence']] == [
+        [1500, ['alpha']], [2500, ['beta']], [1500, ['alpha']]]
+    assert result['mixed'] == 0
+
+
+def test_invalidate_without_operations_drops_everything():
+    cache = ResultCache()
+    calls = []
+    for operation in ('processes', 'users'):
+        cache.get(operation, (), 60, lambda: calls.append(operation) or [operation])
+    cache.invalidate()
+    for operation in ('processes', 'users'):
+        cache.get(operation, (), 60, lambda: calls.append(operation) or [operation])
+    assert calls == ['processes', 'users', 'processes', 'users']
@@ -0,0 +1,66 @@
+import os
+import resource
+import subprocess
+
+import pytest
+
+from web_modules.process_tracker import ProcessTracker
+from web_modules.signaller import FD_RESERVE, ProcessSignaller
+
+
+@pytest.fixture
+def sleepers():
+    children = []
+
+    def spawn(count):
+        children.extend(subprocess.Popen(['sleep', '60']) for _ in range(count))
+        return [child.pid for child in children]
+
+    yield spawn
+    for child in children:
+        child.kill()
+        child.wait()
+
+
+def test_terminates_every_selected_process(sleepers):
+    pids = sleepers(20)
+    result = ProcessSignaller(ProcessTracker('/proc')).signal({'pids': pids}, 'TERM', timeout=5)
+    assert result['summary'] == {'exited': 20}
+    assert all(entry['signals'] == ['TERM'] for entry in result['results'])
+
+
+def test_signals_past_the_open_file_limit(sleepers):
+    pids = sleepers(150)
+    signaller = ProcessSignaller(ProcessTracker('/proc'))
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    # Room for 50 pidfds; the other 100 targets must still be signalled
+    low = len(os.listdir('/proc/self/fd')) + FD_RESERVE + 50
+    resource.setrlimit(resource.RLIMIT_NOFILE, (low, hard))
+    try:
+        result = signaller.signal({'pids': pids}, 'TERM', timeout=5)
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+    assert result['summary'] == {'exited': 150}
+
+
+def test_a_recycled_pid_is_not_signalled(sleepers):
+    pid = sleepers(1)[0]
+    signaller = ProcessSignaller(ProcessTracker('/proc'))
+    proc = signaller.select(pids=[pid])[0]
+    stale = dict(proc, start_ticks=proc['start_ticks'] - 1)
+    results, targets = {}, {}
+    signaller._add([stale], results, targets)
+    assert results[pid]['outcome'] == 'gone'
+    assert not targets
+
+
+def test_protected_processes_are_left_alone():
+    result = ProcessSignaller(ProcessTracker('/proc')).signal({'pids': [1, os.getpid()]}, 'TERM', timeout=0)
+    assert result['summary'] == {'protected': 2}
+
+
+def test_dry_run_only_lists(sleepers):
+    pids = sleepers(3)
+    result = ProcessSignaller(ProcessTracker('/proc')).signal({'pids': pids}, 'KILL', dry_run=True)
+    assert result['matched'] == 3
+    assert all(ProcessTracker('/proc').read_process(pid) is not None for pid in pids)
@@ -0,0 +1,80 @@
+from collections import namedtuple
+
+import pytest
+
+from benchmarks.synthetic_host import build_procfs
+from web_modules import rates as rates_module
+from web_modules import terminal
+from web_modules.process_tracker import ProcessTracker
+from web_modules.rates import RateEngine
+
+DiskIO = namedtuple('DiskIO', 'read_count write_count read_bytes write_bytes read_time write_time busy_time')
+NicIO = namedtuple('NicIO', 'bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout')
+CpuTimes = namedtuple('CpuTimes', 'user nice system idle iowait irq softirq steal guest guest_nice')
+
+
+class FakeSampler:
+    interval = 5.0
+    detail = 'full'
+    timestamp = 1000.0
+
+    def __init__(self, rates):
+        self.metrics = {'cpu.percent': 12.5, 'memory.percent': 40.0, 'disk./.percent': 55.0}
+        self.rates = rates
+
+
+def sampled_rates(monkeypatch):
+    """RateEngine.latest() after two reads one second apart of fixed counters"""
+    readings = iter([(0, 0), (1, 4 * 1024 * 1024)])
+    engine = RateEngine()
+    for now in (100.0, 101.0):
+        step, volume = next(readings)
+        monkeypatch.setattr(rates_module.psutil, 'disk_io_counters', lambda perdisk: {
+            'vda': DiskIO(step * 10, step * 20, volume, volume * 2, step * 5, step * 5, step * 300)})
+        monkeypatch.setattr(rates_module.psutil, 'net_io_counters', lambda pernic: {
+            'eth0': NicIO(volume // 2, volume, step, step, 0, 0, 0, 0)})
+        monkeypatch.setattr(rates_module.psutil, 'cpu_times', lambda percpu: [
+            CpuTimes(step * 30, 0, step * 10, 100 + step * 60, 0, 0, 0, 0, 0, 0)])
+        engine.sample(now)
+    return engine.latest()
+
+
+def test_renders_rate_engine_output(monkeypatch, tmp_path):
+    proc_root = str(tmp_path / 'proc')
+    build_procfs(proc_root, 20)
+    view = terminal.build_view(FakeSampler(sampled_rates(monkeypatch)), ProcessTracker(proc_root), limit=5)
+
+    system = '\n'.join(terminal.render_system(view))
+    assert 'NIC' in system
+    eth0 = next(line for line in system.splitlines() if line.startswith('eth0'))
+    assert eth0.split()[1:] == ['4.0M', '2.0M']
+
+    disks = '\n'.join(terminal.render_disks(view))
+    vda = next(line for line in disks.splitlines() if line.startswith('vda'))
+    assert vda.split()[1:3] == ['4.0M', '8.0M']
+    assert '55.0%' in disks
+
+    processes = terminal.render_processes(view)
+    assert processes[0] == '20 processes, by cpu'
+    assert len(processes) == 3 + 5
+
+
+def test_status_line(monkeypatch, tmp_path):
+    proc_root = str(tmp_path / 'proc')
+    build_procfs(proc_root, 5)
+    view = terminal.build_view(FakeSampler(None), ProcessTracker(proc_root))
+    assert terminal.render_status(view) == ('🖥️ CPU: 12.5% | 🧠 Memory: 40.0% | 💾 Disk: 55.0% | '
+                                            '⏰ Uptime: 1 day')
+
+
+def test_view_never_resamples_processes(monkeypatch, tmp_path):
+    proc_root = str(tmp_path / 'proc')
+    build_procfs(proc_root, 5)
+    tracker = ProcessTracker(proc_root)
+    tracker.sample()
+    taken, processes, rollup = tracker.snapshot()
+    # A minute-old sample, as with reduced detail or a widened interval
+    tracker._snapshot = (taken - 60.0, processes, rollup)
+    monkeypatch.setattr(tracker, 'sample', lambda *args, **kwargs: pytest.fail('sampled on the request path'))
+    view = terminal.build_view(FakeSampler(None), tracker)
+    assert view['processes']['total'] == 5
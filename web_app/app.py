@@ -4,25 +4,96 @@ LSMD Web Dashboard - Flask Backend using Shell Scripts
 Updated with System Health endpoint and better error handling
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response, g
 import subprocess
 import json
 import os
+import re
+import sys
+import threading
+import time
 import psutil
 from datetime import datetime
+from werkzeug.serving import WSGIRequestHandler, is_running_from_reloader, make_server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from web_modules import anomaly, terminal, wire_format
+from web_modules.cgroups import CgroupCollector, SORT_KEYS as CGROUP_SORT_KEYS
+from web_modules.backend_router import BackendRouter
+from web_modules.capabilities import CapabilityProbe
+from web_modules.alerts import AlertEngine, Rule, LogFileSink, WebhookSink
+from web_modules.dashboard import DashboardAssembler, DashboardSection
+from web_modules.disk_monitor import DuplicateScan
+from web_modules.connections import ConnectionTable, PROTOCOLS as CONNECTION_PROTOCOLS
+from web_modules.config import load_config, get_bool, get_float, resolve_path
+from web_modules.logs import LogViewer, parse_config as parse_log_config, parse_time
+from web_modules.overhead import OverheadBudget
+from web_modules.perf import registry as perf, SamplingProfiler
+from web_modules.process_tracker import ProcessTracker, SORT_KEYS as PROCESS_SORT_KEYS, GROUP_KEYS, TABLE_SORT_KEYS
+from web_modules.rates import RateEngine
+from web_modules.recorder import FlightRecorder, Recording, process_rows
+from web_modules.result_cache import ResultCache, cached
+from web_modules.signaller import ProcessSignaller
+from web_modules.sampler import Sampler
+from web_modules.snapshots import SnapshotStore
 
 app = Flask(__name__)
+config = load_config()
+# Set LSMD_SAMPLER=0 to serve requests without the background sampler
+app.config['LSMD_SAMPLER'] = os.environ.get('LSMD_SAMPLER', '1') != '0'
+# Set LSMD_PROBE=0 to skip probing tools and module scripts
+app.config['LSMD_PROBE'] = os.environ.get('LSMD_PROBE', '1') != '0'
+# Set LSMD_REPLAY=logs/flight.rec to serve a flight recording instead of this host
+replay = Recording(os.environ['LSMD_REPLAY']) if os.environ.get('LSMD_REPLAY') else None
+if replay is not None:
+    app.config['LSMD_SAMPLER'] = False
+    app.config['LSMD_PROBE'] = False
 
 class ShellSystemManager:
-    def __init__(self):
+    def __init__(self, proc_root=None, passwd_file=None, scan_root=None, cgroup_root=None):
         self.modules_dir = "modules"
+        # Alternate roots let the collectors run against a synthetic host;
+        # the shell scripts always read the real system, so they are skipped
+        self.proc_root = proc_root
+        self.passwd_file = passwd_file
+        self.scan_root = scan_root
+        self.process_tracker = ProcessTracker(proc_root or "/proc", passwd_file)
+        # Fed by the background sampler; health reads its latest rates
+        self.rate_engine = RateEngine()
+        self.cgroups = CgroupCollector(cgroup_root or "/sys/fs/cgroup", proc_root or "/proc")
+        self.connections = ConnectionTable(proc_root or "/proc", self.process_tracker)
+        self.capabilities = CapabilityProbe(self.modules_dir)
+        self.router = self._build_router()
+        # Identical concurrent reads share one run; mutations below invalidate
+        self.cache = ResultCache()
     
-    def run_module(self, module, action, param=None):
+    def _build_router(self):
+        """Shell script first, then the Python implementations of each read"""
+        router = BackendRouter()
+        # The router's circuit breaker decides when to retry these, so they skip the probe's gate
+        router.register('system-info', 'shell',
+                        lambda: self._convert_system_info(self.run_module('system', 'info', gated=False)))
+        router.register('system-info', 'psutil',
+                        lambda: self._convert_system_info(self._get_system_info_fallback()))
+        router.register('processes', 'shell', lambda: self.run_module('processes', 'list', gated=False))
+        router.register('processes', 'procfs', lambda: self.process_tracker.top(20))
+        router.register('processes', 'psutil', self._get_process_list_fallback)
+        router.register('disk-info', 'shell', lambda: self.run_module('disk', 'usage', gated=False))
+        router.register('disk-info', 'psutil', self._get_disk_info_fallback)
+        router.register('users', 'shell', lambda: self.run_module('users', 'list', gated=False))
+        router.register('users', 'passwd', self._get_users_fallback)
+        return router
+    
+    def run_module(self, module, action, param=None, gated=True):
         """Execute a module script and return JSON result"""
         try:
             script_path = os.path.join(self.modules_dir, f"{module}.sh")
             if not os.path.exists(script_path):
                 return {'error': f'Module {module} not found'}
+            # Go straight to the fallback for actions the startup probe saw fail for good
+            if gated and not self.capabilities.module_ok(module, action):
+                return {'error': f'Module {module} {action} unavailable: {self.capabilities.module_error(module, action)}'}
             
             # Make sure script is executable
             os.chmod(script_path, 0o755)
@@ -31,17 +102,18 @@ class ShellSystemManager:
             if param:
                 cmd.append(str(param))
             
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            print(f"Running: {' '.join(cmd)}")  # Debug
-            print(f"Output: {result.stdout}")   # Debug
-            if result.stderr:
-                print(f"Error: {result.stderr}")    # Debug
+            start = time.perf_counter()
+            try:
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    timeout=30
+                )
+            except subprocess.TimeoutExpired:
+                perf.record_subprocess(module, time.perf_counter() - start, False)
+                raise
+            perf.record_subprocess(module, time.perf_counter() - start, result.returncode == 0)
             
             if result.returncode == 0:
                 try:
@@ -57,13 +129,9 @@ class ShellSystemManager:
             return {'error': str(e)}
     
     # System Information
+    @perf.collector('system-info')
     def get_system_info(self):
-        # Use the system.sh script
-        result = self.run_module('system', 'info')
-        if 'error' in result:
-            # Fallback to direct Python implementation
-            return self._get_system_info_fallback()
-        return self._convert_system_info(result)
+        return self.router.call('system-info')
     
     def _get_system_info_fallback(self):
         """Fallback system info using Python"""
@@ -122,11 +190,13 @@ class ShellSystemManager:
         return data
 
     # Process Management
-    def get_process_list(self):
-        result = self.run_module('processes', 'list')
-        if 'error' in result:
-            return self._get_process_list_fallback()
-        return result
+    @cached('processes', ttl=2)
+    @perf.collector('processes')
+    def get_process_list(self, sort=None):
+        # processes.sh only sorts by CPU; other orders come from procfs
+        if self.proc_root or sort or self.process_tracker.frozen:
+            return self.process_tracker.top(20, sort or 'cpu')
+        return self.router.call('processes')
     
     def _get_process_list_fallback(self):
         """Fallback process list using Python"""
@@ -152,14 +222,15 @@ class ShellSystemManager:
             return {'error': str(e)}
     
     def kill_process(self, pid):
-        return self.run_module('processes', 'kill', pid)
+        result = self.run_module('processes', 'kill', pid)
+        self.cache.invalidate('processes')
+        return result
     
     # Disk Management
+    @cached('disk-info', ttl=10)
+    @perf.collector('disk-info')
     def get_disk_info(self):
-        result = self.run_module('disk', 'usage')
-        if 'error' in result:
-            return self._get_disk_info_fallback()
-        return result
+        return self.router.call('disk-info')
     
     def _get_disk_info_fallback(self):
         """Fallback disk info using Python"""
@@ -184,7 +255,11 @@ class ShellSystemManager:
         except Exception as e:
             return {'error': str(e)}
     
+    @cached('large-files', ttl=300)
+    @perf.collector('large-files')
     def get_large_files(self):
+        if self.scan_root:
+            return self._get_large_files_fallback()
         result = self.run_module('disk', 'large_files')
         if 'error' in result:
             return self._get_large_files_fallback()
@@ -195,7 +270,7 @@ class ShellSystemManager:
         try:
             large_files = []
             # Simple implementation to find large files
-            for root, dirs, files in os.walk(os.path.expanduser('~')):
+            for root, dirs, files in os.walk(self.scan_root or os.path.expanduser('~')):
                 for file in files:
                     if len(large_files) >= 10:
                         break
@@ -215,8 +290,13 @@ class ShellSystemManager:
     
     # Backup Management
     def create_backup(self):
-        return self.run_module('backup', 'create')
+        result = self.run_module('backup', 'create')
+        # A new archive takes disk space and may be one of the large files
+        self.cache.invalidate('backups', 'disk-info', 'large-files')
+        return result
     
+    @cached('backups', ttl=30)
+    @perf.collector('backups')
     def list_backups(self):
         result = self.run_module('backup', 'list')
         if 'error' in result or not result:
@@ -224,18 +304,24 @@ class ShellSystemManager:
         return result
     
     # User Management
+    @cached('users', ttl=60)
+    @perf.collector('users')
     def get_users(self):
-        result = self.run_module('users', 'list')
-        if 'error' in result:
+        if self.passwd_file:
             return self._get_users_fallback()
-        return result
+        return self.router.call('users')
     
     def _get_users_fallback(self):
         """Fallback users list using Python"""
         try:
             users = []
-            result = subprocess.run(['getent', 'passwd'], capture_output=True, text=True)
-            for line in result.stdout.strip().split('\n'):
+            if self.passwd_file or not self.capabilities.has_tool('getent'):
+                with open(self.passwd_file or '/etc/passwd') as f:
+                    output = f.read()
+            else:
+                with perf.subprocess_timer('getent'):
+                    output = subprocess.run(['getent', 'passwd'], capture_output=True, text=True).stdout
+            for line in output.strip().split('\n'):
                 if line:
                     parts = line.split(':')
                     if len(parts) >= 7:
@@ -253,18 +339,46 @@ class ShellSystemManager:
         except Exception as e:
             return {'error': str(e)}
     
+    def get_current_user(self):
+        """Account details of the user running the dashboard"""
+        try:
+            import getpass
+            import pwd
+            current_user = getpass.getuser()
+            user_info = pwd.getpwnam(current_user)
+            return {
+                'username': current_user,
+                'uid': user_info.pw_uid,
+                'gid': user_info.pw_gid,
+                'home': user_info.pw_dir,
+                'shell': user_info.pw_shell
+            }
+        except Exception as e:
+            return {'error': str(e)}
+    
     def create_user(self, username):
-        return self.run_module('users', 'add', username)
+        result = self.run_module('users', 'add', username)
+        self.cache.invalidate('users')
+        return result
     
     def delete_user(self, username):
-        return self.run_module('users', 'delete', username)
+        result = self.run_module('users', 'delete', username)
+        self.cache.invalidate('users')
+        return result
     
     # System Health - Comprehensive system information
+    @perf.collector('system-health')
     def get_system_health(self):
         """Get comprehensive system health information"""
         try:
+            # Rates come from the sampler; only block on a CPU sample before it has run
+            rates = self.rate_engine.latest()
+            
             # CPU information
-            cpu_percent = psutil.cpu_percent(interval=1)
+            if rates and rates['cpu']:
+                cpu_percent = rates['cpu']['total']['busy']
+            else:
+                cpu_percent = psutil.cpu_percent(interval=1)
             cpu_cores = psutil.cpu_count()
             cpu_freq = psutil.cpu_freq()
             
@@ -287,6 +401,8 @@ class ShellSystemManager:
                 'cpu': {
                     'percent': cpu_percent,
                     'cores': cpu_cores,
+                    'breakdown': rates['cpu'].get('total', {}) if rates else {},
+                    'per_core': rates['cpu'].get('per_core', []) if rates else [],
                     'frequency': {
                         'current': cpu_freq.current if cpu_freq else 0,
                         'max': cpu_freq.max if cpu_freq else 0
@@ -307,11 +423,17 @@ class ShellSystemManager:
                     'free': self._bytes_to_gb(disk.free),
                     'percent': disk.percent,
                     'read_bytes': disk_io.read_bytes if disk_io else 0,
-                    'write_bytes': disk_io.write_bytes if disk_io else 0
+                    'write_bytes': disk_io.write_bytes if disk_io else 0,
+                    'read_bytes_per_sec': sum(d['read_bytes_per_sec'] for d in rates['disks'].values()) if rates else 0,
+                    'write_bytes_per_sec': sum(d['write_bytes_per_sec'] for d in rates['disks'].values()) if rates else 0,
+                    'devices': rates['disks'] if rates else {}
                 },
                 'network': {
                     'bytes_sent': net_io.bytes_sent if net_io else 0,
-                    'bytes_recv': net_io.bytes_recv if net_io else 0
+                    'bytes_recv': net_io.bytes_recv if net_io else 0,
+                    'bytes_sent_per_sec': sum(n['bytes_sent_per_sec'] for n in rates['network'].values()) if rates else 0,
+                    'bytes_recv_per_sec': sum(n['bytes_recv_per_sec'] for n in rates['network'].values()) if rates else 0,
+                    'interfaces': rates['network'] if rates else {}
                 },
                 'system': {
                     'uptime': str(uptime).split('.')[0],
@@ -340,7 +462,288 @@ class ShellSystemManager:
             bytes /= 1024.0
         return f"{bytes:.2f} PB"
 
-system_manager = ShellSystemManager()
+system_manager = ShellSystemManager(
+    proc_root=os.environ.get('LSMD_PROC_ROOT'),
+    passwd_file=os.environ.get('LSMD_PASSWD_FILE'),
+    scan_root=os.environ.get('LSMD_SCAN_ROOT'),
+    cgroup_root=os.environ.get('LSMD_CGROUP_ROOT')
+)
+snapshots = SnapshotStore()
+sampler_interval = get_float(config, 'SAMPLER_INTERVAL', 5.0)
+sampler_budget = OverheadBudget(get_float(config, 'SAMPLER_BUDGET_PERCENT', 1.0), sampler_interval,
+                                get_float(config, 'SAMPLER_MAX_INTERVAL', 60.0))
+sampler = Sampler(snapshots, interval=sampler_interval,
+                  process_tracker=system_manager.process_tracker,
+                  rate_engine=system_manager.rate_engine,
+                  budget=sampler_budget)
+
+def build_alert_engine():
+    """Create the alert engine from the rules and sinks in lsmd_config.sh"""
+    rules = []
+    for text in config.get('ALERT_RULES', '').split(';'):
+        if text.strip():
+            try:
+                rules.append(Rule(text))
+            except ValueError as e:
+                print(f"Skipping alert rule: {e}")
+    
+    engine = AlertEngine(
+        rules,
+        notify_firing=get_bool(config, 'SHOW_ERROR_NOTIFICATIONS', True),
+        notify_resolved=get_bool(config, 'SHOW_SUCCESS_NOTIFICATIONS', True)
+    )
+    if config.get('ALERT_LOG_FILE'):
+        engine.add_sink(LogFileSink(resolve_path(config['ALERT_LOG_FILE'])))
+    if config.get('ALERT_WEBHOOK_URL'):
+        engine.add_sink(WebhookSink(config['ALERT_WEBHOOK_URL']))
+    return engine
+
+if system_manager.cgroups.unified_root():
+    sampler.add_listener(system_manager.cgroups.update)
+
+alert_engine = build_alert_engine()
+log_viewer = LogViewer({name: resolve_path(path) for name, path in parse_log_config(
+    config.get('LOG_FILES', 'lsmd=./logs/lsmd.log; backup=./logs/backup_logs.txt')).items()})
+sampler.add_listener(alert_engine.evaluate)
+process_signaller = ProcessSignaller(system_manager.process_tracker, system_manager.cgroups)
+# While an alert fires the sampler runs at full rate whatever it costs
+sampler_budget.urgent = lambda: bool(alert_engine.active)
+
+# Records every tick; payloads nobody polls are refreshed once a minute
+recorder = None
+if replay is None and get_bool(config, 'FLIGHT_RECORDER', True):
+    recorder = FlightRecorder(
+        resolve_path(config.get('FLIGHT_RECORDER_FILE', './logs/flight.rec')),
+        snapshots,
+        max_bytes=int(get_float(config, 'FLIGHT_RECORDER_MAX_MB', 100) * 1024 * 1024),
+        refreshers={
+            'system-info': system_manager.get_system_info,
+            'disk-info': system_manager.get_disk_info,
+            'system-health': system_manager.get_system_health,
+            'users': system_manager.get_users,
+            'alerts-active': lambda: alert_engine.get_alerts('active')
+        },
+        sections={'cgroups': system_manager.cgroups.latest}
+    )
+    sampler.add_listener(recorder.record)
+
+# Created with the sampler so importing numpy stays off the startup path
+anomaly_detector = None
+
+def start_anomaly_detection():
+    global anomaly_detector
+    detector = anomaly.AnomalyDetector()
+    sampler.add_listener(detector.update)
+    anomaly_detector = detector
+
+def sampler_metrics():
+    return dict(sampler.metrics) if sampler.metrics else {'error': 'Sampler has not run yet'}
+
+def latest_rates():
+    return system_manager.rate_engine.latest() or {'error': 'Rates are available after two sampler ticks'}
+
+# Sections share snapshot names with their /api/* routes, so either one
+# refreshing a payload serves the other
+dashboard = DashboardAssembler(snapshots, [
+    DashboardSection('system', 'system-info', 3, system_manager.get_system_info),
+    DashboardSection('health', 'system-health', 5, system_manager.get_system_health),
+    DashboardSection('processes', 'processes', 5, system_manager.get_process_list),
+    DashboardSection('disks', 'disk-info', 10, system_manager.get_disk_info),
+    DashboardSection('large_files', 'large-files', 300, system_manager.get_large_files),
+    DashboardSection('backups', 'backups', 30, system_manager.list_backups),
+    DashboardSection('users', 'users', 60, system_manager.get_users),
+    DashboardSection('current_user', 'users-current', 300, system_manager.get_current_user),
+    DashboardSection('metrics', 'system-metrics', sampler.interval * 2, sampler_metrics),
+    DashboardSection('rates', 'rates', sampler.interval * 2, latest_rates),
+    DashboardSection('alerts', 'alerts-active', 5, lambda: alert_engine.get_alerts('active')),
+])
+
+if replay is not None:
+    # Sections come only from the recording; nothing is collected live
+    dashboard.live = False
+
+# Fields the page needs on first load
+DASHBOARD_DEFAULT_FIELDS = ['system', 'health', 'processes', 'disks', 'backups', 'users', 'current_user']
+
+def api_response(name, data):
+    """Publish data as a snapshot and return it in the negotiated wire format"""
+    snapshot = snapshots.publish(name, data)
+    fmt = wire_format.negotiate_format(request.accept_mimetypes, request.args.get('format'))
+    encoding = wire_format.negotiate_encoding(request.accept_encodings)
+    
+    def encoder(payload):
+        return wire_format.compress(wire_format.encode(payload, fmt), encoding)
+    
+    body, applied = snapshots.encoded(snapshot, fmt, encoding, encoder)
+    response = Response(body, mimetype=wire_format.FORMAT_MIMETYPES[fmt])
+    if applied:
+        response.headers['Content-Encoding'] = applied
+    response.headers['Vary'] = 'Accept, Accept-Encoding'
+    response.headers['X-Snapshot-Generation'] = str(snapshot.generation)
+    return response
+
+# Background sampling starts with the first request, so only the serving
+# process (not the debug reloader's watcher) runs it
+_background_lock = threading.Lock()
+
+def start_background():
+    with _background_lock:
+        if app.config['LSMD_PROBE']:
+            system_manager.capabilities.start()
+        if replay is None and not system_manager.router.is_running():
+            # Times the backends requests are not routed to yet
+            system_manager.router.start()
+        if app.config['LSMD_SAMPLER'] and not sampler.is_running():
+            if anomaly.available() and anomaly_detector is None:
+                threading.Thread(target=start_anomaly_detection, name='lsmd-anomaly', daemon=True).start()
+            sampler.start()
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Skips the access log; the terminal client polls every second"""
+    
+    def log_request(self, code='-', size='-'):
+        pass
+
+def start_local_socket():
+    """Also serve the API on the Unix socket CLI_SOCKET, for the terminal client"""
+    path = config.get('CLI_SOCKET', terminal.DEFAULT_SOCKET)
+    if not path:
+        return None
+    path = resolve_path(path)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # The socket reaches the whole API, so only this user may connect
+        previous = os.umask(0o177)
+        try:
+            server = make_server('unix://' + path, 0, app, threaded=True, request_handler=QuietRequestHandler)
+        finally:
+            os.umask(previous)
+    except (OSError, SystemExit) as e:
+        # make_server reports a failed bind and exits
+        print(f"Terminal client socket {path} unavailable: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name='lsmd-socket', daemon=True).start()
+    print(f"Terminal client socket: {path}")
+    return server
+
+# Startup timing, reported by /api/debug/startup
+startup = {
+    'process_start': psutil.Process().create_time(),
+    'ready_ms': None,
+    'first_response_ms': None
+}
+
+# Instrumentation
+@app.before_request
+def start_request_timer():
+    if not sampler.is_running():
+        start_background()
+    g.request_start = time.perf_counter()
+    g.profiler = None
+    if request.args.get('profile') == '1':
+        g.profiler = SamplingProfiler(interval=0.001, thread_id=threading.get_ident()).start()
+
+# Paths answered straight from a recorded payload while replaying
+REPLAY_SNAPSHOTS = {
+    '/api/system-info': 'system-info',
+    '/api/disk-info': 'disk-info',
+    '/api/large-files': 'large-files',
+    '/api/backups': 'backups',
+    '/api/users': 'users',
+    '/api/users/current': 'users-current',
+    '/api/system-health': 'system-health',
+    '/api/rates': 'rates',
+}
+
+# None follows the end of the recording
+replay_position = {'at': None, 'loaded': None}
+# Replayed requests load their tick into shared state (tracker, sampler,
+# snapshots, result cache), so they run one at a time
+_replay_lock = threading.Lock()
+
+def load_replay_state(state):
+    """Point the process views, sampler state and snapshot store at one recorded tick"""
+    if replay_position['loaded'] is state:
+        return
+    system_manager.process_tracker.freeze(process_rows(state))
+    # Cached results belong to the tick loaded before
+    system_manager.cache.invalidate()
+    sampler.metrics = state['metrics']
+    sampler.rates = state['rates']
+    system_manager.cgroups.load(state['sections'].get('cgroups'))
+    for name, data in state['snapshots'].items():
+        snapshots.publish(name, data)
+    snapshots.publish('system-metrics', state['metrics'])
+    if state['rates']:
+        snapshots.publish('rates', state['rates'])
+    snapshots.publish('processes', system_manager.process_tracker.top(20))
+    replay_position['loaded'] = state
+
+@app.before_request
+def serve_replay():
+    """While replaying, answer as of the replay position, or ?at=, from the recording"""
+    if replay is None or not request.path.startswith('/api/') or request.path.startswith(('/api/replay', '/api/debug')):
+        return None
+    if request.method != 'GET':
+        return jsonify({'error': 'Replaying a recording: changes are disabled'}), 409
+    # Held until teardown, so the view reads the tick this request loaded
+    _replay_lock.acquire()
+    g.replay_locked = True
+    try:
+        at = parse_time(request.args['at']) if request.args.get('at') else replay_position['at']
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    state = replay.state_at(at if at is not None else float('inf'))
+    if state is None:
+        return jsonify({'error': 'The recording starts after that time'}), 404
+    load_replay_state(state)
+    g.replay_time = state['time']
+    
+    if request.path == '/api/cgroups' and (request.args.get('pid') or not state['sections'].get('cgroups')):
+        return jsonify({'error': 'cgroups were not recorded'}), 404
+    if request.path == '/api/connections':
+        return jsonify({'error': 'connections were not recorded'}), 404
+    name = REPLAY_SNAPSHOTS.get(request.path)
+    if request.path == '/api/alerts':
+        name = f"alerts-{request.args.get('view') or 'all'}"
+    if name is None:
+        return None
+    data = state['rates'] if name == 'rates' else state['snapshots'].get(name)
+    if data is None:
+        return jsonify({'error': f'{name} was not recorded'}), 404
+    return api_response(name, data)
+
+@app.after_request
+def record_request_timer(response):
+    if startup['first_response_ms'] is None:
+        startup['first_response_ms'] = round((time.time() - startup['process_start']) * 1000, 1)
+        print(f"First response {startup['first_response_ms']} ms after process start")
+    
+    start = g.get('request_start')
+    if start is not None:
+        rule = request.url_rule.rule if request.url_rule else 'unmatched'
+        perf.record_route(f"{request.method} {rule}", time.perf_counter() - start)
+    
+    profiler = g.get('profiler')
+    if profiler is not None:
+        g.profiler = None
+        response = Response(profiler.stop(), mimetype='text/plain')
+        response.headers['Content-Disposition'] = 'attachment; filename=profile.folded'
+    if g.get('replay_time') is not None:
+        response.headers['X-Replay-Time'] = datetime.fromtimestamp(g.replay_time).isoformat()
+    return response
+
+@app.teardown_request
+def stop_request_profiler(exc):
+    # Requests that failed before after_request still own a sampler thread
+    profiler = g.get('profiler')
+    if profiler is not None:
+        profiler.stop()
+
+@app.teardown_request
+def release_replay(exc):
+    if g.pop('replay_locked', False):
+        _replay_lock.release()
 
 # Routes
 @app.route('/')
@@ -350,12 +753,46 @@ def index():
 @app.route('/api/system-info')
 def api_system_info():
     data = system_manager.get_system_info()
-    return jsonify(data)
+    return api_response('system-info', data)
 
 @app.route('/api/processes')
 def api_processes():
-    data = system_manager.get_process_list()
-    return jsonify(data)
+    sort = request.args.get('sort')
+    group = request.args.get('group')
+    if group:
+        # Rollups sum cpu and memory, so only those two orders apply
+        if group not in GROUP_KEYS:
+            return jsonify({'error': f"group must be one of {', '.join(GROUP_KEYS)}"}), 400
+        if sort not in (None, 'cpu', 'memory'):
+            return jsonify({'error': 'grouped views sort by cpu or memory'}), 400
+        data = system_manager.process_tracker.groups(group, sort or 'cpu')
+        return api_response(f'processes-by-{group}-{sort or "cpu"}', data)
+    if sort and sort not in PROCESS_SORT_KEYS:
+        return jsonify({'error': f"sort must be one of {', '.join(PROCESS_SORT_KEYS)}"}), 400
+    data = system_manager.get_process_list(sort)
+    return api_response(f'processes-{sort}' if sort else 'processes', data)
+
+@app.route('/api/processes/table')
+def api_process_table():
+    """Every process, paged: ?offset=&limit= (0 for all)&sort=&order=asc|desc&q="""
+    sort = request.args.get('sort', 'cpu')
+    if sort not in TABLE_SORT_KEYS:
+        return jsonify({'error': f"sort must be one of {', '.join(TABLE_SORT_KEYS)}"}), 400
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = max(request.args.get('limit', 500, type=int), 0)
+    descending = request.args.get('order', 'desc') != 'asc'
+    data = system_manager.process_tracker.table(offset, limit, sort, descending, request.args.get('q'))
+    return api_response('processes-table', data)
+
+@app.route('/api/processes/tree')
+def api_process_tree():
+    """Children of ?pid= (or the root processes) with subtree totals"""
+    pid = request.args.get('pid', type=int)
+    sort = request.args.get('sort', 'cpu')
+    if sort not in ('cpu', 'memory'):
+        return jsonify({'error': 'sort must be cpu or memory'}), 400
+    data = system_manager.process_tracker.tree(pid, sort)
+    return api_response(f'processes-tree-{pid}-{sort}', data)
 
 @app.route('/api/kill-process', methods=['POST'])
 def api_kill_process():
@@ -366,20 +803,88 @@ def api_kill_process():
     result = system_manager.kill_process(pid)
     return jsonify(result)
 
+@app.route('/api/processes/signal', methods=['POST'])
+def api_processes_signal():
+    """Signal processes chosen by pids, name, user, cgroup or tree (a subtree root)"""
+    # TERM, INT, HUP and QUIT escalate to KILL after timeout seconds unless escalate
+    # is false; sweep stops the matches first and picks up their forks; dry_run only lists
+    data = request.get_json(silent=True) or {}
+    selectors = {key: data.get(key) for key in ('pids', 'name', 'user', 'cgroup', 'tree')}
+    try:
+        result = process_signaller.signal(
+            selectors,
+            data.get('signal', 'TERM'),
+            timeout=min(max(float(data.get('timeout', 5)), 0), 60),
+            escalate=bool(data.get('escalate', True)),
+            kill_timeout=min(max(float(data.get('kill_timeout', 2)), 0), 30),
+            sweep=bool(data.get('sweep', False)),
+            dry_run=bool(data.get('dry_run', False))
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    if not result.get('dry_run'):
+        system_manager.cache.invalidate('processes')
+    return jsonify(result)
+
+@app.route('/api/connections')
+def api_connections():
+    """Sockets with their processes: ?protocol=tcp,udp6&state=&port=&pid=&host=&limit=&top="""
+    protocols = [protocol for protocol in request.args.get('protocol', '').split(',') if protocol]
+    unknown = [protocol for protocol in protocols if protocol not in CONNECTION_PROTOCOLS]
+    if unknown:
+        return jsonify({'error': f"protocol must be among {', '.join(CONNECTION_PROTOCOLS)}"}), 400
+    limit = min(max(request.args.get('limit', 100, type=int), 0), 10000)
+    top = min(max(request.args.get('top', 10, type=int), 1), 100)
+    data = system_manager.connections.query(protocols or None, request.args.get('state'),
+                                            request.args.get('port', type=int), request.args.get('pid', type=int),
+                                            request.args.get('host'), limit, top)
+    return api_response('connections', data)
+
 @app.route('/api/disk-info')
 def api_disk_info():
     data = system_manager.get_disk_info()
-    return jsonify(data)
+    return api_response('disk-info', data)
 
 @app.route('/api/large-files')
 def api_large_files():
     data = system_manager.get_large_files()
-    return jsonify(data)
+    return api_response('large-files', data)
+
+# One duplicate scan at a time; the last one is kept so its result can be read
+duplicate_scan = None
+_duplicate_lock = threading.Lock()
+
+@app.route('/api/duplicates', methods=['GET', 'POST', 'DELETE'])
+def api_duplicates():
+    """POST {"path", "min_size_mb", "workers"} starts a duplicate-file scan, GET reports it, DELETE cancels"""
+    global duplicate_scan
+    with _duplicate_lock:
+        if request.method == 'POST':
+            if duplicate_scan is not None and duplicate_scan.running():
+                return jsonify({'error': 'A duplicate scan is already running'}), 409
+            data = request.get_json(silent=True) or {}
+            path = os.path.expanduser(data.get('path') or system_manager.scan_root or '~')
+            if not os.path.isdir(path):
+                return jsonify({'error': f'{path} is not a directory'}), 400
+            try:
+                min_size = int(float(data.get('min_size_mb', 1)) * 1024 * 1024)
+                workers = min(max(int(data.get('workers', 4)), 1), 32)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'min_size_mb and workers must be numbers'}), 400
+            duplicate_scan = DuplicateScan(path, min_size, workers).start()
+            return jsonify(duplicate_scan.status()), 202
+        if duplicate_scan is None:
+            return jsonify({'error': 'No duplicate scan has run; POST to start one'}), 404
+        if request.method == 'DELETE':
+            duplicate_scan.cancel()
+        return jsonify(duplicate_scan.status())
 
 @app.route('/api/backups')
 def api_backups():
     data = system_manager.list_backups()
-    return jsonify(data)
+    return api_response('backups', data)
 
 @app.route('/api/create-backup', methods=['POST'])
 def api_create_backup():
@@ -389,26 +894,15 @@ def api_create_backup():
 @app.route('/api/users')
 def api_users():
     data = system_manager.get_users()
-    return jsonify(data)
+    return api_response('users', data)
 
 @app.route('/api/users/current')
 def api_current_user():
     """Get current user information"""
-    try:
-        import getpass
-        import pwd
-        current_user = getpass.getuser()
-        user_info = pwd.getpwnam(current_user)
-        
-        return jsonify({
-            'username': current_user,
-            'uid': user_info.pw_uid,
-            'gid': user_info.pw_gid,
-            'home': user_info.pw_dir,
-            'shell': user_info.pw_shell
-        })
-    except Exception as e:
-        return jsonify({'error': str(e)})
+    data = system_manager.get_current_user()
+    if 'error' in data:
+        return jsonify(data)
+    return api_response('users-current', data)
 
 @app.route('/api/create-user', methods=['POST'])
 def api_create_user():
@@ -467,7 +961,174 @@ def api_delete_user():
 def api_system_health():
     """Get comprehensive system health information"""
     data = system_manager.get_system_health()
-    return jsonify(data)
+    return api_response('system-health', data)
+
+@app.route('/api/dashboard')
+def api_dashboard():
+    """Several sections in one response, e.g. ?fields=system.cpu,memory,processes.top10,disks"""
+    fields = request.args.get('fields')
+    try:
+        data = dashboard.assemble(fields.split(',') if fields else DASHBOARD_DEFAULT_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return api_response('dashboard', data)
+
+@app.route('/api/terminal')
+def api_terminal():
+    """System, process and disk views for the terminal client, read from the sampler"""
+    sort = request.args.get('sort', 'cpu')
+    if sort not in TABLE_SORT_KEYS:
+        return jsonify({'error': f"sort must be one of {', '.join(TABLE_SORT_KEYS)}"}), 400
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 500)
+    if not sampler.metrics:
+        return jsonify({'error': 'Sampler has not run yet'}), 503
+    return jsonify(terminal.build_view(sampler, system_manager.process_tracker, limit, sort, g.get('replay_time')))
+
+@app.route('/api/rates')
+def api_rates():
+    """Per-disk, per-NIC and per-core rates from the latest sampler tick"""
+    data = system_manager.rate_engine.latest()
+    if data is None:
+        return jsonify({'error': 'Rates are available after two sampler ticks'})
+    return api_response('rates', data)
+
+@app.route('/api/cgroups')
+def api_cgroups():
+    """Per-cgroup usage as top-N leaves and a pruned tree, or one process's cgroup"""
+    pid = request.args.get('pid', type=int)
+    if pid is not None:
+        return jsonify(system_manager.cgroups.for_process(pid))
+    sort = request.args.get('sort', 'cpu')
+    if sort not in CGROUP_SORT_KEYS:
+        return jsonify({'error': f"sort must be one of {', '.join(CGROUP_SORT_KEYS)}"}), 400
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+    data = system_manager.cgroups.tree(sort, limit, request.args.get('processes') == '1')
+    return api_response(f'cgroups-{sort}-{limit}', data)
+
+@app.route('/api/alerts')
+def api_alerts():
+    """Active alerts and alert history; ?view=active or ?view=history"""
+    view = request.args.get('view')
+    data = alert_engine.get_alerts(view)
+    return api_response(f"alerts-{view or 'all'}", data)
+
+@app.route('/api/anomalies')
+def api_anomalies():
+    """Anomaly scores per metric series; ?min_score=3 filters quiet ones"""
+    if anomaly_detector is None:
+        if not anomaly.available():
+            return jsonify({'error': 'Anomaly detection requires numpy'})
+        return jsonify({'error': 'Anomaly detection is starting'})
+    try:
+        min_score = float(request.args.get('min_score', 0))
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({'error': 'min_score and limit must be numbers'}), 400
+    data = anomaly_detector.get_anomalies(min_score, limit)
+    return api_response('anomalies', data)
+
+@app.route('/api/logs')
+def api_logs():
+    """Configured log files with their size and index state"""
+    return jsonify(log_viewer.list_logs())
+
+@app.route('/api/logs/<name>')
+def api_log(name):
+    """?tail=N[&before=offset], ?since=&until= or ?after=offset pages, ?q=regex streams matches"""
+    log = log_viewer.get(name)
+    if log is None:
+        return jsonify({'error': f'Unknown log {name}'}), 404
+    try:
+        since = parse_time(request.args['since']) if request.args.get('since') else None
+        until = parse_time(request.args['until']) if request.args.get('until') else None
+        before = request.args.get('before', type=int)
+        after = request.args.get('after', type=int)
+        limit = min(max(request.args.get('limit', 1000, type=int), 1), 10000)
+        pattern = None
+        if request.args.get('q'):
+            flags = re.MULTILINE | (re.IGNORECASE if request.args.get('case') == 'i' else 0)
+            pattern = re.compile(request.args['q'].encode('utf-8'), flags)
+    except (ValueError, re.error) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if pattern is not None:
+        # One JSON document per chunk so matches show up while the scan continues
+        def stream():
+            for chunk in log.search(pattern, since, until, limit):
+                yield json.dumps(chunk) + '\n'
+        return Response(stream(), mimetype='application/x-ndjson')
+    try:
+        if since is not None or until is not None or after is not None:
+            return jsonify(log.read(since, until, after, limit))
+        tail = min(max(request.args.get('tail', 100, type=int), 1), 10000)
+        return jsonify(log.tail(tail, before))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/debug/perf')
+def api_debug_perf():
+    """Per-route, per-collector and subprocess timing histograms"""
+    return jsonify(perf.snapshot())
+
+@app.route('/api/debug/overhead')
+def api_debug_overhead():
+    """The sampler's own cost against its CPU budget, and how it adapted"""
+    return jsonify(dict(sampler_budget.report(), running=sampler.is_running(), ticks=sampler.ticks))
+
+@app.route('/api/debug/recorder')
+def api_debug_recorder():
+    """Flight recorder file sizes and frame counts"""
+    if recorder is None:
+        return jsonify({'error': 'Flight recorder is off'})
+    return jsonify(recorder.stats())
+
+@app.route('/api/replay', methods=['GET', 'POST'])
+def api_replay():
+    """The recording being replayed; POST {"at": time} moves the replay position"""
+    if replay is None:
+        return jsonify({'error': 'Not replaying; start with LSMD_REPLAY=<recording> or main.py --replay'}), 404
+    if request.method == 'POST':
+        at = (request.get_json(silent=True) or {}).get('at')
+        try:
+            replay_position['at'] = parse_time(str(at)) if at not in (None, 'end') else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    replay.reload()
+    info = replay.info()
+    info['at'] = replay_position['at']
+    state = replay.state_at(info['at'] if info['at'] is not None else float('inf'))
+    info['frame_time'] = state['time'] if state else None
+    return jsonify(info)
+
+@app.route('/api/debug/backends')
+def api_debug_backends():
+    """Backend health, latency and recent routing decisions per operation"""
+    return jsonify(system_manager.router.diagnostics(request.args.get('limit', 50, type=int)))
+
+@app.route('/api/debug/cache')
+def api_debug_cache():
+    """Hit, miss, coalesced and eviction counts per cached read"""
+    return jsonify(system_manager.cache.stats())
+
+@app.route('/api/debug/startup')
+def api_debug_startup():
+    """Time to import the app and to first response, plus the tool/module probe results"""
+    return jsonify(dict(startup, capabilities=system_manager.capabilities.report()))
+
+@app.route('/api/debug/profile')
+def api_debug_profile():
+    """Sample all threads for a while and return collapsed stacks"""
+    try:
+        seconds = min(max(float(request.args.get('seconds', 5)), 0.1), 60)
+        interval = min(max(float(request.args.get('interval_ms', 5)), 1), 1000) / 1000.0
+    except ValueError:
+        return jsonify({'error': 'seconds and interval_ms must be numbers'}), 400
+    
+    profiler = SamplingProfiler(interval=interval).start()
+    time.sleep(seconds)
+    response = Response(profiler.stop(), mimetype='text/plain')
+    response.headers['Content-Disposition'] = 'attachment; filename=profile.folded'
+    return response
 
 @app.route('/health')
 def health_check():
@@ -482,21 +1143,17 @@ def not_found(error):
 def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
+startup['ready_ms'] = round((time.time() - startup['process_start']) * 1000, 1)
+
 if __name__ == '__main__':
     print("Starting LSMD Web Dashboard with Shell Modules...")
     print("Available at: http://localhost:5000")
     
-    # Test if modules work
-    print("Testing modules...")
-    test_result = system_manager.run_module('processes', 'list')
-    print(f"Processes test: {'Success' if 'error' not in test_result else 'Failed'}")
-    
-    # Test system info
-    system_test = system_manager.get_system_info()
-    print(f"System info test: {'Success' if 'error' not in system_test else 'Failed'}")
-    
-    # Test user module
-    user_test = system_manager.run_module('users', 'list')
-    print(f"Users test: {'Success' if 'error' not in user_test else 'Failed'}")
+    # Tools and module scripts are probed in the background; see /api/debug/startup
+    if app.config['LSMD_PROBE']:
+        system_manager.capabilities.start()
+    # With the debug reloader only the serving child takes the socket
+    if is_running_from_reloader():
+        start_local_socket()
     
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -7,9 +7,15 @@ from flask import Flask, render_template, jsonify, request
 import subprocess
 import json
 import os
+import sys
+import time
 import psutil
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from web_modules.perf import registry as perf
+
 app = Flask(__name__)
 
 def run_shell_command(cmd):
@@ -89,13 +95,14 @@ def index():
             }
             
             async function loadDebugInfo() {
-                const response = await fetch('/api/debug');
+                const response = await fetch('/api/debug/perf');
                 const data = await response.json();
-                document.getElementById('debug-info').innerHTML = `
-                    <strong>Scripts Directory:</strong> ${data.scripts_dir}<br>
-                    <strong>Processes Script:</strong> ${data.processes_script}<br>
-                    <strong>Script Output:</strong> <pre>${data.script_output}</pre>
-                `;
+                let html = '<table class="table table-sm"><tr><th>Subprocess</th><th>Count</th><th>Failures</th><th>p50 ms</th><th>p95 ms</th><th>p99 ms</th></tr>';
+                Object.entries(data.subprocesses).forEach(([name, stats]) => {
+                    html += `<tr><td>${name}</td><td>${stats.count}</td><td>${stats.failures}</td><td>${stats.p50_ms}</td><td>${stats.p95_ms}</td><td>${stats.p99_ms}</td></tr>`;
+                });
+                html += '</table>';
+                document.getElementById('debug-info').innerHTML = html;
             }
             
             // Load all data
@@ -106,6 +113,7 @@ def index():
             // Refresh every 5 seconds
             setInterval(loadSystemInfo, 5000);
             setInterval(loadProcesses, 5000);
+            setInterval(loadDebugInfo, 5000);
         </script>
     </body>
     </html>
@@ -138,7 +146,9 @@ def api_processes():
         # Try to use the shell script
         script_path = 'modules/processes.sh'
         if os.path.exists(script_path):
+            start = time.perf_counter()
             result = subprocess.run([script_path, 'list'], capture_output=True, text=True)
+            perf.record_subprocess('processes', time.perf_counter() - start, result.returncode == 0)
             if result.returncode == 0:
                 processes = json.loads(result.stdout)
                 return jsonify(processes)
@@ -163,26 +173,10 @@ def api_processes():
     except Exception as e:
         return jsonify([{'error': str(e)}])
 
-@app.route('/api/debug')
-def api_debug():
-    """Debug information"""
-    scripts_dir = os.listdir('modules') if os.path.exists('modules') else 'No modules directory'
-    processes_script = 'Exists' if os.path.exists('modules/processes.sh') else 'Missing'
-    
-    # Test the processes script
-    script_output = "Not tested"
-    if os.path.exists('modules/processes.sh'):
-        try:
-            result = subprocess.run(['./modules/processes.sh', 'list'], capture_output=True, text=True)
-            script_output = f"Return code: {result.returncode}\nOutput: {result.stdout}\nError: {result.stderr}"
-        except Exception as e:
-            script_output = f"Error: {e}"
-    
-    return jsonify({
-        'scripts_dir': str(scripts_dir),
-        'processes_script': processes_script,
-        'script_output': script_output
-    })
+@app.route('/api/debug/perf')
+def api_debug_perf():
+    """Subprocess timing histograms"""
+    return jsonify(perf.snapshot())
 
 if __name__ == '__main__':
     print("Starting LSMD Debug Dashboard...")
@@ -66,42 +66,14 @@ class LSMDDashboard {
     }
 
     async loadProcesses() {
-        try {
-            const response = await fetch('/api/processes');
-            const processes = await response.json();
-            
-            const tbody = document.getElementById('process-list');
-            tbody.innerHTML = '';
-
-            if (processes.error) {
-                tbody.innerHTML = `<tr><td colspan="8" class="text-center text-danger">${processes.error}</td></tr>`;
-                return;
-            }
-
-            document.getElementById('process-count').textContent = processes.length;
-
-            processes.forEach(proc => {
-                const row = document.createElement('tr');
-                row.innerHTML = `
-                    <td>${proc.pid}</td>
-                    <td>${proc.name}</td>
-                    <td>${proc.username}</td>
-                    <td>${proc.cpu_percent.toFixed(1)}%</td>
-                    <td>${proc.memory_percent.toFixed(1)}%</td>
-                    <td>${proc.memory_mb ? proc.memory_mb.toFixed(1) : '0.0'} MB</td>
-                    <td><span class="badge bg-success">${proc.status}</span></td>
-                    <td>
-                        <button class="btn btn-sm btn-danger" onclick="killProcess(${proc.pid})" title="Kill Process">
-                            <i class="fas fa-skull"></i>
-                        </button>
-                    </td>
-                `;
-                tbody.appendChild(row);
+        // Virtualized table from process_table.js; it patches rows in place on refresh
+        if (!this.processTable) {
+            this.processTable = new ProcessTable(document.getElementById('process-table'), {
+                onKill: pid => killProcess(pid),
+                onCount: total => { document.getElementById('process-count').textContent = total; }
             });
-
-        } catch (error) {
-            console.error('Failed to fetch processes:', error);
         }
+        await this.processTable.refresh();
     }
 
     async loadDiskInfo() {
@@ -0,0 +1,401 @@
+// Virtualized process table
+// Keeps processes in typed-array columns, sorts and filters an index over
+// them, and renders only the rows in view, patching cells keyed by pid.
+// Tables larger than clientLimit are paged from the server instead.
+
+const PROCESS_COLUMNS = [
+    {key: 'pid', label: 'PID'},
+    {key: 'name', label: 'Name'},
+    {key: 'user', label: 'User'},
+    {key: 'cpu', label: 'CPU %'},
+    {key: 'memory', label: 'Memory %'},
+    {key: 'rss_bytes', label: 'RSS'},
+    {key: 'status', label: 'Status'},
+    {key: null, label: 'Actions'}
+];
+
+const NUMERIC_KEYS = ['pid', 'ppid', 'cpu', 'memory', 'rss_bytes'];
+
+class ProcessTable {
+    constructor(container, options = {}) {
+        this.container = container;
+        this.url = options.url || '/api/processes/table';
+        this.rowHeight = options.rowHeight || 36;
+        this.overscan = options.overscan || 10;
+        this.clientLimit = options.clientLimit || 100000;
+        this.pageSize = options.pageSize || 500;
+        this.onKill = options.onKill || (() => {});
+        this.onCount = options.onCount || (() => {});
+
+        this.sortKey = 'cpu';
+        this.descending = true;
+        this.query = '';
+        this.serverMode = false;
+
+        this.capacity = 0;
+        this.count = 0;
+        this.allocate(1024);
+        this.view = new Uint32Array(0);
+        this.viewLength = 0;
+
+        // Server mode: rows [windowStart, windowStart + count) of `matched` are loaded
+        this.total = 0;
+        this.matched = 0;
+        this.windowStart = 0;
+        this.pending = null;
+
+        this.rows = new Map();
+        this.renderScheduled = false;
+        this.build();
+    }
+
+    allocate(capacity) {
+        const grow = (Type, old) => {
+            const array = new Type(capacity);
+            if (old) array.set(old.subarray(0, Math.min(old.length, capacity)));
+            return array;
+        };
+        this.pid = grow(Int32Array, this.pid);
+        this.ppid = grow(Int32Array, this.ppid);
+        this.cpu = grow(Float32Array, this.cpu);
+        this.memory = grow(Float32Array, this.memory);
+        this.rss_bytes = grow(Float64Array, this.rss_bytes);
+        this.name = this.name || [];
+        this.user = this.user || [];
+        this.status = this.status || [];
+        this.searchText = this.searchText || [];
+        this.capacity = capacity;
+    }
+
+    build() {
+        this.container.innerHTML = '';
+        this.table = document.createElement('table');
+        this.table.className = 'table table-hover process-table';
+
+        const thead = document.createElement('thead');
+        thead.className = 'table-dark';
+        const header = document.createElement('tr');
+        this.headers = {};
+        PROCESS_COLUMNS.forEach(column => {
+            const th = document.createElement('th');
+            th.textContent = column.label;
+            if (column.key) {
+                th.dataset.sort = column.key;
+                th.style.cursor = 'pointer';
+                this.headers[column.key] = th;
+            }
+            header.appendChild(th);
+        });
+        thead.appendChild(header);
+        thead.addEventListener('click', event => {
+            const th = event.target.closest('th[data-sort]');
+            if (th) this.setSort(th.dataset.sort);
+        });
+
+        this.tbody = document.createElement('tbody');
+        this.topSpacer = this.spacer();
+        this.bottomSpacer = this.spacer();
+        this.message = document.createElement('tr');
+        this.message.innerHTML = `<td colspan="${PROCESS_COLUMNS.length}" class="text-center">Loading processes...</td>`;
+        this.tbody.append(this.topSpacer, this.message, this.bottomSpacer);
+        this.tbody.addEventListener('click', event => {
+            const button = event.target.closest('button[data-pid]');
+            if (button) this.onKill(parseInt(button.dataset.pid, 10));
+        });
+
+        this.table.append(thead, this.tbody);
+        this.container.appendChild(this.table);
+        this.container.addEventListener('scroll', () => this.scheduleRender(), {passive: true});
+        this.updateHeaders();
+    }
+
+    spacer() {
+        const tr = document.createElement('tr');
+        tr.className = 'process-spacer';
+        tr.innerHTML = `<td colspan="${PROCESS_COLUMNS.length}" style="padding: 0; border: 0;"></td>`;
+        return tr;
+    }
+
+    showMessage(text, className = '') {
+        this.message.firstChild.className = `text-center ${className}`;
+        this.message.firstChild.textContent = text;
+        if (!this.message.parentNode) this.tbody.insertBefore(this.message, this.bottomSpacer);
+    }
+
+    hideMessage() {
+        if (this.message.parentNode) this.message.remove();
+    }
+
+    // --- data -----------------------------------------------------------
+
+    async fetchPage(offset, limit) {
+        const params = new URLSearchParams({offset, limit});
+        if (this.serverMode) {
+            params.set('sort', this.sortKey);
+            params.set('order', this.descending ? 'desc' : 'asc');
+            if (this.query) params.set('q', this.query);
+        }
+        const response = await fetch(`${this.url}?${params}`, {
+            headers: {'Accept': 'application/vnd.lsmd.columnar+json, application/json;q=0.5'}
+        });
+        return response.json();
+    }
+
+    ingest(rows) {
+        // rows arrive as {__count__, __columns__} or, from a plain JSON server, a list
+        let columns = rows && rows.__columns__;
+        let count = rows && rows.__count__;
+        if (Array.isArray(rows)) {
+            count = rows.length;
+            columns = {};
+            ['pid', 'ppid', 'name', 'user', 'cpu', 'memory', 'rss_bytes', 'status'].forEach(key => {
+                columns[key] = rows.map(row => row[key]);
+            });
+        }
+        count = count || 0;
+        if (count > this.capacity) this.allocate(Math.max(count, this.capacity * 2));
+        NUMERIC_KEYS.forEach(key => {
+            const source = columns ? columns[key] : null;
+            const target = this[key];
+            for (let i = 0; i < count; i++) target[i] = (source && source[i]) || 0;
+        });
+        ['name', 'user', 'status'].forEach(key => {
+            const source = (columns && columns[key]) || [];
+            const target = this[key];
+            target.length = count;
+            for (let i = 0; i < count; i++) target[i] = source[i] || '';
+        });
+        for (let i = 0; i < count; i++) {
+            this.searchText[i] = `${this.name[i]}\u0000${this.user[i]}`.toLowerCase();
+        }
+        this.searchText.length = count;
+        this.count = count;
+    }
+
+    async refresh() {
+        try {
+            if (this.serverMode) {
+                await this.loadWindow(this.windowStart, true);
+                return;
+            }
+            const data = await this.fetchPage(0, this.clientLimit);
+            if (!data || data.error) {
+                this.showMessage((data && data.error) || 'No processes data', 'text-danger');
+                return;
+            }
+            if (data.total > this.clientLimit) {
+                // Too many rows to hold client-side: page sorted, filtered windows instead
+                this.serverMode = true;
+                this.windowStart = -1;
+                this.count = 0;
+                await this.loadWindow(0, true);
+                return;
+            }
+            this.total = data.total;
+            this.ingest(data.rows);
+            this.applyView();
+        } catch (error) {
+            console.error('Failed to load processes:', error);
+            this.showMessage('Failed to load processes', 'text-danger');
+        }
+    }
+
+    async loadWindow(start, force = false) {
+        start = Math.max(0, Math.floor(start / this.pageSize) * this.pageSize);
+        if (!force && start === this.windowStart) return;
+        if (this.pending && this.pending.start === start && !force) return;
+        const request = {start};
+        this.pending = request;
+        const data = await this.fetchPage(start, this.pageSize * 2);
+        // A newer window request superseded this one
+        if (this.pending !== request) return;
+        this.pending = null;
+        if (!data || data.error) {
+            this.showMessage((data && data.error) || 'No processes data', 'text-danger');
+            return;
+        }
+        this.total = data.total;
+        this.matched = data.matched;
+        this.windowStart = start;
+        this.ingest(data.rows);
+        this.onCount(this.total, this.matched);
+        this.render();
+    }
+
+    // --- sort and filter ----------------------------------------------------
+
+    applyView() {
+        if (this.view.length < this.count) this.view = new Uint32Array(this.capacity);
+        const query = this.query.toLowerCase();
+        const queryPid = /^\d+$/.test(query) ? parseInt(query, 10) : -1;
+        let n = 0;
+        for (let i = 0; i < this.count; i++) {
+            if (!query || this.pid[i] === queryPid || this.searchText[i].includes(query)) {
+                this.view[n++] = i;
+            }
+        }
+        this.viewLength = n;
+        this.sortView();
+        this.onCount(this.total, n);
+        this.render();
+    }
+
+    sortView() {
+        const view = this.view.subarray(0, this.viewLength);
+        const pid = this.pid;
+        const sign = this.descending ? -1 : 1;
+        if (NUMERIC_KEYS.includes(this.sortKey)) {
+            const column = this[this.sortKey];
+            view.sort((a, b) => sign * (column[a] - column[b]) || pid[a] - pid[b]);
+        } else {
+            const column = this[this.sortKey];
+            view.sort((a, b) => {
+                const x = column[a], y = column[b];
+                return x < y ? -sign : x > y ? sign : pid[a] - pid[b];
+            });
+        }
+    }
+
+    setSort(key) {
+        if (key === this.sortKey) {
+            this.descending = !this.descending;
+        } else {
+            this.sortKey = key;
+            // Numbers are most useful biggest-first, names alphabetically
+            this.descending = NUMERIC_KEYS.includes(key) && key !== 'pid';
+        }
+        this.updateHeaders();
+        this.reorder();
+    }
+
+    setQuery(query) {
+        this.query = query.trim();
+        this.container.scrollTop = 0;
+        this.reorder();
+    }
+
+    reorder() {
+        if (this.serverMode) {
+            this.loadWindow(0, true);
+        } else {
+            this.applyView();
+        }
+    }
+
+    updateHeaders() {
+        PROCESS_COLUMNS.forEach(column => {
+            if (!column.key) return;
+            const arrow = column.key === this.sortKey ? (this.descending ? ' ▼' : ' ▲') : '';
+            this.headers[column.key].textContent = column.label + arrow;
+        });
+    }
+
+    // --- rendering ------------------------------------------------------
+
+    scheduleRender() {
+        if (this.renderScheduled) return;
+        this.renderScheduled = true;
+        requestAnimationFrame(() => {
+            this.renderScheduled = false;
+            this.render();
+        });
+    }
+
+    rowCount() {
+        return this.serverMode ? this.matched : this.viewLength;
+    }
+
+    // Index into the columns of the index-th visible row, or -1 when not loaded
+    rowAt(index) {
+        if (!this.serverMode) return this.view[index];
+        const local = index - this.windowStart;
+        return local >= 0 && local < this.count ? local : -1;
+    }
+
+    render() {
+        const total = this.rowCount();
+        const visible = Math.ceil(this.container.clientHeight / this.rowHeight) || 20;
+        const first = Math.max(0, Math.floor(this.container.scrollTop / this.rowHeight) - this.overscan);
+        const last = Math.min(total, first + visible + 2 * this.overscan);
+
+        if (this.serverMode && (first < this.windowStart || last > this.windowStart + this.count)) {
+            this.loadWindow(Math.max(0, first - this.pageSize / 2));
+        }
+
+        // Only the loaded part of the range can be drawn; spacers stand in for the rest
+        let start = first;
+        let end = last;
+        if (this.serverMode) {
+            start = Math.max(first, this.windowStart);
+            end = Math.min(last, this.windowStart + this.count);
+            if (end < start) end = start = first;
+        }
+
+        if (total === 0) {
+            this.showMessage(this.query ? 'No matching processes' : 'No processes data');
+        } else {
+            this.hideMessage();
+        }
+
+        const keep = new Set();
+        let anchor = this.topSpacer;
+        for (let index = start; index < end; index++) {
+            const i = this.rowAt(index);
+            if (i < 0) continue;
+            const pid = this.pid[i];
+            keep.add(pid);
+            let row = this.rows.get(pid);
+            if (!row) {
+                row = this.createRow(pid);
+                this.rows.set(pid, row);
+            }
+            this.patchRow(row, i);
+            if (anchor.nextSibling !== row.tr) this.tbody.insertBefore(row.tr, anchor.nextSibling);
+            anchor = row.tr;
+        }
+        for (const [pid, row] of this.rows) {
+            if (!keep.has(pid)) {
+                row.tr.remove();
+                this.rows.delete(pid);
+            }
+        }
+
+        this.topSpacer.style.height = `${start * this.rowHeight}px`;
+        this.bottomSpacer.style.height = `${(total - end) * this.rowHeight}px`;
+    }
+
+    createRow(pid) {
+        const tr = document.createElement('tr');
+        tr.style.height = `${this.rowHeight}px`;
+        tr.innerHTML = `
+            <td></td><td></td><td></td><td></td><td></td><td></td>
+            <td><span class="badge bg-success"></span></td>
+            <td>
+                <button class="btn btn-sm btn-danger py-0" data-pid="${pid}" title="Kill Process">
+                    <i class="fas fa-skull"></i>
+                </button>
+            </td>`;
+        const cells = Array.from(tr.children).slice(0, 6);
+        cells.push(tr.querySelector('.badge'));
+        return {tr, cells, values: new Array(cells.length)};
+    }
+
+    patchRow(row, i) {
+        const values = [
+            String(this.pid[i]),
+            this.name[i] || 'Unknown',
+            this.user[i] || 'Unknown',
+            `${this.cpu[i].toFixed(1)}%`,
+            `${this.memory[i].toFixed(1)}%`,
+            `${(this.rss_bytes[i] / (1024 * 1024)).toFixed(1)} MB`,
+            this.status[i] || 'running'
+        ];
+        // Touch the DOM only for cells whose text actually changed
+        for (let c = 0; c < values.length; c++) {
+            if (row.values[c] !== values[c]) {
+                row.cells[c].textContent = values[c];
+                row.values[c] = values[c];
+            }
+        }
+    }
+}
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Streaming alert rule engine for web dashboard
+
+Rules are short strings evaluated against the sampler's metrics on every
+tick, for example:
+
+    cpu > 90 for 5m
+    disk free < 10% on any mount
+    rate(swap.out_bytes) > 1048576 for 1m
+"""
+
+import fnmatch
+import json
+import re
+import threading
+import time
+import urllib.request
+from collections import deque
+from datetime import datetime
+
+# Friendly names for the sampler's metric keys
+METRIC_ALIASES = {
+    'cpu': 'cpu.percent',
+    'memory': 'memory.percent',
+    'swap': 'swap.percent',
+    'load': 'load.1',
+    'disk': 'disk.*.percent',
+    'disk free': 'disk.*.free_percent',
+}
+
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600}
+
+RULE_PATTERN = re.compile(
+    r'^\s*(?P<expr>rate\(\s*[\w.*/-]+\s*\)|[\w.*/ -]+?)\s*'
+    r'(?P<op>>=|<=|>|<)\s*'
+    r'(?P<threshold>-?[\d.]+)\s*%?'
+    r'(?:\s+for\s+(?P<duration>\d+)\s*(?P<unit>[smh]))?'
+    r'(?:\s+on\s+any\s+\w+)?\s*$'
+)
+
+class Rule:
+    """One parsed alert rule"""
+    
+    def __init__(self, text, hysteresis=None):
+        match = RULE_PATTERN.match(text)
+        if not match:
+            raise ValueError(f'Invalid alert rule: {text!r}')
+        
+        expr = match.group('expr').strip()
+        self.text = text.strip()
+        self.rate = expr.startswith('rate(')
+        if self.rate:
+            expr = expr[5:-1].strip()
+        self.metric = METRIC_ALIASES.get(expr, expr)
+        self.wildcard = '*' in self.metric
+        self.op = match.group('op')
+        self.threshold = float(match.group('threshold'))
+        duration = match.group('duration')
+        self.duration = int(duration) * DURATION_UNITS[match.group('unit')] if duration else 0
+        # Clear only once the value is back past the threshold by this margin
+        self.hysteresis = abs(self.threshold) * 0.05 if hysteresis is None else hysteresis
+    
+    def breached(self, value):
+        if self.op == '>':
+            return value > self.threshold
+        if self.op == '>=':
+            return value >= self.threshold
+        if self.op == '<':
+            return value < self.threshold
+        return value <= self.threshold
+    
+    def recovered(self, value):
+        if self.op in ('>', '>='):
+            return value < self.threshold - self.hysteresis
+        return value > self.threshold + self.hysteresis
+
+class LogFileSink:
+    """Appends one JSON line per alert transition"""
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    def __call__(self, alert):
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(alert) + '\n')
+
+class WebhookSink:
+    """POSTs alerts as JSON from a background thread so ticks never block"""
+    
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+    
+    def __call__(self, alert):
+        threading.Thread(target=self._post, args=(alert,), daemon=True).start()
+    
+    def _post(self, alert):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(alert).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except Exception as e:
+            print(f"Alert webhook {self.url} failed: {e}")
+
+class AlertEngine:
+    """Evaluates rules incrementally; per-tick cost does not grow with history"""
+    
+    def __init__(self, rules=(), sinks=(), history=500, notify_firing=True, notify_resolved=True,
+                 expire_after=300.0):
+        self.rules = [rule if isinstance(rule, Rule) else Rule(rule) for rule in rules]
+        self.sinks = list(sinks)
+        self.notify_firing = notify_firing
+        self.notify_resolved = notify_resolved
+        # A series unreported for this long (exited process, unmounted disk) is
+        # dropped and its alert resolved; sparse ticks leave gaps shorter than this
+        self.expire_after = expire_after
+        self.active = {}
+        self.history = deque(maxlen=history)
+        self._state = {}
+        self._previous = {}
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+    
+    def _matching_series(self, rule, metrics):
+        if not rule.wildcard:
+            return [rule.metric] if rule.metric in metrics else []
+        # Cache the match per metric key set; mounts rarely change
+        keys = frozenset(metrics)
+        cached = self._series.get(rule.metric)
+        if cached is None or cached[0] != keys:
+            cached = (keys, [key for key in metrics if fnmatch.fnmatchcase(key, rule.metric)])
+            self._series[rule.metric] = cached
+        return cached[1]
+    
+    def evaluate(self, sampler, metrics, now=None):
+        """Sampler listener: update every rule/series state for one tick"""
+        now = now or time.time()
+        transitions = []
+        
+        with self._lock:
+            for rule in self.rules:
+                for series in self._matching_series(rule, metrics):
+                    value = metrics[series]
+                    if rule.rate:
+                        # Per rule, so two rate rules on one series each see the last tick
+                        key = (rule.text, series)
+                        previous = self._previous.get(key)
+                        self._previous[key] = (now, value)
+                        if previous is None or now <= previous[0]:
+                            continue
+                        # A counter that went backwards was reset: skip this tick
+                        if value < previous[1]:
+                            continue
+                        value = (value - previous[1]) / (now - previous[0])
+                    
+                    transition = self._update(rule, series, value, now)
+                    if transition:
+                        transitions.append(transition)
+            transitions.extend(self._expire(now))
+        
+        for alert in transitions:
+            self._notify(alert)
+        return transitions
+    
+    def _update(self, rule, series, value, now):
+        key = (rule.text, series)
+        state = self._state.get(key)
+        if state is None:
+            state = self._state[key] = {'since': None, 'firing': False, 'seen': now}
+        state['seen'] = now
+        
+        if not state['firing']:
+            if not rule.breached(value):
+                state['since'] = None
+                return None
+            if state['since'] is None:
+                state['since'] = now
+            if now - state['since'] < rule.duration:
+                return None
+            state['firing'] = True
+            alert = {
+                'rule': rule.text,
+                'series': series,
+                'state': 'firing',
+                'value': round(value, 3),
+                'threshold': rule.threshold,
+                'started': datetime.fromtimestamp(state['since']).isoformat(),
+                'resolved': None,
+                'message': f"{series} is {round(value, 2)} ({rule.text})"
+            }
+            self.active[key] = alert
+            self.history.append(dict(alert))
+            return dict(alert)
+        
+        # Firing: stay active until the value clears the hysteresis band
+        alert = self.active[key]
+        alert['value'] = round(value, 3)
+        if not rule.recovered(value):
+            return None
+        state['firing'] = False
+        state['since'] = None
+        del self.active[key]
+        resolved = dict(alert, state='resolved', resolved=datetime.fromtimestamp(now).isoformat(),
+                        message=f"{series} recovered to {round(value, 2)} ({rule.text})")
+        self.history.append(resolved)
+        return resolved
+    
+    def _expire(self, now):
+        """Forget series that stopped being reported, resolving their alerts"""
+        for key, (stamp, _) in list(self._previous.items()):
+            if now - stamp > self.expire_after:
+                del self._previous[key]
+        resolved = []
+        for key, state in list(self._state.items()):
+            if now - state['seen'] <= self.expire_after:
+                continue
+            del self._state[key]
+            alert = self.active.pop(key, None)
+            if alert is not None:
+                rule_text, series = key
+                alert = dict(alert, state='resolved', resolved=datetime.fromtimestamp(now).isoformat(),
+                             message=f"{series} is no longer reported ({rule_text})")
+                self.history.append(alert)
+                resolved.append(dict(alert))
+        return resolved
+    
+    def _notify(self, alert):
+        if alert['state'] == 'firing' and not self.notify_firing:
+            return
+        if alert['state'] == 'resolved' and not self.notify_resolved:
+            return
+        for sink in self.sinks:
+            try:
+                sink(alert)
+            except Exception as e:
+                print(f"Alert sink {sink!r} failed: {e}")
+    
+    def get_alerts(self, view=None):
+        """Return active alerts, history, or both"""
+        with self._lock:
+            active = [dict(alert) for alert in self.active.values()]
+            history = [dict(alert) for alert in reversed(self.history)]
+        if view == 'active':
+            return {'active': active}
+        if view == 'history':
+            return {'history': history}
+        return {'active': active, 'history': history}
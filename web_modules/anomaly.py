@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Anomaly detection over sampler metrics for web dashboard
+
+Every tracked series gets an EWMA mean/variance model and a seasonal
+(time-of-day) baseline. All series are updated together with NumPy array
+operations, so one tick costs a handful of vector ops regardless of how
+many series are tracked.
+"""
+
+import fnmatch
+import importlib.util
+import threading
+import time
+
+# NumPy is the slowest import in the app, so it is loaded on first use
+np = None
+
+from web_modules.perf import registry as perf
+
+DEFAULT_SERIES = [
+    'cpu.percent',
+    'memory.percent',
+    'swap.percent',
+    'load.1',
+    'disk.*.percent',
+    'net.*.bytes_recv',
+    'net.*.bytes_sent',
+    'proc.*.rss_bytes',
+]
+
+# Cumulative counters are modelled as per-second rates
+COUNTER_SERIES = ['net.*', 'swap.in_bytes', 'swap.out_bytes']
+
+def available():
+    return np is not None or importlib.util.find_spec('numpy') is not None
+
+def _load_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+
+class AnomalyDetector:
+    # Per-series state, one row per series in every array
+    ARRAYS = ('mean', 'var', 'count', 'seasonal_mean', 'seasonal_var', 'seasonal_count',
+              'last_raw', 'last_time', 'last_seen', 'is_counter', 'value', 'expected',
+              'expected_std', 'seasonal_expected', 'score')
+    
+    def __init__(self, patterns=DEFAULT_SERIES, counters=COUNTER_SERIES, alpha=0.1,
+                 seasonal_alpha=0.2, season=86400, slots=24, min_samples=10, stale_ticks=720):
+        if not available():
+            raise ImportError('numpy is required for anomaly detection')
+        _load_numpy()
+        self.patterns = list(patterns)
+        self.counters = list(counters)
+        self.alpha = alpha
+        self.seasonal_alpha = seasonal_alpha
+        self.season = season
+        self.slots = slots
+        self.min_samples = min_samples
+        self.stale_ticks = stale_ticks
+        self.tick = 0
+        self.timestamp = None
+        self._lock = threading.Lock()
+        self._selection = (None, [])
+        self._names = []
+        self._index = {}
+        self._allocate(16)
+    
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.mean = np.zeros(capacity)
+        self.var = np.zeros(capacity)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.seasonal_mean = np.zeros((capacity, self.slots))
+        self.seasonal_var = np.zeros((capacity, self.slots))
+        self.seasonal_count = np.zeros((capacity, self.slots), dtype=np.int64)
+        self.last_raw = np.full(capacity, np.nan)
+        self.last_time = np.full(capacity, np.nan)
+        self.last_seen = np.full(capacity, -1, dtype=np.int64)
+        self.is_counter = np.zeros(capacity, dtype=bool)
+        self.value = np.zeros(capacity)
+        self.expected = np.zeros(capacity)
+        self.expected_std = np.zeros(capacity)
+        self.seasonal_expected = np.full(capacity, np.nan)
+        self.score = np.zeros(capacity)
+    
+    def _grow(self):
+        old = {name: getattr(self, name) for name in self.ARRAYS}
+        size = len(self._names)
+        self._allocate(self.capacity * 2)
+        for name, array in old.items():
+            getattr(self, name)[:size] = array[:size]
+    
+    def _selected(self, metrics):
+        # The selection only changes when the set of metric keys does
+        keys = frozenset(metrics)
+        if self._selection[0] != keys:
+            names = [key for key in metrics
+                     if any(fnmatch.fnmatchcase(key, pattern) for pattern in self.patterns)]
+            self._selection = (keys, names)
+        return self._selection[1]
+    
+    def _row(self, name, sampler):
+        row = self._index.get(name)
+        if row is not None:
+            return row
+        if len(self._names) == self.capacity:
+            self._grow()
+        row = len(self._names)
+        self._names.append(name)
+        self._index[name] = row
+        self._reset_row(row)
+        self.is_counter[row] = any(fnmatch.fnmatchcase(name, pattern) for pattern in self.counters)
+        if sampler is not None:
+            self._bootstrap(row, sampler.get_history(name))
+        return row
+    
+    def _reset_row(self, row):
+        # Rows are reused after compaction
+        self.mean[row] = self.var[row] = self.count[row] = 0
+        self.seasonal_mean[row] = self.seasonal_var[row] = self.seasonal_count[row] = 0
+        self.last_raw[row] = self.last_time[row] = np.nan
+        self.last_seen[row] = -1
+        self.value[row] = self.expected[row] = self.expected_std[row] = self.score[row] = 0
+        self.seasonal_expected[row] = np.nan
+    
+    def _bootstrap(self, row, history):
+        """Seed a new series' model from the sampler's history buffer"""
+        if len(history) < 3:
+            return
+        points = np.array(history[:-1], dtype=float)
+        times, values = points[:, 0], points[:, 1]
+        if self.is_counter[row]:
+            dt = np.diff(times)
+            delta = np.diff(values)
+            ok = (dt > 0) & (delta >= 0)
+            if not ok.any():
+                return
+            self.last_raw[row] = values[-1]
+            self.last_time[row] = times[-1]
+            values = delta[ok] / dt[ok]
+        self.mean[row] = values.mean()
+        self.var[row] = values.var()
+        self.count[row] = len(values)
+    
+    def update(self, sampler, metrics, now=None):
+        """Sampler listener: score and update every tracked series in one pass"""
+        start = time.perf_counter()
+        now = now or time.time()
+        with self._lock:
+            self.tick += 1
+            self.timestamp = now
+            names = self._selected(metrics)
+            if not names:
+                return
+            rows = np.fromiter((self._row(name, sampler) for name in names), dtype=np.intp, count=len(names))
+            raw = np.fromiter((metrics[name] for name in names), dtype=float, count=len(names))
+            self.last_seen[rows] = self.tick
+            
+            # Counters become rates; a counter that went backwards gives no sample
+            values = raw
+            counter = self.is_counter[rows]
+            if counter.any():
+                dt = now - self.last_time[rows]
+                delta = raw - self.last_raw[rows]
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    rate = np.where((dt > 0) & (delta >= 0), delta / dt, np.nan)
+                values = np.where(counter, rate, raw)
+            self.last_raw[rows] = raw
+            self.last_time[rows] = now
+            
+            valid = ~np.isnan(values)
+            rows = rows[valid]
+            x = values[valid]
+            slot = int(now % self.season // (self.season / self.slots))
+            
+            z = self._ewma(rows, x, self.mean, self.var, self.count, self.alpha)
+            zs, seasonal_mean = self._seasonal(rows, x, slot)
+            
+            self.value[rows] = x
+            self.score[rows] = np.maximum(np.abs(z), np.abs(zs))
+            self.seasonal_expected[rows] = seasonal_mean
+            
+            if self.tick % 100 == 0:
+                self._compact()
+        perf.record_collector('anomaly', time.perf_counter() - start)
+    
+    def _ewma(self, rows, x, mean_array, var_array, count_array, alpha):
+        """Return z-scores against the current model, then fold x into it"""
+        mean = mean_array[rows]
+        var = var_array[rows]
+        count = count_array[rows]
+        self.expected[rows] = mean
+        
+        # A floor on the deviation keeps flat series from producing huge scores
+        std = np.maximum(np.sqrt(var), 0.01 * np.abs(mean) + 1e-6)
+        z = np.where(count >= self.min_samples, (x - mean) / std, 0.0)
+        self.expected_std[rows] = std
+        
+        diff = x - mean
+        increment = alpha * diff
+        first = count == 0
+        mean_array[rows] = np.where(first, x, mean + increment)
+        var_array[rows] = np.where(first, 0.0, (1 - alpha) * (var + diff * increment))
+        count_array[rows] = count + 1
+        return z
+    
+    def _seasonal(self, rows, x, slot):
+        mean = self.seasonal_mean[rows, slot]
+        var = self.seasonal_var[rows, slot]
+        count = self.seasonal_count[rows, slot]
+        
+        std = np.maximum(np.sqrt(var), 0.01 * np.abs(mean) + 1e-6)
+        ready = count >= self.min_samples
+        z = np.where(ready, (x - mean) / std, 0.0)
+        expected = np.where(ready, mean, np.nan)
+        
+        diff = x - mean
+        increment = self.seasonal_alpha * diff
+        first = count == 0
+        self.seasonal_mean[rows, slot] = np.where(first, x, mean + increment)
+        self.seasonal_var[rows, slot] = np.where(first, 0.0, (1 - self.seasonal_alpha) * (var + diff * increment))
+        self.seasonal_count[rows, slot] = count + 1
+        return z, expected
+    
+    def _compact(self):
+        """Drop series not seen for stale_ticks (exited processes, removed mounts)"""
+        size = len(self._names)
+        keep = np.nonzero(self.last_seen[:size] >= self.tick - self.stale_ticks)[0]
+        if len(keep) == size:
+            return
+        for name in self.ARRAYS:
+            array = getattr(self, name)
+            array[:len(keep)] = array[keep]
+        self._names = [self._names[row] for row in keep]
+        self._index = {name: row for row, name in enumerate(self._names)}
+    
+    def get_anomalies(self, min_score=0.0, limit=50):
+        """Series from the latest tick, highest anomaly score first"""
+        with self._lock:
+            size = len(self._names)
+            current = np.nonzero((self.last_seen[:size] == self.tick) & (self.score[:size] >= min_score))[0]
+            order = current[np.argsort(-self.score[current], kind='stable')][:limit]
+            return {
+                'timestamp': self.timestamp,
+                'tracked_series': size,
+                'anomalies': [{
+                    'series': self._names[row],
+                    'score': round(float(self.score[row]), 2),
+                    'value': round(float(self.value[row]), 3),
+                    'expected': round(float(self.expected[row]), 3),
+                    'std': round(float(self.expected_std[row]), 3),
+                    'seasonal_expected': None if np.isnan(self.seasonal_expected[row])
+                                         else round(float(self.seasonal_expected[row]), 3),
+                    'samples': int(self.count[row])
+                } for row in order]
+            }
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Adaptive backend selection for web dashboard
+Routes each operation to its fastest healthy implementation and stops
+calling implementations that keep failing (circuit breaker); untimed and
+stale implementations are timed in the background, not on requests
+"""
+
+import threading
+import time
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+def is_error(result):
+    """The repo-wide failure convention: a dict carrying an 'error' key"""
+    return isinstance(result, dict) and 'error' in result
+
+class Backend:
+    """One implementation of an operation with its health and latency stats"""
+    
+    def __init__(self, name, func, alpha=0.2):
+        self.name = name
+        self.func = func
+        self.alpha = alpha
+        self.state = CLOSED
+        self.latency = None
+        self.last_measured = None
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.backoff = 0.0
+        self.last_error = None
+    
+    def record(self, ok, seconds, now, error=None):
+        # Failed calls are usually fast; only successes shape the latency estimate
+        if ok:
+            self.latency = seconds if self.latency is None else self.latency + self.alpha * (seconds - self.latency)
+            self.last_measured = now
+            self.successes += 1
+            self.consecutive_failures = 0
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = error
+    
+    def available(self, now):
+        return self.state != OPEN or now >= self.open_until
+    
+    def stats(self, now):
+        total = self.successes + self.failures
+        return {
+            'name': self.name,
+            'state': HALF_OPEN if self.state == OPEN and now >= self.open_until else self.state,
+            'latency_ms': round(self.latency * 1000, 2) if self.latency is not None else None,
+            'success_rate': round(self.successes / total, 3) if total else None,
+            'successes': self.successes,
+            'failures': self.failures,
+            'consecutive_failures': self.consecutive_failures,
+            'retry_in': round(max(self.open_until - now, 0), 1) if self.state == OPEN else None,
+            'last_error': self.last_error
+        }
+
+class BackendRouter:
+    """Tracks success rate and latency per backend and picks one per call"""
+    
+    def __init__(self, failure_threshold=3, base_backoff=5.0, max_backoff=300.0, explore_after=60.0,
+                 decisions=200):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        # Re-time a healthy backend that has not been used for this long
+        self.explore_after = explore_after
+        self.operations = {}
+        self.decisions = deque(maxlen=decisions)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def register(self, operation, name, func):
+        """Add a backend; registration order is the preference before timings exist"""
+        self.operations.setdefault(operation, []).append(Backend(name, func))
+    
+    def _order(self, backends, now):
+        available = [backend for backend in backends if backend.available(now)]
+        if not available:
+            # Everything is open: try whichever circuit reopens first
+            return sorted(backends, key=lambda backend: backend.open_until), 'all circuits open'
+        
+        for backend in available:
+            if backend.state == OPEN:
+                return [backend] + [b for b in available if b is not backend], 'half-open probe'
+        # Timed backends fastest first, then untimed ones in registration order;
+        # explore() times the rest off the request path
+        ordered = sorted(available, key=lambda backend: (backend.latency is None, backend.latency or 0.0))
+        return ordered, 'fastest healthy' if ordered[0].latency is not None else 'no timing yet'
+    
+    def _stale(self, backends, now):
+        """Healthy backends never timed, or not timed for explore_after seconds"""
+        return [backend for backend in backends if backend.state == CLOSED and
+                (backend.last_measured is None or now - backend.last_measured > self.explore_after)]
+    
+    def _trip(self, backend, now):
+        backend.backoff = min(backend.backoff * 2 if backend.backoff else self.base_backoff, self.max_backoff)
+        backend.state = OPEN
+        backend.open_until = now + backend.backoff
+    
+    def call(self, operation):
+        """Run the operation on the best backend, falling through on failure"""
+        backends = self.operations[operation]
+        with self._lock:
+            now = time.monotonic()
+            ordered, reason = self._order(backends, now)
+            if reason == 'half-open probe':
+                # Let only this call probe; others keep avoiding the backend meanwhile
+                ordered[0].open_until = now + ordered[0].backoff
+        
+        result = None
+        for backend in ordered:
+            result, ok = self._run(operation, backend, reason)
+            if ok:
+                return result
+            reason = f'{backend.name} failed'
+        return result
+    
+    def _run(self, operation, backend, reason):
+        """Call one backend and record its outcome; returns (result, ok)"""
+        start = time.perf_counter()
+        try:
+            result = backend.func()
+            error = result['error'] if is_error(result) else None
+        except Exception as e:
+            result = {'error': str(e)}
+            error = str(e)
+        seconds = time.perf_counter() - start
+        now = time.monotonic()
+        
+        with self._lock:
+            backend.record(error is None, seconds, now, error)
+            if error is None:
+                backend.state = CLOSED
+                backend.backoff = 0.0
+            elif backend.state == OPEN or backend.consecutive_failures >= self.failure_threshold:
+                # A failed half-open probe reopens with a longer backoff
+                self._trip(backend, now)
+            self.decisions.append({
+                'time': time.time(),
+                'operation': operation,
+                'backend': backend.name,
+                'reason': reason,
+                'ok': error is None,
+                'ms': round(seconds * 1000, 2)
+            })
+        return result, error is None
+    
+    def explore(self):
+        """Time every backend that has no timing or a stale one"""
+        for operation, backends in list(self.operations.items()):
+            with self._lock:
+                stale = self._stale(backends, time.monotonic())
+            for backend in stale:
+                if self._stop.is_set():
+                    return
+                self._run(operation, backend, 'no timing yet' if backend.last_measured is None else 'refresh timing')
+    
+    def is_running(self):
+        return self._thread is not None
+    
+    def start(self):
+        """Run explore() in a background thread every explore_after / 2 seconds"""
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._explore_loop, name='lsmd-router', daemon=True)
+                self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _explore_loop(self):
+        while not self._stop.is_set():
+            self.explore()
+            self._stop.wait(self.explore_after / 2)
+    
+    def diagnostics(self, limit=50):
+        """Per-operation backend stats and the most recent routing decisions"""
+        now = time.monotonic()
+        with self._lock:
+            operations = {}
+            for operation, backends in self.operations.items():
+                ordered, reason = self._order(backends, now)
+                operations[operation] = {
+                    'preferred': ordered[0].name if ordered else None,
+                    'reason': reason,
+                    'backends': [backend.stats(now) for backend in backends]
+                }
+            decisions = list(self.decisions)[-limit:]
+        return {'operations': operations, 'decisions': list(reversed(decisions))}
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Capability probing for web dashboard
+Finds which external tools and module scripts work on this host, once, in
+parallel, and caches the answers keyed by path and mtime
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Tools the module scripts shell out to
+TOOLS = ['ps', 'df', 'free', 'uptime', 'hostname', 'getent', 'mpstat', 'lsb_release',
+         'useradd', 'userdel', 'tar', 'awk']
+
+# Read-only module actions that are safe to run as a probe
+MODULE_PROBES = [
+    ('system', 'info'),
+    ('processes', 'list'),
+    ('users', 'list'),
+    ('users', 'current'),
+    ('disk', 'usage'),
+    ('backup', 'list'),
+]
+
+def default_cache_file():
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'lsmd', 'capabilities.json')
+
+class CapabilityProbe:
+    """Probes tools and module scripts; results survive restarts via a JSON cache"""
+    
+    def __init__(self, modules_dir="modules", cache_file=None, workers=8, timeout=10):
+        self.modules_dir = modules_dir
+        self.cache_file = cache_file or default_cache_file()
+        self.workers = workers
+        self.timeout = timeout
+        self.tools = {}
+        self.modules = {}
+        self.probe_seconds = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = None
+    
+    def _load_cache(self):
+        try:
+            with open(self.cache_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_cache(self, cache):
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temp = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(temp, 'w') as f:
+                json.dump(cache, f, indent=1)
+            os.replace(temp, self.cache_file)
+        except OSError as e:
+            print(f"Could not write capability cache {self.cache_file}: {e}")
+    
+    def _probe_tool(self, name, cached):
+        start = time.perf_counter()
+        path = shutil.which(name)
+        if path is None:
+            return {'available': False, 'path': None, 'mtime': None,
+                    'cached': bool(cached) and cached.get('path') is None,
+                    'seconds': time.perf_counter() - start}
+        mtime = os.stat(path).st_mtime
+        if cached and cached.get('path') == path and cached.get('mtime') == mtime:
+            return dict(cached, cached=True, seconds=time.perf_counter() - start)
+        # Only a present, executable file counts; we never run tools blindly
+        return {'available': os.access(path, os.X_OK), 'path': path, 'mtime': mtime, 'cached': False,
+                'seconds': time.perf_counter() - start}
+    
+    def _probe_module(self, module, action, fingerprint, cached):
+        start = time.perf_counter()
+        path = os.path.join(self.modules_dir, f"{module}.sh")
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return {'ok': False, 'permanent': True, 'error': f'{path} not found', 'cached': False,
+                    'seconds': time.perf_counter() - start}
+        # Reuse the answer unless the script or any tool it may call changed;
+        # only successes and permanent failures are ever cached
+        if (cached and cached.get('path') == path and cached.get('mtime') == mtime
+                and cached.get('tools') == fingerprint and (cached.get('ok') or cached.get('permanent'))):
+            return dict(cached, cached=True, seconds=time.perf_counter() - start)
+        
+        # A failure is permanent when the script cannot parse or calls a missing
+        # command; anything else (a timeout, a busy host) may pass next time
+        result = {'path': path, 'mtime': mtime, 'tools': fingerprint, 'cached': False, 'permanent': False}
+        try:
+            check = subprocess.run(['bash', '-n', path], capture_output=True, text=True, timeout=self.timeout)
+            if check.returncode != 0:
+                result.update(ok=False, permanent=True, error=check.stderr.strip()[:200] or 'syntax error')
+            else:
+                proc = subprocess.run(['bash', path, action], capture_output=True, text=True,
+                                      timeout=self.timeout)
+                try:
+                    json.loads(proc.stdout)
+                    result.update(ok=proc.returncode == 0,
+                                  error=None if proc.returncode == 0 else proc.stderr.strip()[:200])
+                except ValueError:
+                    result.update(ok=False, error='invalid JSON output')
+                if not result['ok'] and (proc.returncode == 127 or 'command not found' in proc.stderr):
+                    result.update(permanent=True, error=proc.stderr.strip()[:200])
+        except subprocess.TimeoutExpired:
+            result.update(ok=False, error='timed out')
+        except OSError as e:
+            result.update(ok=False, error=str(e))
+        result['seconds'] = time.perf_counter() - start
+        return result
+    
+    def probe(self):
+        """Probe every tool, then every module action, all in parallel"""
+        start = time.perf_counter()
+        cache = self._load_cache()
+        cached_tools = cache.get('tools', {})
+        cached_modules = cache.get('modules', {})
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {name: pool.submit(self._probe_tool, name, cached_tools.get(name)) for name in TOOLS}
+            tools = {name: future.result() for name, future in futures.items()}
+            fingerprint = {name: [tool['path'], tool['mtime']] for name, tool in tools.items()}
+            
+            futures = {}
+            for module, action in MODULE_PROBES:
+                key = f"{module}:{action}"
+                futures[key] = pool.submit(self._probe_module, module, action, fingerprint,
+                                           cached_modules.get(key))
+            modules = {key: future.result() for key, future in futures.items()}
+        
+        with self._lock:
+            self.tools = tools
+            self.modules = modules
+            self.probe_seconds = time.perf_counter() - start
+        
+        def strip(entry):
+            return {key: value for key, value in entry.items() if key not in ('cached', 'seconds')}
+        
+        if any(not entry['cached'] for entry in list(tools.values()) + list(modules.values())):
+            self._save_cache({
+                'tools': {name: strip(entry) for name, entry in tools.items()},
+                'modules': {key: strip(entry) for key, entry in modules.items()
+                            if entry['ok'] or entry.get('permanent')}
+            })
+        self._done.set()
+        return self.report()
+    
+    def start(self):
+        """Probe in a background thread so serving does not wait for it"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.probe, name='lsmd-probe', daemon=True)
+                self._thread.start()
+        return self
+    
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+    
+    def has_tool(self, name):
+        """True unless probing found the tool missing"""
+        with self._lock:
+            tool = self.tools.get(name)
+        return tool is None or tool['available']
+    
+    def module_ok(self, module, action):
+        """False only for module actions a finished probe saw fail for good"""
+        with self._lock:
+            entry = self.modules.get(f"{module}:{action}")
+        return entry is None or entry['ok'] or not entry.get('permanent')
+    
+    def module_error(self, module, action):
+        with self._lock:
+            entry = self.modules.get(f"{module}:{action}")
+        return entry.get('error') if entry else None
+    
+    def report(self):
+        with self._lock:
+            return {
+                'probed': self._done.is_set(),
+                'probe_ms': round(self.probe_seconds * 1000, 1) if self.probe_seconds is not None else None,
+                'cache_file': self.cache_file,
+                'tools': {name: {'available': tool['available'], 'path': tool['path'], 'cached': tool['cached']}
+                          for name, tool in self.tools.items()},
+                'modules': {key: {'ok': entry['ok'], 'permanent': entry.get('permanent', False),
+                                  'error': entry.get('error'), 'cached': entry['cached'],
+                                  'ms': round(entry['seconds'] * 1000, 1)}
+                            for key, entry in self.modules.items()}
+            }
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+cgroup v2 resource accounting for web dashboard
+Walks the unified cgroup hierarchy and reports per-slice/container usage
+"""
+
+import os
+import threading
+import time
+
+from web_modules.perf import registry as perf
+from web_modules.rates import CounterRates
+
+SORT_KEYS = ('cpu', 'memory', 'io', 'pids')
+
+def _read(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except (FileNotFoundError, PermissionError, ProcessLookupError, OSError):
+        return None
+
+def _read_int(path):
+    data = _read(path)
+    if data is None:
+        return None
+    data = data.strip()
+    # pids.max and memory.max may read "max"
+    return int(data) if data.isdigit() else None
+
+def _read_keyed(path):
+    """Parse flat keyed files such as cpu.stat"""
+    data = _read(path)
+    if data is None:
+        return {}
+    values = {}
+    for line in data.splitlines():
+        key, _, value = line.partition(b' ')
+        if value.strip().isdigit():
+            values[key.decode()] = int(value)
+    return values
+
+def _read_io_stat(path):
+    """Sum io.stat's per-device rbytes/wbytes/rios/wios over all devices"""
+    data = _read(path)
+    totals = {'rbytes': 0, 'wbytes': 0, 'rios': 0, 'wios': 0}
+    if data is None:
+        return totals
+    for line in data.splitlines():
+        for field in line.split()[1:]:
+            key, _, value = field.partition(b'=')
+            key = key.decode()
+            if key in totals and value.isdigit():
+                totals[key] += int(value)
+    return totals
+
+class CgroupCollector:
+    """Reads cpu, memory, io and pids for every cgroup under cgroup_root"""
+    
+    def __init__(self, cgroup_root="/sys/fs/cgroup", proc_root="/proc", max_cgroups=4096):
+        self.cgroup_root = cgroup_root
+        self.proc_root = proc_root
+        # Hard cap on cgroups read per tick; deeper ones are reported as truncated
+        self.max_cgroups = max_cgroups
+        self._rates = CounterRates()
+        self._lock = threading.Lock()
+        self._latest = None
+    
+    def unified_root(self):
+        """The cgroup v2 mount, also found under unified/ on hybrid hosts"""
+        for root in (self.cgroup_root, os.path.join(self.cgroup_root, 'unified')):
+            if os.path.exists(os.path.join(root, 'cgroup.controllers')):
+                return root
+        return None
+    
+    def _walk(self, root):
+        """Breadth-first walk so a truncated walk still covers the top levels"""
+        paths = []
+        queue = ['']
+        truncated = False
+        while queue:
+            next_level = []
+            for relative in queue:
+                if len(paths) >= self.max_cgroups:
+                    truncated = True
+                    break
+                paths.append(relative)
+                try:
+                    with os.scandir(os.path.join(root, relative)) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                next_level.append(f"{relative}/{entry.name}" if relative else entry.name)
+                except OSError:
+                    continue
+            if truncated:
+                break
+            queue = next_level
+        return paths, truncated
+    
+    def _read_cgroup(self, directory):
+        cpu = _read_keyed(os.path.join(directory, 'cpu.stat'))
+        io = _read_io_stat(os.path.join(directory, 'io.stat'))
+        return {
+            'usage_usec': cpu.get('usage_usec', 0),
+            'user_usec': cpu.get('user_usec', 0),
+            'system_usec': cpu.get('system_usec', 0),
+            'throttled_usec': cpu.get('throttled_usec', 0),
+            'rbytes': io['rbytes'],
+            'wbytes': io['wbytes'],
+            'rios': io['rios'],
+            'wios': io['wios'],
+        }, {
+            'memory_bytes': _read_int(os.path.join(directory, 'memory.current')),
+            'memory_max': _read_int(os.path.join(directory, 'memory.max')),
+            'pids': _read_int(os.path.join(directory, 'pids.current')),
+        }
+    
+    def collect(self, now=None):
+        """Walk the hierarchy once and compute per-cgroup rates"""
+        start = time.perf_counter()
+        now = now or time.monotonic()
+        root = self.unified_root()
+        if root is None:
+            return {'error': f'No cgroup v2 hierarchy under {self.cgroup_root}'}
+        
+        paths, truncated = self._walk(root)
+        counters = {}
+        gauges = {}
+        for relative in paths:
+            counters[relative], gauges[relative] = self._read_cgroup(os.path.join(root, relative))
+        
+        with self._lock:
+            rates = self._rates.update(counters, now)
+            cgroups = {}
+            for relative in paths:
+                r = rates.get(relative, (None, {}))[1]
+                gauge = gauges[relative]
+                cgroups[relative] = {
+                    'path': '/' + relative,
+                    'name': relative.rsplit('/', 1)[-1] if relative else '/',
+                    # Percent of one CPU, as top reports it
+                    'cpu': round((r.get('usage_usec') or 0) / 1e4, 1),
+                    'cpu_user': round((r.get('user_usec') or 0) / 1e4, 1),
+                    'cpu_system': round((r.get('system_usec') or 0) / 1e4, 1),
+                    'throttled': round((r.get('throttled_usec') or 0) / 1e4, 1),
+                    'memory': gauge['memory_bytes'] or 0,
+                    'memory_max': gauge['memory_max'],
+                    'io_read': round(r.get('rbytes') or 0, 1),
+                    'io_write': round(r.get('wbytes') or 0, 1),
+                    'io': round((r.get('rbytes') or 0) + (r.get('wbytes') or 0), 1),
+                    'iops': round((r.get('rios') or 0) + (r.get('wios') or 0), 2),
+                    'pids': gauge['pids'] or 0,
+                }
+            self._latest = {
+                'timestamp': time.time(),
+                'root': root,
+                'count': len(cgroups),
+                'truncated': truncated,
+                'cgroups': cgroups
+            }
+        perf.record_collector('cgroups', time.perf_counter() - start)
+        return self._latest
+    
+    def update(self, sampler, metrics, now=None):
+        """Sampler listener: one walk per tick"""
+        self.collect()
+    
+    def latest(self):
+        with self._lock:
+            return self._latest
+    
+    def load(self, latest):
+        """Serve a recorded collect() result as the latest one"""
+        with self._lock:
+            self._latest = latest
+    
+    def cgroup_of(self, pid):
+        """The unified-hierarchy cgroup path of a process, from /proc/[pid]/cgroup"""
+        data = _read(os.path.join(self.proc_root, str(pid), 'cgroup'))
+        if data is None:
+            return None
+        for line in data.decode('utf-8', 'replace').splitlines():
+            if line.startswith('0::'):
+                return line[3:] or '/'
+        return None
+    
+    def processes(self, path, limit=20):
+        """PIDs listed in a cgroup's cgroup.procs"""
+        root = self.unified_root()
+        if root is None:
+            return []
+        data = _read(os.path.join(root, path.strip('/'), 'cgroup.procs'))
+        if data is None:
+            return []
+        return [int(pid) for pid in data.split()[:limit]]
+    
+    def tree(self, sort='cpu', limit=10, with_processes=False):
+        """Top-N cgroups plus a tree keeping the top `limit` children per node"""
+        try:
+            data = self.latest() or self.collect()
+            if 'error' in data:
+                return data
+            cgroups = data['cgroups']
+            
+            children = {}
+            for relative in cgroups:
+                if relative:
+                    parent = relative.rsplit('/', 1)[0] if '/' in relative else ''
+                    children.setdefault(parent, []).append(relative)
+            
+            def node(relative):
+                entry = dict(cgroups[relative])
+                kids = sorted(children.get(relative, ()), key=lambda c: cgroups[c][sort], reverse=True)
+                entry['children'] = [node(child) for child in kids[:limit]]
+                entry['hidden_children'] = max(len(kids) - limit, 0)
+                return entry
+            
+            # Leaves are the services and containers that actually run work
+            leaves = [relative for relative in cgroups if relative and relative not in children]
+            top = sorted(leaves, key=lambda c: cgroups[c][sort], reverse=True)[:limit]
+            top = [dict(cgroups[relative]) for relative in top]
+            if with_processes:
+                for entry in top:
+                    entry['processes'] = self.processes(entry['path'])
+            
+            return {
+                'timestamp': data['timestamp'],
+                'count': data['count'],
+                'truncated': data['truncated'],
+                'sort': sort,
+                'top': top,
+                'tree': node('')
+            }
+        except Exception as e:
+            return {'error': str(e)}
+    
+    def for_process(self, pid):
+        """The cgroup entry a process belongs to"""
+        path = self.cgroup_of(pid)
+        if path is None:
+            return {'error': f'Process {pid} not found'}
+        data = self.latest() or self.collect()
+        if 'error' in data:
+            return data
+        entry = data['cgroups'].get(path.strip('/'))
+        return {'pid': pid, 'cgroup': path, 'usage': entry}
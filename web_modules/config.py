@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Configuration loader for web dashboard
+Reads the simple KEY=value assignments from lsmd_config.sh
+"""
+
+import os
+import shlex
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_FILE = os.path.join(PROJECT_ROOT, 'lsmd_config.sh')
+
+def load_config(path=CONFIG_FILE):
+    """Return a dict of top-level shell variable assignments"""
+    config = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#') or '=' not in line:
+                    continue
+                key, _, value = line.partition('=')
+                key = key.replace('export ', '').strip()
+                if not key.isidentifier() or value.lstrip().startswith('('):
+                    continue
+                try:
+                    parts = shlex.split(value, comments=True)
+                except ValueError:
+                    continue
+                value = parts[0] if parts else ''
+                config[key] = value.replace('$HOME', os.path.expanduser('~'))
+    except OSError:
+        pass
+    return config
+
+def get_bool(config, key, default=False):
+    value = config.get(key)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+def get_float(config, key, default=0.0):
+    try:
+        return float(config.get(key, default))
+    except ValueError:
+        return default
+
+def resolve_path(path):
+    """Resolve a config path relative to the project root"""
+    return os.path.normpath(os.path.join(PROJECT_ROOT, os.path.expanduser(path)))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Aggregated dashboard payloads for web dashboard
+Assembles several API sections into one response from the snapshot store,
+collecting only the sections whose snapshot is missing or too old
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Shorthands for the most requested system-info fields
+FIELD_ALIASES = {
+    'cpu': 'system.cpu',
+    'memory': 'system.memory',
+    'disk': 'system.disk',
+    'load': 'system.load',
+}
+
+TOP_PATTERN = re.compile(r'^top(\d+)$')
+MAX_TOP = 1000
+
+class DashboardSection:
+    """A payload published under snapshot_name and refreshed by provider"""
+    
+    def __init__(self, name, snapshot_name, max_age, provider):
+        self.name = name
+        self.snapshot_name = snapshot_name
+        self.max_age = max_age
+        self.provider = provider
+
+def select(data, selector):
+    """Apply one field selector: topN slices a list, a name picks matching dict keys"""
+    match = TOP_PATTERN.match(selector)
+    if match and isinstance(data, list):
+        return data[:min(int(match.group(1)), MAX_TOP)]
+    if isinstance(data, dict):
+        # 'cpu' picks cpu itself and cpu_* keys such as cpu_usage and cpu_cores
+        selected = {key: value for key, value in data.items()
+                    if key == selector or key.startswith(selector + '_')}
+        if selected:
+            return selected
+    raise KeyError(selector)
+
+class DashboardAssembler:
+    def __init__(self, store, sections, workers=4):
+        self.store = store
+        self.sections = {section.name: section for section in sections}
+        # When False (replaying a recording) sections are never collected, only read
+        self.live = True
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='lsmd-dashboard')
+    
+    def parse_fields(self, fields):
+        """Split 'system.cpu,processes.top10' into (field, section, selectors)"""
+        parsed = []
+        for field in fields:
+            field = field.strip()
+            if not field:
+                continue
+            parts = FIELD_ALIASES.get(field, field).split('.')
+            if parts[0] not in self.sections:
+                raise ValueError(f"Unknown field {field!r}; sections are {', '.join(self.sections)}")
+            parsed.append((field, parts[0], parts[1:]))
+        return parsed
+    
+    def _snapshot(self, section):
+        snapshot = self.store.get(section.snapshot_name)
+        if snapshot is not None and (not self.live or snapshot.age() <= section.max_age):
+            return snapshot
+        return None
+    
+    def _refresh(self, section):
+        if not self.live:
+            return self.store.publish(section.snapshot_name, {'error': f'{section.name} was not recorded'})
+        try:
+            data = section.provider()
+        except Exception as e:
+            data = {'error': str(e)}
+        return self.store.publish(section.snapshot_name, data)
+    
+    def assemble(self, fields=None):
+        """Build {'fields': ..., 'freshness': ...} for the requested fields"""
+        parsed = self.parse_fields(fields or list(self.sections))
+        needed = []
+        for _, name, _ in parsed:
+            if name not in needed:
+                needed.append(name)
+        
+        snapshots = {}
+        stale = []
+        for name in needed:
+            snapshot = self._snapshot(self.sections[name])
+            if snapshot is None:
+                stale.append(name)
+            else:
+                snapshots[name] = snapshot
+        # Stale sections are collected concurrently, each at most once
+        futures = {name: self._pool.submit(self._refresh, self.sections[name]) for name in stale}
+        for name, future in futures.items():
+            snapshots[name] = future.result()
+        
+        result = {'timestamp': time.time(), 'fields': {}, 'freshness': {}}
+        errors = {}
+        for field, name, selectors in parsed:
+            data = snapshots[name].data
+            try:
+                if isinstance(data, dict) and 'error' in data:
+                    raise LookupError(data['error'])
+                for selector in selectors:
+                    data = select(data, selector)
+                result['fields'][field] = data
+            except KeyError as e:
+                errors[field] = f"No field {e.args[0]!r} in {name}"
+            except LookupError as e:
+                errors[field] = str(e)
+        
+        for name in needed:
+            snapshot = snapshots[name]
+            result['freshness'][name] = {
+                'timestamp': snapshot.timestamp,
+                'age': round(snapshot.age(), 3),
+                'generation': snapshot.generation,
+                'refreshed': name in futures
+            }
+        if errors:
+            result['errors'] = errors
+        return result
@@ -3,8 +3,19 @@
 Disk monitoring module for web dashboard
 """
 
+import hashlib
+import heapq
+import os
 import psutil
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Bytes hashed from each end of a file before committing to a full read
+EDGE_BYTES = 64 * 1024
+# Sequential read size for full hashes; one reused buffer per worker thread
+READ_BYTES = 4 * 1024 * 1024
 
 class DiskMonitor:
     def get_disk_usage(self):
@@ -41,28 +52,39 @@ class DiskMonitor:
         """Find large files in specified directory"""
         try:
             path = os.path.expanduser(path)
-            result = subprocess.run(
-                ['find', path, '-type', 'f', '-exec', 'du', '-h', '{}', ';'],
-                capture_output=True, text=True, timeout=30
-            )
-            
-            if result.returncode == 0:
-                files = []
-                for line in result.stdout.strip().split('\n'):
-                    if line:
-                        size, filepath = line.split('\t', 1)
-                        files.append({'size': size, 'path': filepath})
-                
-                # Sort by size and return top N
-                return sorted(files, key=lambda x: self._parse_size(x['size']), reverse=True)[:limit]
-            else:
-                return {'error': 'Failed to find large files'}
-                
-        except subprocess.TimeoutExpired:
-            return {'error': 'Operation timed out'}
+            largest = heapq.nlargest(limit, self._walk_files(path), key=lambda entry: entry[0])
+            return [{
+                'size': self._bytes_to_human(size),
+                'size_bytes': size,
+                'path': filepath
+            } for size, filepath in largest]
         except Exception as e:
             return {'error': str(e)}
     
+    def _walk_files(self, path):
+        """Yield (size, path) for every regular file below path"""
+        stack = [path]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                yield entry.stat(follow_symlinks=False).st_size, entry.path
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+    
+    def find_duplicates(self, path="~", min_size=1024 * 1024, workers=4, limit=50):
+        """Find files with identical content below path, largest reclaimable space first"""
+        scan = DuplicateScan(os.path.expanduser(path), min_size, workers, limit)
+        scan.run()
+        return scan.status()
+    
     def _bytes_to_human(self, bytes):
         """Convert bytes to human-readable format"""
         for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
@@ -70,10 +92,212 @@ class DiskMonitor:
                 return f"{bytes:.2f} {unit}"
             bytes /= 1024.0
         return f"{bytes:.2f} PB"
+
+class _Cancelled(Exception):
+    pass
+
+def _human(size):
+    return DiskMonitor()._bytes_to_human(size)
+
+class DuplicateScan:
+    """Duplicate search as a cancellable job: group by size, hash both ends, then hash whole files"""
+    
+    def __init__(self, path, min_size=1024 * 1024, workers=4, limit=50):
+        self.path = path
+        self.min_size = max(min_size, 1)
+        self.workers = max(workers, 1)
+        self.limit = limit
+        self.state = 'pending'
+        self.stage = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.progress = {'files_seen': 0, 'directories': 0, 'candidates': 0, 'partial_hashed': 0,
+                         'full_candidates': 0, 'full_hashed': 0, 'bytes_hashed': 0, 'hardlinks': 0,
+                         'unreadable': 0}
+        self.groups = []
+        self.totals = None
+        self._cancel = threading.Event()
+        self._local = threading.local()
+        self._thread = None
+    
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name='lsmd-duplicates', daemon=True)
+        self._thread.start()
+        return self
+    
+    def cancel(self):
+        self._cancel.set()
+    
+    def running(self):
+        return self.state in ('pending', 'running')
+    
+    def _check(self):
+        if self._cancel.is_set():
+            raise _Cancelled()
+    
+    def _walk(self):
+        """{size: {(dev, inode): [paths]}} for regular files of at least min_size"""
+        by_size = {}
+        stack = [self.path]
+        progress = self.progress
+        while stack:
+            self._check()
+            directory = stack.pop()
+            progress['directories'] += 1
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                                continue
+                            if not entry.is_file(follow_symlinks=False):
+                                continue
+                            progress['files_seen'] += 1
+                            stat = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        if stat.st_size < self.min_size:
+                            continue
+                        # Hardlinks share an inode: one copy on disk, listed under every name
+                        by_size.setdefault(stat.st_size, {}).setdefault((stat.st_dev, stat.st_ino), []).append(entry.path)
+            except OSError:
+                continue
+        return by_size
+    
+    def _edge_hash(self, path, size):
+        """Digest of the first and last EDGE_BYTES; the whole file when it is that small"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb', buffering=0) as f:
+            digest.update(os.pread(f.fileno(), EDGE_BYTES, 0))
+            if size > EDGE_BYTES:
+                digest.update(os.pread(f.fileno(), EDGE_BYTES, max(size - EDGE_BYTES, EDGE_BYTES)))
+        return digest.digest()
+    
+    def _full_hash(self, path):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._local.buffer = bytearray(READ_BYTES)
+        view = memoryview(buffer)
+        digest = hashlib.blake2b(digest_size=32)
+        with open(path, 'rb', buffering=0) as f:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            while True:
+                self._check()
+                count = f.readinto(buffer)
+                if not count:
+                    break
+                # hashlib releases the GIL on large updates, so workers hash in parallel
+                digest.update(view[:count])
+        return digest.digest()
+    
+    def _hash_stage(self, pool, jobs, hasher, counter):
+        """Run hasher(path, size) for (key, path, size) jobs; {key: digest} for the readable ones"""
+        digests = {}
+        futures = {pool.submit(hasher, path, size): (key, size) for key, path, size in jobs}
+        try:
+            for future in as_completed(futures):
+                self._check()
+                key, size = futures[future]
+                try:
+                    digests[key] = future.result()
+                except OSError:
+                    self.progress['unreadable'] += 1
+                    continue
+                self.progress[counter] += 1
+                self.progress['bytes_hashed'] += size if counter == 'full_hashed' else min(size, 2 * EDGE_BYTES)
+        except _Cancelled:
+            for future in futures:
+                future.cancel()
+            raise
+        return digests
+    
+    def _regroup(self, groups, digests):
+        """Split each group of inodes by digest, keeping the splits that still hold two or more"""
+        split = []
+        for size, inodes in groups:
+            by_digest = {}
+            for inode in inodes:
+                if inode in digests:
+                    by_digest.setdefault(digests[inode], []).append(inode)
+            split.extend((size, members) for members in by_digest.values() if len(members) > 1)
+        return split
+    
+    def run(self):
+        self.state = 'running'
+        self.started = time.time()
+        try:
+            self.stage = 'walk'
+            by_size = self._walk()
+            links = {}
+            groups = []
+            for size, inodes in by_size.items():
+                for key, paths in inodes.items():
+                    links[key] = paths
+                    self.progress['hardlinks'] += len(paths) - 1
+                if len(inodes) > 1:
+                    groups.append((size, list(inodes)))
+            del by_size
+            self.progress['candidates'] = sum(len(inodes) for _, inodes in groups)
+            
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='lsmd-hash') as pool:
+                self.stage = 'partial'
+                jobs = [(key, links[key][0], size) for size, inodes in groups for key in inodes]
+                groups = self._regroup(groups, self._hash_stage(pool, jobs, self._edge_hash, 'partial_hashed'))
+                
+                # Files no bigger than both ends are already hashed in full
+                done = [group for group in groups if group[0] <= 2 * EDGE_BYTES]
+                remaining = sorted((group for group in groups if group[0] > 2 * EDGE_BYTES), key=lambda group: -group[0])
+                self.stage = 'full'
+                self.progress['full_candidates'] = sum(len(inodes) for _, inodes in remaining)
+                jobs = [(key, links[key][0], size) for size, inodes in remaining for key in inodes]
+                digests = self._hash_stage(pool, jobs, lambda path, size: self._full_hash(path), 'full_hashed')
+                groups = done + self._regroup(remaining, digests)
+            
+            results = []
+            for size, inodes in groups:
+                results.append({
+                    'size_bytes': size,
+                    'size': _human(size),
+                    'copies': len(inodes),
+                    'reclaimable_bytes': size * (len(inodes) - 1),
+                    'reclaimable': _human(size * (len(inodes) - 1)),
+                    # One entry per distinct inode; further names of the same inode free nothing
+                    'files': [{'path': links[key][0], 'hardlinks': links[key][1:]} for key in inodes]
+                })
+            results.sort(key=lambda group: group['reclaimable_bytes'], reverse=True)
+            reclaimable = sum(group['reclaimable_bytes'] for group in results)
+            self.totals = {
+                'groups': len(results),
+                'duplicate_files': sum(group['copies'] - 1 for group in results),
+                'reclaimable_bytes': reclaimable,
+                'reclaimable': _human(reclaimable)
+            }
+            self.groups = results[:self.limit] if self.limit else results
+            self.state = 'done'
+        except _Cancelled:
+            self.state = 'cancelled'
+        except Exception as e:
+            self.state = 'error'
+            self.error = str(e)
+        finally:
+            self.stage = None
+            self.finished = time.time()
     
-    def _parse_size(self, size_str):
-        """Parse human-readable size to bytes for sorting"""
-        units = {'B': 1, 'K': 1024, 'M': 1024**2, 'G': 1024**3, 'T': 1024**4}
-        number = float(size_str[:-1])
-        unit = size_str[-1]
-        return number * units.get(unit, 1)
+    def status(self):
+        end = self.finished or time.time()
+        return {
+            'path': self.path,
+            'min_size_bytes': self.min_size,
+            'workers': self.workers,
+            'state': self.state,
+            'stage': self.stage,
+            'error': self.error,
+            'started': self.started,
+            'elapsed_seconds': round(end - self.started, 2) if self.started else None,
+            'progress': dict(self.progress),
+            'totals': self.totals,
+            'groups': self.groups
+        }
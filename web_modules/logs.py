@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Log file viewer for web dashboard
+Memory-maps configured log files and answers tail, time-range and regex
+queries by seeking, so their cost does not grow with the size of the file
+"""
+
+import bisect
+import mmap
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+# Lines longer than this are cut when returned
+MAX_LINE_BYTES = 64 * 1024
+# Below this span a time seek stops bisecting and scans lines
+SCAN_BYTES = 64 * 1024
+# Lines read forward from a probe point looking for a timestamp
+PROBE_LINES = 64
+# Bytes handed to the regex engine per search chunk
+SEARCH_CHUNK = 4 * 1024 * 1024
+
+ISO_PATTERN = re.compile(rb'(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})')
+SYSLOG_PATTERN = re.compile(rb'([A-Z][a-z]{2}) +(\d{1,2}) (\d{2}):(\d{2}):(\d{2})')
+MONTHS = {name: number for number, name in enumerate(
+    [b'Jan', b'Feb', b'Mar', b'Apr', b'May', b'Jun', b'Jul', b'Aug', b'Sep', b'Oct', b'Nov', b'Dec'], 1)}
+
+def parse_config(value):
+    """Parse LOG_FILES="name=path; name=path" into {name: path}"""
+    logs = {}
+    for entry in value.split(';'):
+        name, _, path = entry.partition('=')
+        if name.strip() and path.strip():
+            logs[name.strip()] = path.strip()
+    return logs
+
+def line_timestamp(line):
+    """Epoch seconds of an ISO 8601 or syslog timestamp near the start of a line"""
+    head = line[:256]
+    match = ISO_PATTERN.search(head)
+    if match:
+        try:
+            return time.mktime((*map(int, match.groups()), 0, 0, -1))
+        except (OverflowError, ValueError):
+            return None
+    match = SYSLOG_PATTERN.match(head)
+    if match and match.group(1) in MONTHS:
+        # syslog omits the year: take the current one unless that lands in the future
+        now = time.time()
+        year = datetime.now().year
+        fields = (MONTHS[match.group(1)], *map(int, match.groups()[1:]))
+        try:
+            stamp = time.mktime((year, *fields, 0, 0, -1))
+            if stamp > now + 86400:
+                stamp = time.mktime((year - 1, *fields, 0, 0, -1))
+        except (OverflowError, ValueError):
+            return None
+        return stamp
+    return None
+
+def parse_time(value):
+    """Accept epoch seconds, an ISO datetime, or HH:MM[:SS] meaning today"""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    if re.fullmatch(r'\d{1,2}:\d{2}(:\d{2})?', value):
+        parts = [int(part) for part in value.split(':')] + [0]
+        today = datetime.now().replace(hour=parts[0], minute=parts[1], second=parts[2], microsecond=0)
+        return today.timestamp()
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f"Cannot parse time {value!r}; use epoch seconds, ISO 8601 or HH:MM")
+
+class LogFile:
+    """One mapped log file with a sparse offset -> timestamp index"""
+    
+    def __init__(self, name, path, max_index=4096):
+        self.name = name
+        self.path = path
+        self.max_index = max_index
+        self._lock = threading.Lock()
+        self._map = None
+        self._size = 0
+        self._inode = None
+        # Sorted parallel lists of line-start offsets and their timestamps
+        self._offsets = []
+        self._stamps = []
+        self.rotations = 0
+    
+    def mapped(self):
+        """(mmap, size) of the file as it is now, remapped after growth or rotation"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None, 0
+        with self._lock:
+            rotated = self._inode is not None and (stat.st_ino != self._inode or stat.st_size < self._size)
+            if rotated:
+                # A new file under the same name: nothing indexed still applies
+                self._offsets = []
+                self._stamps = []
+                self.rotations += 1
+            if self._map is None or rotated or stat.st_size != self._size:
+                self._map = None
+                if stat.st_size:
+                    with open(self.path, 'rb') as f:
+                        self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._size = len(self._map) if self._map is not None else 0
+                self._inode = stat.st_ino
+            # Callers keep their own reference; an old map closes once they drop it
+            return self._map, self._size
+    
+    def _line(self, mm, start, size):
+        end = mm.find(b'\n', start, size)
+        if end < 0:
+            end = size
+        return mm[start:min(end, start + MAX_LINE_BYTES)], end + 1
+    
+    def _entry(self, offset, raw):
+        return {
+            'offset': offset,
+            'timestamp': line_timestamp(raw),
+            'text': raw.decode('utf-8', 'replace').rstrip('\r')
+        }
+    
+    def _remember(self, offset, stamp):
+        with self._lock:
+            i = bisect.bisect_left(self._offsets, offset)
+            if i < len(self._offsets) and self._offsets[i] == offset:
+                return
+            if len(self._offsets) < self.max_index:
+                self._offsets.insert(i, offset)
+                self._stamps.insert(i, stamp)
+    
+    def _probe(self, mm, offset, size):
+        """First timestamped line starting at or after offset, as (line start, timestamp)"""
+        if offset > 0:
+            newline = mm.find(b'\n', offset - 1, size)
+            offset = size if newline < 0 else newline + 1
+        for _ in range(PROBE_LINES):
+            if offset >= size:
+                break
+            raw, following = self._line(mm, offset, size)
+            stamp = line_timestamp(raw)
+            if stamp is not None:
+                self._remember(offset, stamp)
+                return offset, stamp
+            offset = following
+        return offset, None
+    
+    def seek_time(self, mm, size, when):
+        """Offset of the first line stamped at or after `when`, by bisection"""
+        lo, hi = 0, size
+        with self._lock:
+            # Narrow the search with what earlier seeks already learned
+            i = bisect.bisect_left(self._stamps, when)
+            if i > 0:
+                lo = self._offsets[i - 1]
+            if i < len(self._offsets):
+                hi = self._offsets[i]
+        
+        while hi - lo > SCAN_BYTES:
+            mid = (lo + hi) // 2
+            offset, stamp = self._probe(mm, mid, size)
+            if offset >= hi:
+                # No line starts between mid and hi: continue in the lower half
+                hi = mid
+            elif stamp is None:
+                # A long unstamped stretch: the final scan covers what is left
+                break
+            elif stamp < when:
+                lo = offset
+            else:
+                hi = offset
+        
+        offset = lo
+        if offset > 0:
+            newline = mm.find(b'\n', offset - 1, size)
+            offset = size if newline < 0 else newline + 1
+        while offset < min(hi, size):
+            raw, following = self._line(mm, offset, size)
+            stamp = line_timestamp(raw)
+            if stamp is not None and stamp >= when:
+                return offset
+            offset = following
+        return min(hi, size)
+    
+    def tail(self, lines=100, before=None):
+        """The last `lines` lines ending before offset `before`, read backwards"""
+        mm, size = self.mapped()
+        end = size if before is None else max(min(before, size), 0)
+        if mm is None:
+            return {'name': self.name, 'size': size, 'start': 0, 'end': 0, 'lines': []}
+        # A trailing newline ends the last line rather than starting an empty one
+        stop = end - 1 if end and mm[end - 1:end] == b'\n' else end
+        starts = []
+        position = stop
+        while len(starts) < lines and position > 0:
+            newline = mm.rfind(b'\n', 0, position)
+            starts.append(newline + 1)
+            position = newline
+        starts.reverse()
+        entries = [self._entry(start, self._line(mm, start, end)[0]) for start in starts]
+        return {
+            'name': self.name,
+            'size': size,
+            'start': starts[0] if starts else end,
+            'end': end,
+            'lines': entries
+        }
+    
+    def read(self, since=None, until=None, after=None, limit=1000):
+        """Up to `limit` lines from a time or offset, stopping at `until`"""
+        mm, size = self.mapped()
+        if mm is None:
+            return {'name': self.name, 'size': size, 'start': 0, 'next': None, 'lines': []}
+        if after is not None:
+            offset = max(min(after, size), 0)
+            if offset > 0:
+                newline = mm.find(b'\n', offset - 1, size)
+                offset = size if newline < 0 else newline + 1
+        elif since is not None:
+            offset = self.seek_time(mm, size, since)
+        else:
+            offset = 0
+        start = offset
+        
+        entries = []
+        while offset < size and len(entries) < limit:
+            raw, following = self._line(mm, offset, size)
+            entry = self._entry(offset, raw)
+            # Unstamped lines (tracebacks, continuations) belong to the line before
+            if until is not None and entry['timestamp'] is not None and entry['timestamp'] > until:
+                size = offset
+                break
+            entries.append(entry)
+            offset = following
+        return {
+            'name': self.name,
+            'size': size,
+            'start': start,
+            'next': offset if offset < size else None,
+            'lines': entries
+        }
+    
+    def search(self, pattern, since=None, until=None, limit=1000, chunk=SEARCH_CHUNK):
+        """Yield matching lines chunk by chunk; each chunk reports scan progress"""
+        mm, size = self.mapped()
+        if mm is None:
+            yield {'name': self.name, 'scanned': 0, 'size': 0, 'done': True, 'matches': []}
+            return
+        start = self.seek_time(mm, size, since) if since is not None else 0
+        end = self.seek_time(mm, size, until + 1) if until is not None else size
+        found = 0
+        position = start
+        while position < end and found < limit:
+            # Cut chunks on line boundaries so no line is split between two scans
+            stop = min(position + chunk, end)
+            if stop < end:
+                newline = mm.find(b'\n', stop, end)
+                stop = end if newline < 0 else newline + 1
+            matches = []
+            last_line = -1
+            for match in pattern.finditer(mm, position, stop):
+                line_start = mm.rfind(b'\n', position, match.start()) + 1 or position
+                if line_start == last_line:
+                    continue
+                last_line = line_start
+                matches.append(self._entry(line_start, self._line(mm, line_start, end)[0]))
+                found += 1
+                if found >= limit:
+                    stop = line_start + 1
+                    break
+            position = stop
+            done = position >= end or found >= limit
+            yield {
+                'name': self.name,
+                'scanned': position - start,
+                'size': end - start,
+                'done': done,
+                'truncated': found >= limit and position < end,
+                'matches': matches
+            }
+    
+    def info(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError as e:
+            return {'name': self.name, 'path': self.path, 'exists': False, 'error': e.strerror}
+        with self._lock:
+            indexed = len(self._offsets)
+        return {
+            'name': self.name,
+            'path': self.path,
+            'exists': True,
+            'size': stat.st_size,
+            'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            'indexed_points': indexed,
+            'rotations': self.rotations
+        }
+
+class LogViewer:
+    """The configured log files, looked up by name"""
+    
+    def __init__(self, logs):
+        self.logs = {name: LogFile(name, path) for name, path in logs.items()}
+    
+    def get(self, name):
+        return self.logs.get(name)
+    
+    def list_logs(self):
+        return [log.info() for log in self.logs.values()]
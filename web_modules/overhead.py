@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Monitoring overhead budget for web dashboard
+Measures what each sampler tick costs and trades interval and detail
+against a CPU budget expressed as a share of one core
+"""
+
+import threading
+import time
+from collections import deque
+
+# Sampler detail levels, cheapest last
+LEVELS = ('full', 'reduced', 'minimal')
+
+class OverheadBudget:
+    """Decides the next sampler interval and detail level from measured tick cost"""
+    
+    def __init__(self, budget_percent=1.0, base_interval=5.0, max_interval=60.0, alpha=0.3,
+                 step=1.5, cooldown=3, retry_after=600.0, urgent=None, changes=50):
+        self.budget_percent = budget_percent
+        self.base_interval = base_interval
+        self.max_interval = max(max_interval, base_interval)
+        self.alpha = alpha
+        self.step = step
+        # Ticks to wait after a change so its effect shows in the estimate
+        self.cooldown = cooldown
+        # How long a measured per-level cost blocks going back to that level
+        self.retry_after = retry_after
+        # Callable returning True while something (an active alert) needs full fidelity
+        self.urgent = urgent
+        self.interval = base_interval
+        self.level = 0
+        self.cost = None
+        self.last_tick = None
+        self.changes = deque(maxlen=changes)
+        self._since_change = 0
+        # level -> (cpu seconds per tick, when measured)
+        self._level_cost = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def detail(self):
+        return LEVELS[self.level]
+    
+    def _change(self, interval, level, reason):
+        if interval == self.interval and level == self.level:
+            return
+        self.changes.append({
+            'time': time.time(),
+            'reason': reason,
+            'cost_percent': round(self.cost, 3) if self.cost is not None else None,
+            'interval': [self.interval, interval],
+            'detail': [LEVELS[self.level], LEVELS[level]]
+        })
+        if level != self.level:
+            # Ticks at another detail level cost something else: re-measure
+            if self.cost is not None:
+                self._level_cost[self.level] = (self.cost * self.interval / 100, time.monotonic())
+            self.cost = None
+        self.interval = interval
+        self.level = level
+        self._since_change = 0
+    
+    def _fits(self, level):
+        known = self._level_cost.get(level)
+        if known is None or time.monotonic() - known[1] > self.retry_after:
+            return True
+        return known[0] / self.interval * 100 < self.budget_percent * 0.9
+    
+    def update(self, cpu_seconds, wall_seconds, rss_bytes):
+        """Record one tick's cost and return the (interval, detail) for the next one"""
+        with self._lock:
+            previous_rss = self.last_tick['rss_bytes'] if self.last_tick else rss_bytes
+            self.last_tick = {
+                'cpu_ms': round(cpu_seconds * 1000, 2),
+                'wall_ms': round(wall_seconds * 1000, 2),
+                'rss_bytes': rss_bytes,
+                'rss_delta': rss_bytes - previous_rss
+            }
+            # Percent of one core used over the interval this tick belongs to
+            cost = cpu_seconds / self.interval * 100
+            self.cost = cost if self.cost is None else self.cost + self.alpha * (cost - self.cost)
+            self._since_change += 1
+            
+            urgent = False
+            if self.urgent is not None:
+                try:
+                    urgent = bool(self.urgent())
+                except Exception:
+                    urgent = False
+            if urgent:
+                self._change(self.base_interval, 0, 'alert active')
+            elif self._since_change >= self.cooldown:
+                # Per-tick cost at the current detail, projected onto a wider interval
+                per_tick = self.cost * self.interval / 100
+                if self.cost > self.budget_percent:
+                    if self.level < len(LEVELS) - 1:
+                        self._change(self.interval, self.level + 1, 'over budget')
+                    elif self.interval < self.max_interval:
+                        needed = per_tick * 100 / self.budget_percent
+                        interval = min(max(self.interval * self.step, needed), self.max_interval)
+                        self._change(round(interval, 2), self.level, 'over budget')
+                elif self.cost < self.budget_percent / 2:
+                    # Step back only where the projected cost still fits, so
+                    # the sampler does not flap between two settings
+                    interval = max(self.interval / self.step, self.base_interval)
+                    if self.interval > self.base_interval and per_tick / interval * 100 < self.budget_percent * 0.9:
+                        self._change(round(interval, 2), self.level, 'under budget')
+                    elif self.level > 0 and self._fits(self.level - 1):
+                        self._change(self.interval, self.level - 1, 'under budget')
+            return self.interval, self.detail
+    
+    def report(self):
+        with self._lock:
+            return {
+                'budget_percent': self.budget_percent,
+                'cost_percent': round(self.cost, 3) if self.cost is not None else None,
+                'over_budget': self.cost is not None and self.cost > self.budget_percent,
+                'interval': self.interval,
+                'base_interval': self.base_interval,
+                'max_interval': self.max_interval,
+                'detail': self.detail,
+                'last_tick': self.last_tick,
+                'changes': list(reversed(self.changes))
+            }
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Performance instrumentation for web dashboard
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+class Histogram:
+    """Log-linear latency histogram in the style of HdrHistogram"""
+
+    # 16 sub-buckets per power of two keeps the relative error under ~6%
+    SUB_BUCKET_BITS = 5
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def record(self, seconds):
+        """Record one duration in seconds"""
+        micros = max(int(seconds * 1000000), 0)
+        shift = max(micros.bit_length() - self.SUB_BUCKET_BITS, 0)
+        key = (shift, micros >> shift)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, percent):
+        """Return the value at the given percentile in seconds"""
+        if not self.count:
+            return 0.0
+        target = max(math.ceil(percent / 100.0 * self.count), 1)
+        seen = 0
+        for shift, mantissa in sorted(self.counts):
+            seen += self.counts[(shift, mantissa)]
+            if seen >= target:
+                highest = (((mantissa + 1) << shift) - 1) / 1000000.0
+                return min(highest, self.max)
+        return self.max
+
+    def summary(self):
+        """Return count, mean and p50/p95/p99 in milliseconds"""
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'min_ms': round((self.min or 0.0) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p95_ms': round(self.percentile(95) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3)
+        }
+
+class PerfRegistry:
+    """Collects route, collector, subprocess and sampler timings"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.routes = {}
+        self.collectors = {}
+        self.subprocesses = {}
+        self.subprocess_failures = Counter()
+        self.sampler_lag = Histogram()
+
+    def _record(self, table, name, seconds):
+        with self._lock:
+            histogram = table.get(name)
+            if histogram is None:
+                histogram = table[name] = Histogram()
+            histogram.record(seconds)
+
+    def record_route(self, name, seconds):
+        self._record(self.routes, name, seconds)
+
+    def record_collector(self, name, seconds):
+        self._record(self.collectors, name, seconds)
+
+    def record_subprocess(self, module, seconds, success=True):
+        self._record(self.subprocesses, module, seconds)
+        if not success:
+            with self._lock:
+                self.subprocess_failures[module] += 1
+
+    def record_sampler_lag(self, seconds):
+        with self._lock:
+            self.sampler_lag.record(seconds)
+
+    @contextmanager
+    def subprocess_timer(self, module):
+        """Time a subprocess run; failures are counted when it raises"""
+        start = time.perf_counter()
+        success = False
+        try:
+            yield
+            success = True
+        finally:
+            self.record_subprocess(module, time.perf_counter() - start, success)
+
+    def collector(self, name):
+        """Decorator timing a collector method under name"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record_collector(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """Return all timings as plain data for the API"""
+        with self._lock:
+            return {
+                'uptime_seconds': round(time.time() - self.started, 1),
+                'routes': {name: h.summary() for name, h in sorted(self.routes.items())},
+                'collectors': {name: h.summary() for name, h in sorted(self.collectors.items())},
+                'subprocesses': {
+                    name: dict(h.summary(), failures=self.subprocess_failures[name])
+                    for name, h in sorted(self.subprocesses.items())
+                },
+                'sampler_lag': self.sampler_lag.summary()
+            }
+
+class SamplingProfiler:
+    """Samples Python stacks and renders them as collapsed flamegraph lines"""
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='lsmd-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling and return the collapsed-stack text"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.collapsed()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            if self.thread_id is None:
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if self.thread_id is not None and thread_id != self.thread_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if self.thread_id is None:
+                    stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+# Shared registry for the running process
+registry = PerfRegistry()
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Process tracking module for web dashboard
+Reads per-process state straight from procfs
+"""
+
+import heapq
+import os
+import pwd
+import threading
+import time
+
+STATUS_NAMES = {
+    'R': 'running',
+    'S': 'sleeping',
+    'D': 'disk-sleep',
+    'Z': 'zombie',
+    'T': 'stopped',
+    't': 'tracing-stop',
+    'X': 'dead',
+    'I': 'idle',
+}
+
+# Sort keys served by top(); the io ones are bytes per second
+SORT_KEYS = ('cpu', 'memory', 'io_read', 'io_write', 'sockets')
+IO_SORT_KEYS = ('io_read', 'io_write', 'sockets')
+GROUP_KEYS = ('user', 'command')
+TABLE_SORT_KEYS = ('pid', 'name', 'user', 'cpu', 'memory', 'rss_bytes', 'status')
+
+def _totals():
+    return {'processes': 0, 'cpu': 0.0, 'memory': 0.0, 'rss_bytes': 0}
+
+def _add(totals, proc):
+    totals['processes'] += 1
+    totals['cpu'] += proc['cpu']
+    totals['memory'] += proc['memory']
+    totals['rss_bytes'] += proc['rss_bytes']
+
+def _rounded(totals):
+    return dict(totals, cpu=round(totals['cpu'], 1), memory=round(totals['memory'], 1))
+
+class ProcessRollup:
+    """Per-user, per-command and per-subtree totals over one process snapshot"""
+    
+    def __init__(self, processes):
+        self.by_pid = {}
+        self.by_user = {}
+        self.by_command = {}
+        self.children = {}
+        self.subtree = {}
+        
+        # One pass: index, group and link every process to its parent
+        for proc in processes:
+            pid = proc['pid']
+            self.by_pid[pid] = proc
+            _add(self.by_user.setdefault(proc['user'], _totals()), proc)
+            _add(self.by_command.setdefault(proc['name'], _totals()), proc)
+            self.children.setdefault(proc['ppid'], []).append(pid)
+            totals = self.subtree[pid] = _totals()
+            _add(totals, proc)
+        
+        # Processes whose parent is not in the snapshot are roots
+        self.roots = [pid for pid, proc in self.by_pid.items() if proc['ppid'] not in self.by_pid]
+        
+        # Subtree totals: walk top-down once, then fold children into parents bottom-up
+        order = list(self.roots)
+        for pid in order:
+            order.extend(self.children.get(pid, ()))
+        for pid in reversed(order):
+            ppid = self.by_pid[pid]['ppid']
+            parent = self.subtree.get(ppid)
+            if parent is not None and ppid != pid:
+                for key, value in self.subtree[pid].items():
+                    parent[key] += value
+    
+    def groups(self, by='command', sort='cpu', limit=20):
+        """Group totals by user or command, largest first"""
+        grouped = self.by_user if by == 'user' else self.by_command
+        rows = [dict(_rounded(totals), **{by: name}) for name, totals in grouped.items()]
+        rows.sort(key=lambda row: row.get(sort, 0), reverse=True)
+        return rows[:limit]
+    
+    def node(self, pid):
+        proc = self.by_pid[pid]
+        return {
+            'pid': pid,
+            'ppid': proc['ppid'],
+            'name': proc['name'],
+            'user': proc['user'],
+            'cpu': proc['cpu'],
+            'memory': proc['memory'],
+            'status': proc['status'],
+            'children': len(self.children.get(pid, ())),
+            'subtree': _rounded(self.subtree[pid])
+        }
+    
+    def expand(self, pid=None, sort='cpu'):
+        """Direct children of pid (or the roots), each with its subtree totals"""
+        pids = self.roots if pid is None else self.children.get(pid, [])
+        nodes = [self.node(child) for child in pids]
+        nodes.sort(key=lambda node: node['subtree'].get(sort, 0), reverse=True)
+        return nodes
+
+class ProcessTracker:
+    def __init__(self, proc_root="/proc", passwd_file=None, io_full_scan=256, io_hot=64, io_rotate=128):
+        self.proc_root = proc_root
+        self.passwd_file = passwd_file
+        self.clock_ticks = os.sysconf('SC_CLK_TCK')
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self._lock = threading.Lock()
+        # baseline name -> ({pid: (start_ticks, cpu_ticks)}, monotonic time) of its last sample;
+        # the sampler's ticks and request-path samples keep separate ones
+        self._baselines = {}
+        self._usernames = {}
+        self._passwd_mtime = None
+        # Below io_full_scan processes every /proc/[pid]/io is read each time;
+        # above it only the busiest, the recent top io users and a rotating slice
+        self.io_full_scan = io_full_scan
+        self.io_hot = io_hot
+        self.io_rotate = io_rotate
+        self._io = {}
+        self._io_cursor = 0
+        self._io_lock = threading.Lock()
+        # Latest sample() result, shared with the rollup views
+        self._snapshot = (None, [], None)
+        # Process dicts from a recording; while set, procfs is not read at all
+        self._frozen = None
+    
+    def pids(self):
+        """List the PIDs present under the procfs root"""
+        return [int(name) for name in os.listdir(self.proc_root) if name.isdigit()]
+    
+    def read_process(self, pid, with_cmdline=False):
+        """Parse /proc/[pid]/stat and status into a dict, or None if it exited"""
+        base = os.path.join(self.proc_root, str(pid))
+        try:
+            with open(os.path.join(base, 'stat'), 'rb') as f:
+                stat = f.read().decode('utf-8', 'replace')
+            uid = self._read_uid(base)
+            cmdline = None
+            if with_cmdline:
+                with open(os.path.join(base, 'cmdline'), 'rb') as f:
+                    cmdline = f.read().replace(b'\0', b' ').decode('utf-8', 'replace').strip()
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            return None
+        
+        # comm may contain spaces and parentheses; it ends at the last ')'
+        name = stat[stat.find('(') + 1:stat.rfind(')')]
+        fields = stat[stat.rfind(')') + 2:].split()
+        return {
+            'pid': pid,
+            'ppid': int(fields[1]),
+            'name': name,
+            'state': fields[0],
+            'uid': uid,
+            'cpu_ticks': int(fields[11]) + int(fields[12]),
+            'start_ticks': int(fields[19]),
+            'rss_bytes': int(fields[21]) * self.page_size,
+            'cmdline': cmdline
+        }
+    
+    def _read_uid(self, base):
+        with open(os.path.join(base, 'status'), 'rb') as f:
+            for line in f:
+                if line.startswith(b'Uid:'):
+                    return int(line.split()[1])
+        return -1
+    
+    def read_io(self, pid):
+        """Parse /proc/[pid]/io, or None if it exited or is not readable"""
+        counters = {}
+        try:
+            with open(os.path.join(self.proc_root, str(pid), 'io'), 'rb') as f:
+                for line in f:
+                    name, _, value = line.partition(b':')
+                    counters[name.decode()] = int(value)
+        except (FileNotFoundError, ProcessLookupError, PermissionError, ValueError):
+            return None
+        return counters
+    
+    def count_sockets(self, pid):
+        """Number of socket file descriptors held by pid, or None if not readable"""
+        base = os.path.join(self.proc_root, str(pid), 'fd')
+        try:
+            sockets = 0
+            for entry in os.scandir(base):
+                try:
+                    if os.readlink(entry.path).startswith('socket:'):
+                        sockets += 1
+                except OSError:
+                    continue
+            return sockets
+        except (FileNotFoundError, ProcessLookupError, PermissionError, NotADirectoryError):
+            return None
+    
+    def memory_total(self):
+        """MemTotal in bytes from the procfs meminfo"""
+        try:
+            with open(os.path.join(self.proc_root, 'meminfo')) as f:
+                for line in f:
+                    if line.startswith('MemTotal:'):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        return 0
+    
+    def username(self, uid):
+        """Resolve a uid, using passwd_file when one is configured"""
+        if self.passwd_file:
+            self._load_passwd_file()
+        name = self._usernames.get(uid)
+        if name is None:
+            try:
+                name = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                name = str(uid)
+            self._usernames[uid] = name
+        return name
+    
+    def _load_passwd_file(self):
+        try:
+            mtime = os.stat(self.passwd_file).st_mtime
+        except OSError:
+            return
+        if mtime == self._passwd_mtime:
+            return
+        names = {}
+        with open(self.passwd_file) as f:
+            for line in f:
+                parts = line.split(':', 3)
+                if len(parts) >= 3 and parts[2].isdigit():
+                    names[int(parts[2])] = parts[0]
+        self._usernames = names
+        self._passwd_mtime = mtime
+    
+    def sample(self, with_cmdline=False, baseline='sampler'):
+        """Read every process and compute CPU% against the previous sample; only `baseline` moves"""
+        if self._frozen is not None:
+            return list(self._frozen)
+        now = time.monotonic()
+        memory_total = self.memory_total()
+        processes = []
+        current = {}
+        
+        with self._lock:
+            # The newer of this caller's baseline and the sampler's gives the shortest window
+            candidates = [self._baselines[name] for name in (baseline, 'sampler') if name in self._baselines]
+            previous_cpu, previous_time = max(candidates, key=lambda entry: entry[1], default=({}, None))
+            elapsed = now - previous_time if previous_time else None
+            for pid in self.pids():
+                proc = self.read_process(pid, with_cmdline)
+                if proc is None:
+                    continue
+                
+                # A recycled PID has a different start time: treat it as new
+                previous = previous_cpu.get(pid)
+                cpu = 0.0
+                if elapsed and previous and previous[0] == proc['start_ticks']:
+                    used = (proc['cpu_ticks'] - previous[1]) / self.clock_ticks
+                    cpu = round(max(used, 0) / elapsed * 100, 1)
+                current[pid] = (proc['start_ticks'], proc['cpu_ticks'])
+                
+                proc['user'] = self.username(proc['uid'])
+                proc['cpu'] = cpu
+                proc['memory'] = round(proc['rss_bytes'] * 100.0 / memory_total, 1) if memory_total else 0.0
+                proc['status'] = STATUS_NAMES.get(proc['state'], proc['state'])
+                processes.append(proc)
+            
+            self._baselines[baseline] = (current, now)
+            self._snapshot = (now, processes, None)
+        return processes
+    
+    def snapshot(self, max_age=10.0):
+        """(taken, processes, rollup) of the latest sample, sampling again if older than max_age"""
+        with self._lock:
+            taken = self._snapshot[0]
+        if self._frozen is None and (taken is None or time.monotonic() - taken > max_age):
+            self.sample(baseline='request')
+        with self._lock:
+            return self._snapshot
+    
+    @property
+    def frozen(self):
+        return self._frozen is not None
+    
+    def freeze(self, processes):
+        """Serve these process dicts (a replayed recording) until freeze(None)"""
+        with self._lock:
+            self._frozen = processes
+            self._snapshot = (time.monotonic(), processes, None) if processes is not None else (None, [], None)
+    
+    def rollup(self, max_age=10.0):
+        """ProcessRollup of the latest sample, sampling again if it is older than max_age"""
+        taken, processes, rollup = self.snapshot(max_age)
+        if rollup is None:
+            rollup = ProcessRollup(processes)
+            with self._lock:
+                # Keep it unless a newer sample replaced the snapshot meanwhile
+                if self._snapshot[0] == taken:
+                    self._snapshot = (taken, processes, rollup)
+        return rollup
+    
+    def table(self, offset=0, limit=500, sort='cpu', descending=True, query=None, max_age=10.0):
+        """One page of the full process table, sorted and filtered server-side"""
+        try:
+            taken, processes, _ = self.snapshot(max_age)
+            total = len(processes)
+            if query:
+                query = query.lower()
+                processes = [p for p in processes
+                             if query in p['name'].lower() or query in p['user'].lower() or query == str(p['pid'])]
+            processes = sorted(processes, key=lambda p: p[sort], reverse=descending)
+            page = processes[offset:offset + limit] if limit else processes[offset:]
+            return {
+                'total': total,
+                'matched': len(processes),
+                'offset': offset,
+                'sort': sort,
+                'descending': descending,
+                'rows': [{
+                    'pid': p['pid'],
+                    'ppid': p['ppid'],
+                    'name': p['name'],
+                    'user': p['user'],
+                    'cpu': p['cpu'],
+                    'memory': p['memory'],
+                    'rss_bytes': p['rss_bytes'],
+                    'status': p['status']
+                } for p in page]
+            }
+        except Exception as e:
+            return {'error': str(e)}
+    
+    def groups(self, by='command', sort='cpu', limit=20):
+        """Top process groups by user or command name"""
+        try:
+            return self.rollup().groups(by, sort, limit)
+        except Exception as e:
+            return {'error': str(e)}
+    
+    def tree(self, pid=None, sort='cpu'):
+        """One level of the process tree below pid, for lazy expansion"""
+        try:
+            rollup = self.rollup()
+            if pid is not None and pid not in rollup.by_pid:
+                return {'error': f'Process {pid} not found'}
+            return {
+                'pid': pid,
+                'node': rollup.node(pid) if pid is not None else None,
+                'children': rollup.expand(pid, sort)
+            }
+        except Exception as e:
+            return {'error': str(e)}
+    
+    def _io_candidates(self, processes):
+        """Pick the processes whose io and fd tables are worth reading this round"""
+        if len(processes) <= self.io_full_scan:
+            return processes
+        
+        # Busy or blocked-on-disk processes, then last round's top io users
+        chosen = {p['pid']: p for p in processes if p['cpu'] > 0 or p['state'] == 'D'}
+        active = ((pid, state['read'] + state['write']) for pid, state in self._io.items())
+        hot = heapq.nlargest(self.io_hot, (item for item in active if item[1] > 0), key=lambda item: item[1])
+        by_pid = {p['pid']: p for p in processes}
+        for pid, _ in hot:
+            if pid in by_pid:
+                chosen[pid] = by_pid[pid]
+        
+        # A rotating slice so quiet processes are still refreshed eventually
+        start = self._io_cursor % len(processes)
+        for p in (processes[start:] + processes[:start])[:self.io_rotate]:
+            chosen[p['pid']] = p
+        self._io_cursor = start + self.io_rotate
+        return list(chosen.values())
+    
+    def sample_io(self, processes, now=None):
+        """Add io_read, io_write (bytes/s) and sockets to the dicts from sample()"""
+        if self._frozen is not None:
+            # Recorded rows carry their io fields, unless recorded at reduced detail
+            for proc in processes:
+                for field, default in (('io_read', 0.0), ('io_write', 0.0), ('sockets', None), ('io_age', None)):
+                    proc.setdefault(field, default)
+            return processes
+        now = now or time.monotonic()
+        with self._io_lock:
+            for proc in self._io_candidates(processes):
+                pid = proc['pid']
+                counters = self.read_io(pid)
+                if counters is None:
+                    continue
+                read_bytes = counters.get('read_bytes', 0)
+                write_bytes = counters.get('write_bytes', 0)
+                
+                # Rates are per pid between its own reads, which may be rounds apart
+                state = self._io.get(pid)
+                if state is None or state['start_ticks'] != proc['start_ticks']:
+                    state = {'start_ticks': proc['start_ticks'], 'read': 0.0, 'write': 0.0, 'sockets': None}
+                elif now > state['time']:
+                    elapsed = now - state['time']
+                    state['read'] = max(read_bytes - state['read_bytes'], 0) / elapsed
+                    state['write'] = max(write_bytes - state['write_bytes'], 0) / elapsed
+                state['time'] = now
+                state['read_bytes'] = read_bytes
+                state['write_bytes'] = write_bytes
+                state['sockets'] = self.count_sockets(pid)
+                self._io[pid] = state
+            
+            present = set()
+            for proc in processes:
+                pid = proc['pid']
+                present.add(pid)
+                state = self._io.get(pid)
+                if state is None or state['start_ticks'] != proc['start_ticks']:
+                    proc['io_read'] = proc['io_write'] = 0.0
+                    proc['sockets'] = None
+                    proc['io_age'] = None
+                    continue
+                proc['io_read'] = round(state['read'], 1)
+                proc['io_write'] = round(state['write'], 1)
+                proc['sockets'] = state['sockets']
+                proc['io_age'] = round(now - state['time'], 1)
+            
+            for pid in list(self._io):
+                if pid not in present:
+                    del self._io[pid]
+        return processes
+    
+    def top(self, limit=20, sort='cpu'):
+        """Return the top processes in the shell module's list format"""
+        try:
+            # The sampler's latest table; sampling here would reset its CPU baseline
+            _, processes, _ = self.snapshot()
+            with_io = sort in IO_SORT_KEYS
+            if with_io:
+                self.sample_io(processes)
+            # The sampled list is the shared snapshot; sorting it in place would
+            # show it empty to every reader for as long as the sort runs
+            rows = []
+            for p in heapq.nlargest(limit, processes, key=lambda p: p.get(sort) or 0):
+                row = {
+                    'pid': p['pid'],
+                    'user': p['user'],
+                    'cpu': p['cpu'],
+                    'memory': p['memory'],
+                    'name': p['name'],
+                    'status': p['status']
+                }
+                if with_io:
+                    row['io_read'] = p['io_read']
+                    row['io_write'] = p['io_write']
+                    row['sockets'] = p['sockets']
+                    row['io_age'] = p['io_age']
+                rows.append(row)
+            return rows
+        except Exception as e:
+            return {'error': str(e)}
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Counter-to-rate engine for web dashboard
+Turns cumulative disk, network and CPU counters into per-second rates
+"""
+
+import threading
+import time
+
+import psutil
+
+SKIP_DISK_PREFIXES = ('loop', 'ram', 'zram')
+
+def counter_delta(old, new):
+    """Difference between two counter readings, or None after a reset"""
+    if new >= old:
+        return new - old
+    # A counter close to its 32 or 64 bit limit that comes back small wrapped
+    for width in (1 << 32, 1 << 64):
+        if old < width:
+            wrapped = width - old + new
+            if wrapped < width >> 4:
+                return wrapped
+            break
+    return None
+
+class CounterRates:
+    """Keeps the previous reading per device and returns per-second deltas"""
+    
+    def __init__(self):
+        self._previous = {}
+    
+    def update(self, readings, now):
+        """readings: {device: {counter: value}}; returns {device: {counter: delta/s}}"""
+        rates = {}
+        current = {}
+        for device, counters in readings.items():
+            current[device] = (now, counters)
+            previous = self._previous.get(device)
+            # Hot-plugged devices only get a baseline on their first reading
+            if previous is None or now <= previous[0]:
+                continue
+            elapsed = now - previous[0]
+            device_rates = {}
+            for name, value in counters.items():
+                old = previous[1].get(name)
+                delta = counter_delta(old, value) if old is not None else None
+                device_rates[name] = delta / elapsed if delta is not None else None
+            rates[device] = (elapsed, device_rates)
+        # Devices that disappeared are forgotten
+        self._previous = current
+        return rates
+
+class RateEngine:
+    def __init__(self):
+        self._disks = CounterRates()
+        self._nics = CounterRates()
+        self._cpus = CounterRates()
+        self._lock = threading.Lock()
+        self._latest = None
+    
+    def sample(self, now=None):
+        """Read all counters once and compute rates against the previous read"""
+        now = now or time.monotonic()
+        disk_counters = psutil.disk_io_counters(perdisk=True) or {}
+        nic_counters = psutil.net_io_counters(pernic=True) or {}
+        cpu_times = psutil.cpu_times(percpu=True)
+        
+        with self._lock:
+            disks = self._disk_rates(disk_counters, now)
+            network = self._nic_rates(nic_counters, now)
+            cpu = self._cpu_rates(cpu_times, now)
+            if disks is None and network is None and cpu is None:
+                return self._latest
+            self._latest = {
+                'timestamp': time.time(),
+                'disks': disks or {},
+                'network': network or {},
+                'cpu': cpu or {}
+            }
+            return self._latest
+    
+    def latest(self):
+        """Rates from the most recent sample, or None before two samples"""
+        with self._lock:
+            return self._latest
+    
+    def _disk_rates(self, counters, now):
+        readings = {}
+        for device, io in counters.items():
+            if device.startswith(SKIP_DISK_PREFIXES):
+                continue
+            readings[device] = {
+                'reads': io.read_count,
+                'writes': io.write_count,
+                'read_bytes': io.read_bytes,
+                'write_bytes': io.write_bytes,
+                'read_time': io.read_time,
+                'write_time': io.write_time,
+                'busy_time': getattr(io, 'busy_time', 0)
+            }
+        rates = self._disks.update(readings, now)
+        if not rates:
+            return None
+        
+        disks = {}
+        for device, (elapsed, r) in rates.items():
+            ios = (r['reads'] or 0) + (r['writes'] or 0)
+            io_time = (r['read_time'] or 0) + (r['write_time'] or 0)
+            disks[device] = {
+                'read_iops': round(r['reads'] or 0, 2),
+                'write_iops': round(r['writes'] or 0, 2),
+                'read_bytes_per_sec': round(r['read_bytes'] or 0, 1),
+                'write_bytes_per_sec': round(r['write_bytes'] or 0, 1),
+                # read/write_time are milliseconds spent per second of wall time
+                'await_ms': round(io_time / ios, 2) if ios else 0.0,
+                'util_percent': round(min((r['busy_time'] or 0) / 10.0, 100.0), 1)
+            }
+        return disks
+    
+    def _nic_rates(self, counters, now):
+        readings = {nic: io._asdict() for nic, io in counters.items()}
+        rates = self._nics.update(readings, now)
+        if not rates:
+            return None
+        
+        network = {}
+        for nic, (elapsed, r) in rates.items():
+            network[nic] = {
+                'bytes_recv_per_sec': round(r['bytes_recv'] or 0, 1),
+                'bytes_sent_per_sec': round(r['bytes_sent'] or 0, 1),
+                'packets_recv_per_sec': round(r['packets_recv'] or 0, 2),
+                'packets_sent_per_sec': round(r['packets_sent'] or 0, 2),
+                'errors_per_sec': round((r['errin'] or 0) + (r['errout'] or 0), 2),
+                'drops_per_sec': round((r['dropin'] or 0) + (r['dropout'] or 0), 2)
+            }
+        return network
+    
+    def _cpu_rates(self, cpu_times, now):
+        readings = {index: times._asdict() for index, times in enumerate(cpu_times)}
+        rates = self._cpus.update(readings, now)
+        if not rates:
+            return None
+        
+        cores = []
+        totals = {}
+        for index in sorted(rates):
+            elapsed, r = rates[index]
+            r = {name: value or 0.0 for name, value in r.items()}
+            # guest time is already included in user time
+            total = sum(value for name, value in r.items() if not name.startswith('guest'))
+            breakdown = self._cpu_breakdown(r, total)
+            breakdown['core'] = index
+            cores.append(breakdown)
+            for name, value in r.items():
+                totals[name] = totals.get(name, 0.0) + value
+        
+        total = sum(value for name, value in totals.items() if not name.startswith('guest'))
+        return {'total': self._cpu_breakdown(totals, total), 'per_core': cores}
+    
+    def _cpu_breakdown(self, r, total):
+        def percent(name):
+            return round(r.get(name, 0.0) * 100.0 / total, 1) if total else 0.0
+        idle = percent('idle')
+        return {
+            'user': round(percent('user') + percent('nice'), 1),
+            'system': round(percent('system') + percent('irq') + percent('softirq'), 1),
+            'iowait': percent('iowait'),
+            'steal': percent('steal'),
+            'idle': idle,
+            'busy': round(100.0 - idle - percent('iowait'), 1)
+        }
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Flight recorder for web dashboard
+Writes every sampler tick as a delta against the previous one into a
+bounded pair of rolling files, and reads recordings back for replay
+"""
+
+import bisect
+import json
+import math
+import os
+import struct
+import threading
+import time
+import zlib
+
+from web_modules.perf import registry as perf
+from web_modules.process_tracker import STATUS_NAMES
+
+MAGIC = b'LSMDREC1\n'
+# kind (1 keyframe, 2 delta), timestamp, payload length
+HEADER = struct.Struct('<BdI')
+KEYFRAME = 1
+DELTA = 2
+
+# Process fields worth keeping; cpu_ticks and cmdline change or weigh too much,
+# status follows from state and is filled back in by process_rows()
+PROCESS_FIELDS = ('pid', 'ppid', 'name', 'state', 'uid', 'user', 'start_ticks', 'rss_bytes',
+                  'cpu', 'memory', 'io_read', 'io_write', 'sockets', 'io_age')
+
+# Views derived from the process table or from sections recorded on their own
+SKIP_SNAPSHOTS = ('dashboard', 'processes', 'system-metrics', 'rates')
+
+# Snapshots recorded every tick; the rest, like sections, once per slow_interval
+LIVE_SNAPSHOTS = ('alerts-active',)
+
+def diff(old, new):
+    """Changes turning dict old into dict new: s(et), p(atch) and d(elete)"""
+    changes = {}
+    for key, value in new.items():
+        if key not in old:
+            changes.setdefault('s', {})[key] = value
+            continue
+        previous = old[key]
+        if previous == value:
+            continue
+        if isinstance(previous, dict) and isinstance(value, dict):
+            changes.setdefault('p', {})[key] = diff(previous, value)
+        else:
+            changes.setdefault('s', {})[key] = value
+    removed = [key for key in old if key not in new]
+    if removed:
+        changes['d'] = removed
+    return changes
+
+def patch(old, changes):
+    """Apply a diff() result; old is left untouched"""
+    new = dict(old)
+    for key, value in changes.get('s', {}).items():
+        new[key] = value
+    for key, sub in changes.get('p', {}).items():
+        new[key] = patch(new.get(key) or {}, sub)
+    for key in changes.get('d', ()):
+        new.pop(key, None)
+    return new
+
+def _significant(value, digits=3):
+    """Round to a few significant digits; exact io rates are noise that defeats deltas"""
+    if not value:
+        return 0
+    places = digits - 1 - math.floor(math.log10(abs(value)))
+    return round(value, places) if places > 0 else int(round(value, places))
+
+def _process_row(proc):
+    row = {field: proc[field] for field in PROCESS_FIELDS if field in proc}
+    # Coarse enough that an idle process's jitter (a stray tick of CPU, a few
+    # pages of RSS) leaves its row unchanged and costs nothing in the delta
+    if row.get('cpu'):
+        row['cpu'] = round(row['cpu']) if row['cpu'] < 10 else _significant(row['cpu'], 2)
+    if row.get('rss_bytes'):
+        row['rss_bytes'] = _significant(row['rss_bytes'])
+    for field in ('io_read', 'io_write'):
+        if row.get(field):
+            row[field] = _significant(row[field])
+    if row.get('io_age'):
+        row['io_age'] = round(row['io_age'])
+    return row
+
+def process_rows(state):
+    """The process dicts of a recorded state, as the tracker would have sampled them"""
+    rows = []
+    for row in state['processes'].values():
+        row = dict(row)
+        row['status'] = STATUS_NAMES.get(row.get('state'), row.get('state'))
+        rows.append(row)
+    return rows
+
+def _plain(value):
+    """value as JSON will give it back (string keys, lists for tuples), so diffs stay quiet"""
+    return json.loads(json.dumps(value, default=str))
+
+def _frames(f, size):
+    """Yield (kind, timestamp, offset, length) for every complete frame in f"""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f'{f.name} is not an LSMD recording')
+    while True:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return
+        kind, stamp, length = HEADER.unpack(header)
+        offset = f.tell()
+        if offset + length > size:
+            # A frame still being written, or cut short by a crash
+            return
+        f.seek(length, os.SEEK_CUR)
+        yield kind, stamp, offset, length
+
+def _complete_length(path):
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        end = len(MAGIC)
+        for _, _, offset, length in _frames(f, size):
+            end = offset + length
+    return end
+
+class FlightRecorder:
+    """Sampler listener appending delta-compressed state to path and path.1"""
+    
+    def __init__(self, path, store=None, max_bytes=100 * 1024 * 1024, keyframe_interval=900.0,
+                 refreshers=None, refresh_interval=60.0, sections=None, slow_interval=60.0, level=9):
+        self.path = path
+        self.store = store
+        # Both files together stay under max_bytes
+        self.max_bytes = max_bytes
+        self.keyframe_interval = keyframe_interval
+        # name -> provider, re-run when the store's copy is older than refresh_interval
+        self.refreshers = refreshers or {}
+        self.refresh_interval = refresh_interval
+        # name -> callable whose result is recorded once per slow_interval, along
+        # with every snapshot but LIVE_SNAPSHOTS; ticks in between repeat it
+        self.sections = sections or {}
+        self.slow_interval = slow_interval
+        self._slow = None
+        self.level = level
+        self._lock = threading.Lock()
+        self._file = None
+        self._compressor = None
+        self._previous = None
+        self._keyframe_time = None
+        self.frames = 0
+        self.bytes_written = 0
+        self.last_frame_bytes = None
+        self.error = None
+    
+    def capture(self, sampler, now):
+        """The full state recorded for one tick"""
+        slow = self._slow is None or now - self._slow[0] >= self.slow_interval
+        live = {}
+        slow_snapshots = {}
+        if self.store is not None:
+            for name, provider in self.refreshers.items():
+                snapshot = self.store.get(name)
+                if snapshot is None or snapshot.age() > self.refresh_interval:
+                    try:
+                        self.store.publish(name, provider())
+                    except Exception as e:
+                        self.store.publish(name, {'error': str(e)})
+            for name, snapshot in self.store.items():
+                if name in LIVE_SNAPSHOTS:
+                    live[name] = snapshot.data
+                elif slow and not name.startswith(SKIP_SNAPSHOTS):
+                    slow_snapshots[name] = snapshot.data
+        if slow:
+            self._slow = (now, _plain({name: section() for name, section in self.sections.items()}),
+                          _plain(slow_snapshots))
+        _, sections, slow_snapshots = self._slow
+        # Process rows hold only plain values and skip the JSON round trip
+        return {
+            'time': now,
+            'metrics': dict(sampler.metrics),
+            'rates': _plain(sampler.rates),
+            'processes': {str(proc['pid']): _process_row(proc) for proc in sampler.processes},
+            'sections': sections,
+            'snapshots': dict(slow_snapshots, **_plain(live))
+        }
+    
+    def _open(self):
+        """Start a new file, rolling the current one over to path.1"""
+        if self._file is not None:
+            self._file.close()
+            os.replace(self.path, self.path + '.1')
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        else:
+            # Continuing a file from an earlier run: cut a frame left half-written
+            self._file.truncate(_complete_length(self.path))
+            self._file.seek(0, os.SEEK_END)
+        self._previous = None
+    
+    def write(self, state, now):
+        """Append one state, as a keyframe or as a delta against the last one"""
+        with self._lock:
+            if self._file is None or self._file.tell() > self.max_bytes // 2:
+                self._open()
+            
+            keyframe = self._previous is None or now - self._keyframe_time >= self.keyframe_interval
+            if keyframe:
+                # Each keyframe starts a fresh compression stream so replay can begin there
+                self._compressor = zlib.compressobj(self.level)
+                self._keyframe_time = now
+                body = state
+            else:
+                body = diff(self._previous, state)
+            
+            data = json.dumps(body, separators=(',', ':')).encode('utf-8')
+            payload = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._file.write(HEADER.pack(KEYFRAME if keyframe else DELTA, now, len(payload)) + payload)
+            self._file.flush()
+            self._previous = state
+            self.frames += 1
+            self.last_frame_bytes = HEADER.size + len(payload)
+            self.bytes_written += self.last_frame_bytes
+    
+    def record(self, sampler, metrics, now):
+        """Sampler listener: one frame per tick"""
+        start = time.perf_counter()
+        try:
+            self.write(self.capture(sampler, now), now)
+            self.error = None
+        except (OSError, ValueError, TypeError) as e:
+            self.error = str(e)
+        perf.record_collector('recorder', time.perf_counter() - start)
+    
+    def stats(self):
+        with self._lock:
+            sizes = {}
+            for path in (self.path + '.1', self.path):
+                try:
+                    sizes[path] = os.path.getsize(path)
+                except OSError:
+                    pass
+            return {
+                'path': self.path,
+                'files': sizes,
+                'max_bytes': self.max_bytes,
+                'frames': self.frames,
+                'bytes_written': self.bytes_written,
+                'last_frame_bytes': self.last_frame_bytes,
+                'error': self.error
+            }
+
+class Recording:
+    """A recording (path.1 then path) indexed by frame time for random access"""
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._frames = []
+        self._times = []
+        self._signature = None
+        # (frame index, decompressor, state) of the last state rebuilt
+        self._cursor = None
+        self.reload()
+    
+    def _files(self):
+        return [path for path in (self.path + '.1', self.path) if os.path.exists(path)]
+    
+    def reload(self):
+        """Re-index when either file changed since the last look"""
+        with self._lock:
+            files = self._files()
+            signature = [(path, os.stat(path).st_ino, os.path.getsize(path)) for path in files]
+            if signature == self._signature:
+                return
+            frames = []
+            for path, _, size in signature:
+                with open(path, 'rb') as f:
+                    for kind, stamp, offset, length in _frames(f, size):
+                        frames.append((stamp, kind, path, offset, length))
+            # A delta is only readable from its keyframe; drop any orphaned leading ones
+            while frames and frames[0][1] != KEYFRAME:
+                frames.pop(0)
+            self._frames = frames
+            self._times = [frame[0] for frame in frames]
+            self._signature = signature
+            self._cursor = None
+    
+    def info(self):
+        with self._lock:
+            return {
+                'path': self.path,
+                'frames': len(self._frames),
+                'keyframes': sum(1 for frame in self._frames if frame[1] == KEYFRAME),
+                'start': self._times[0] if self._times else None,
+                'end': self._times[-1] if self._times else None,
+                'bytes': sum(os.path.getsize(path) for path in self._files())
+            }
+    
+    def _read(self, frame):
+        _, _, path, offset, length = frame
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+    
+    def state_at(self, when):
+        """The recorded state as of `when`, or None before the recording starts"""
+        with self._lock:
+            index = bisect.bisect_right(self._times, when) - 1
+            if index < 0:
+                return None
+            
+            cursor = self._cursor
+            if cursor is not None and cursor[0] == index:
+                return cursor[2]
+            start = index
+            while self._frames[start][1] != KEYFRAME:
+                start -= 1
+            # Moving forward inside one keyframe segment continues from the last state
+            if cursor is not None and start <= cursor[0] < index:
+                position, decompressor, state = cursor[0] + 1, cursor[1].copy(), cursor[2]
+            else:
+                position, decompressor, state = start, None, None
+            
+            for i in range(position, index + 1):
+                frame = self._frames[i]
+                if frame[1] == KEYFRAME:
+                    decompressor = zlib.decompressobj()
+                    state = json.loads(decompressor.decompress(self._read(frame)))
+                else:
+                    state = patch(state, json.loads(decompressor.decompress(self._read(frame))))
+            self._cursor = (index, decompressor, state)
+            return state
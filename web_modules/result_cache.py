@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Single-flight result cache for web dashboard
+Concurrent identical calls share one execution; results are kept for a
+per-operation TTL in an LRU-bounded table
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+def _is_error(result):
+    return isinstance(result, dict) and 'error' in result
+
+class _Flight:
+    """One in-progress computation that late callers wait on"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+
+class ResultCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._generations = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+    
+    def _stat(self, operation):
+        stats = self._stats.get(operation)
+        if stats is None:
+            stats = self._stats[operation] = {'hits': 0, 'misses': 0, 'coalesced': 0,
+                                              'evictions': 0, 'invalidations': 0}
+        return stats
+    
+    def get(self, operation, args, ttl, compute):
+        """Return a fresh cached result, join an in-flight call, or compute"""
+        key = (operation, args)
+        with self._lock:
+            stats = self._stat(operation)
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry[0]:
+                self._entries.move_to_end(key)
+                stats['hits'] += 1
+                return entry[1]
+            
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                stats['misses'] += 1
+                flight = self._flights[key] = _Flight()
+                generation = self._generations.get(operation, 0)
+            else:
+                stats['coalesced'] += 1
+        
+        if not leader:
+            flight.done.wait()
+            if flight.exception is not None:
+                raise flight.exception
+            return flight.result
+        
+        try:
+            flight.result = compute()
+        except Exception as e:
+            flight.exception = e
+        finally:
+            with self._lock:
+                del self._flights[key]
+                # Errors are not cached, nor results that an invalidation overtook
+                if (flight.exception is None and not _is_error(flight.result)
+                        and self._generations.get(operation, 0) == generation):
+                    self._entries[key] = (time.monotonic() + ttl, flight.result)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        evicted, _ = self._entries.popitem(last=False)
+                        self._stat(evicted[0])['evictions'] += 1
+            flight.done.set()
+        if flight.exception is not None:
+            raise flight.exception
+        return flight.result
+    
+    def invalidate(self, *operations):
+        """Drop every cached result of the given operations, or of all of them"""
+        with self._lock:
+            # Every operation ever called has stats, including ones in flight now
+            operations = operations or tuple(self._stats)
+            for operation in operations:
+                self._generations[operation] = self._generations.get(operation, 0) + 1
+                self._stat(operation)['invalidations'] += 1
+            for key in [key for key in self._entries if key[0] in operations]:
+                del self._entries[key]
+    
+    def stats(self):
+        with self._lock:
+            sizes = {}
+            for operation, _ in self._entries:
+                sizes[operation] = sizes.get(operation, 0) + 1
+            operations = {}
+            for operation, stats in self._stats.items():
+                lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+                operations[operation] = dict(
+                    stats,
+                    entries=sizes.get(operation, 0),
+                    hit_rate=round((stats['hits'] + stats['coalesced']) / lookups, 3) if lookups else None
+                )
+            return {'entries': len(self._entries), 'max_entries': self.max_entries, 'operations': operations}
+
+def cached(operation, ttl):
+    """Cache a method's result in self.cache, keyed by its positional arguments"""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args):
+            return self.cache.get(operation, args, ttl, lambda: method(self, *args))
+        return wrapper
+    return decorator
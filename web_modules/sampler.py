@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Background metrics sampler for web dashboard
+"""
+
+import heapq
+import os
+import threading
+import time
+from collections import deque
+
+import psutil
+
+from web_modules.perf import registry as perf
+
+SKIP_FSTYPES = ['squashfs', 'tmpfs', 'devtmpfs', 'overlay']
+
+class Sampler:
+    """Collects flat metrics on a fixed interval and notifies listeners"""
+    
+    def __init__(self, store=None, interval=5.0, history=720, process_tracker=None, top_processes=10,
+                 rate_engine=None, budget=None):
+        self.store = store
+        self.process_tracker = process_tracker
+        self.top_processes = top_processes
+        self.processes = []
+        self.rate_engine = rate_engine
+        self.rates = None
+        self.interval = interval
+        # An OverheadBudget adjusts interval and detail from each tick's own cost
+        self.budget = budget
+        self.detail = 'full'
+        self._own_process = psutil.Process()
+        self.history_length = history
+        self.metrics = {}
+        self.history = {}
+        self.timestamp = None
+        self.ticks = 0
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def add_listener(self, listener):
+        """Call listener(sampler, metrics, now) after every tick"""
+        self._listeners.append(listener)
+    
+    def collect(self):
+        """Read one set of metrics; every value is a plain number"""
+        metrics = {}
+        metrics['cpu.percent'] = psutil.cpu_percent(interval=None)
+        
+        memory = psutil.virtual_memory()
+        metrics['memory.percent'] = memory.percent
+        metrics['memory.available_bytes'] = memory.available
+        
+        swap = psutil.swap_memory()
+        metrics['swap.percent'] = swap.percent
+        metrics['swap.in_bytes'] = swap.sin
+        metrics['swap.out_bytes'] = swap.sout
+        
+        load = os.getloadavg() if hasattr(os, 'getloadavg') else (0, 0, 0)
+        metrics['load.1'] = load[0]
+        metrics['load.5'] = load[1]
+        
+        for partition in psutil.disk_partitions():
+            if partition.fstype in SKIP_FSTYPES:
+                continue
+            try:
+                usage = psutil.disk_usage(partition.mountpoint)
+            except (PermissionError, FileNotFoundError, OSError):
+                continue
+            metrics[f'disk.{partition.mountpoint}.percent'] = usage.percent
+            metrics[f'disk.{partition.mountpoint}.free_percent'] = round(100.0 - usage.percent, 1)
+        
+        for nic, counters in psutil.net_io_counters(pernic=True).items():
+            metrics[f'net.{nic}.bytes_recv'] = counters.bytes_recv
+            metrics[f'net.{nic}.bytes_sent'] = counters.bytes_sent
+        
+        if self.rate_engine is not None:
+            self.rates = self.rate_engine.sample()
+            if self.rates:
+                cpu = self.rates['cpu'].get('total', {})
+                metrics['cpu.iowait_percent'] = cpu.get('iowait', 0.0)
+                metrics['cpu.steal_percent'] = cpu.get('steal', 0.0)
+                for device, disk in self.rates['disks'].items():
+                    metrics[f'diskio.{device}.util_percent'] = disk['util_percent']
+                    metrics[f'diskio.{device}.await_ms'] = disk['await_ms']
+        
+        # Reduced detail drops per-process io and fd reads and keeps fewer top
+        # processes; minimal also re-reads the process table only every third tick
+        if self.process_tracker is not None and (self.detail != 'minimal' or self.ticks % 3 == 0):
+            self.processes = self.process_tracker.sample()
+            if self.detail == 'full':
+                # Keeps per-process io baselines warm for the io sorted views
+                self.process_tracker.sample_io(self.processes)
+            top = self.top_processes if self.detail == 'full' else min(self.top_processes, 3)
+            largest = heapq.nlargest(top, self.processes, key=lambda p: p['rss_bytes'])
+            for proc in largest:
+                metrics[f"proc.{proc['pid']}:{proc['name']}.rss_bytes"] = proc['rss_bytes']
+        return metrics
+    
+    def tick(self):
+        """Collect, record history, publish and notify listeners once"""
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        now = time.time()
+        metrics = self.collect()
+        
+        with self._lock:
+            for name, value in metrics.items():
+                series = self.history.get(name)
+                if series is None:
+                    series = self.history[name] = deque(maxlen=self.history_length)
+                series.append((now, value))
+            self.metrics = metrics
+            self.timestamp = now
+            self.ticks += 1
+        
+        if self.store is not None:
+            self.store.publish('system-metrics', metrics)
+            if self.rates:
+                self.store.publish('rates', self.rates)
+        
+        for listener in self._listeners:
+            try:
+                listener(self, metrics, now)
+            except Exception as e:
+                print(f"Sampler listener {listener!r} failed: {e}")
+        
+        elapsed = time.perf_counter() - start
+        perf.record_collector('sampler', elapsed)
+        if self.budget is not None:
+            # Listeners run on this thread, so their cost counts against the budget too
+            self.interval, self.detail = self.budget.update(
+                time.thread_time() - cpu_start, elapsed, self._own_process.memory_info().rss)
+        return metrics
+    
+    def get_history(self, name):
+        """Return a list of (timestamp, value) for one metric"""
+        with self._lock:
+            return list(self.history.get(name, ()))
+    
+    def is_running(self):
+        return self._thread is not None
+    
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='lsmd-sampler', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self):
+        scheduled = time.monotonic()
+        while not self._stop.is_set():
+            perf.record_sampler_lag(max(time.monotonic() - scheduled, 0.0))
+            self.tick()
+            scheduled += self.interval
+            # Skip missed slots instead of bursting to catch up
+            now = time.monotonic()
+            if scheduled < now:
+                scheduled = now + self.interval
+            self._stop.wait(scheduled - now)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Process signalling for web dashboard
+Signals every selected process through a pidfd, waits on all of them at
+once and escalates to SIGKILL when they outlive the timeout
+"""
+
+import errno
+import os
+import resource
+import select
+import signal
+import time
+
+# Signals accepted by name; the first four escalate to SIGKILL
+SIGNALS = ('TERM', 'INT', 'HUP', 'QUIT', 'KILL', 'STOP', 'CONT', 'USR1', 'USR2')
+ESCALATING = ('TERM', 'INT', 'HUP', 'QUIT')
+MAX_TARGETS = 20000
+# Extra selection passes a sweep makes to catch processes forked meanwhile
+SWEEP_ROUNDS = 5
+# Liveness polling interval when pidfds are not available
+POLL_INTERVAL = 0.05
+# Descriptors asked for beyond max_targets, and kept free while signalling
+# so procfs reads and the server's own sockets still get one
+FD_HEADROOM = 256
+FD_RESERVE = 64
+
+def raise_fd_limit(wanted):
+    """Lift the soft open-file limit towards wanted, up to the hard limit"""
+    try:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+        if soft != resource.RLIM_INFINITY and soft < target:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    except (ValueError, OSError):
+        pass
+
+def free_fds():
+    """Descriptors this process can still open under its soft limit"""
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return MAX_TARGETS + FD_HEADROOM
+    return soft - len(os.listdir('/proc/self/fd'))
+
+class ProcessSignaller:
+    """Resolves selectors to processes and signals them without hitting recycled PIDs"""
+    
+    def __init__(self, tracker, cgroups=None, max_targets=MAX_TARGETS):
+        self.tracker = tracker
+        self.cgroups = cgroups
+        self.max_targets = max_targets
+        self.pidfd = hasattr(os, 'pidfd_open') and hasattr(signal, 'pidfd_send_signal')
+        if self.pidfd:
+            # Every target holds a pidfd until the call ends
+            raise_fd_limit(max_targets + FD_HEADROOM)
+    
+    def select(self, pids=None, name=None, user=None, cgroup=None, tree=None):
+        """Processes matching every given selector, from a fresh procfs sample"""
+        if all(value in (None, '', []) for value in (pids, name, user, cgroup, tree)):
+            raise ValueError('Give at least one selector: pids, name, user, cgroup or tree')
+        # Fresh PIDs, measured against a baseline of their own so the sampler's stays put
+        processes = self.tracker.sample(baseline='request')
+        if tree not in (None, ''):
+            children = {}
+            for proc in processes:
+                children.setdefault(proc['ppid'], []).append(proc['pid'])
+            wanted = set()
+            stack = [int(tree)]
+            while stack:
+                pid = stack.pop()
+                if pid not in wanted:
+                    wanted.add(pid)
+                    stack.extend(children.get(pid, ()))
+            processes = [proc for proc in processes if proc['pid'] in wanted]
+        if pids:
+            wanted = {int(pid) for pid in ([pids] if isinstance(pids, (int, str)) else pids)}
+            processes = [proc for proc in processes if proc['pid'] in wanted]
+        if name:
+            names = {name} if isinstance(name, str) else set(name)
+            processes = [proc for proc in processes if proc['name'] in names]
+        if user not in (None, ''):
+            users = {str(user)} if isinstance(user, (int, str)) else {str(entry) for entry in user}
+            processes = [proc for proc in processes if proc['user'] in users or str(proc['uid']) in users]
+        if cgroup:
+            if self.cgroups is None:
+                raise ValueError('cgroup selection is not available')
+            # A cgroup selects the processes in it and in every cgroup below it
+            prefix = '/' + cgroup.strip('/')
+            matched = []
+            for proc in processes:
+                path = self.cgroups.cgroup_of(proc['pid'])
+                if path is not None and (prefix == '/' or path == prefix or path.startswith(prefix + '/')):
+                    matched.append(proc)
+            processes = matched
+        return processes
+    
+    def _protected(self, proc):
+        # init, this server, and kernel threads
+        return proc['pid'] in (1, 2, os.getpid()) or proc['ppid'] == 2
+    
+    def _alive(self, proc):
+        current = self.tracker.read_process(proc['pid'])
+        return (current is not None and current['start_ticks'] == proc['start_ticks']
+                and current['state'] not in ('Z', 'X'))
+    
+    def _open(self, proc, pidfd=True):
+        """(still there, pidfd or None) for the process selected as proc"""
+        fd = None
+        if self.pidfd and pidfd:
+            try:
+                fd = os.pidfd_open(proc['pid'])
+            except ProcessLookupError:
+                return False, None
+            except OSError as e:
+                if e.errno in (errno.EMFILE, errno.ENFILE):
+                    # Out of descriptors: this target gets start-time-checked kill() instead
+                    fd = None
+                elif e.errno == errno.ENOSYS:
+                    # Kernel older than 5.3: fall back to checking start times before each kill
+                    self.pidfd = False
+                else:
+                    raise
+        # The pidfd pins whatever holds the PID now; make sure it is the process selected
+        if not self._alive(proc):
+            if fd is not None:
+                os.close(fd)
+            return False, None
+        return True, fd
+    
+    def _add(self, processes, results, targets):
+        added = {}
+        # Past the descriptor budget targets go by start-time-checked kill()
+        spare = free_fds() - FD_RESERVE if self.pidfd else 0
+        for proc in processes:
+            pid = proc['pid']
+            result = results[pid] = {
+                'pid': pid,
+                'name': proc['name'],
+                'user': proc.get('user'),
+                'signals': [],
+                'outcome': None
+            }
+            if self._protected(proc):
+                result['outcome'] = 'protected'
+                continue
+            try:
+                alive, fd = self._open(proc, spare > 0)
+            except OSError as e:
+                result['outcome'] = 'error'
+                result['error'] = e.strerror
+                continue
+            if not alive:
+                result['outcome'] = 'gone'
+                continue
+            if fd is not None:
+                spare -= 1
+            added[pid] = (fd, proc)
+        targets.update(added)
+        return added
+    
+    def _drop(self, targets, pid):
+        fd = targets.pop(pid)[0]
+        if fd is not None:
+            os.close(fd)
+    
+    def _send(self, targets, results, name, subset=None):
+        """Send one signal to every target; ones that are gone or denied drop out"""
+        number = getattr(signal, 'SIG' + name)
+        for pid, (fd, proc) in list((subset if subset is not None else targets).items()):
+            try:
+                if fd is not None:
+                    signal.pidfd_send_signal(fd, number)
+                elif self._alive(proc):
+                    os.kill(pid, number)
+                else:
+                    raise ProcessLookupError
+                results[pid]['signals'].append(name)
+            except ProcessLookupError:
+                results[pid]['outcome'] = 'exited' if results[pid]['signals'] else 'gone'
+                self._drop(targets, pid)
+            except PermissionError:
+                results[pid]['outcome'] = 'denied'
+                self._drop(targets, pid)
+    
+    def _exited(self, targets, results, pid, outcome, start):
+        results[pid]['outcome'] = outcome
+        results[pid]['exit_ms'] = round((time.monotonic() - start) * 1000, 1)
+        self._drop(targets, pid)
+    
+    def _wait(self, targets, results, timeout, outcome, start):
+        """Wait for all targets at once until they exit or the timeout passes"""
+        deadline = time.monotonic() + timeout
+        # A pidfd turns readable when its process exits
+        poller = select.poll()
+        by_fd = {}
+        for pid, (fd, _) in targets.items():
+            if fd is not None:
+                poller.register(fd, select.POLLIN)
+                by_fd[fd] = pid
+        while targets:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                break
+            if by_fd:
+                for fd, _ in poller.poll(left * 1000 if len(by_fd) == len(targets) else POLL_INTERVAL * 1000):
+                    poller.unregister(fd)
+                    self._exited(targets, results, by_fd.pop(fd), outcome, start)
+            else:
+                time.sleep(min(POLL_INTERVAL, left))
+            for pid, (fd, proc) in list(targets.items()):
+                if fd is None and not self._alive(proc):
+                    self._exited(targets, results, pid, outcome, start)
+    
+    def signal(self, selectors, name='TERM', timeout=5.0, escalate=True, kill_timeout=2.0,
+               sweep=False, dry_run=False):
+        """Signal every process matching selectors and report one outcome per PID"""
+        if self.tracker.proc_root != '/proc':
+            raise ValueError(f'Signalling needs the live /proc, not {self.tracker.proc_root}')
+        name = str(name).upper()
+        name = name[3:] if name.startswith('SIG') else name
+        if name not in SIGNALS:
+            raise ValueError(f"Unknown signal {name}; use one of {', '.join(SIGNALS)}")
+        processes = self.select(**selectors)
+        if len(processes) > self.max_targets:
+            raise ValueError(f'{len(processes)} processes match; at most {self.max_targets} can be signalled at once')
+        if dry_run:
+            return {
+                'signal': name,
+                'dry_run': True,
+                'matched': len(processes),
+                'processes': [{'pid': proc['pid'], 'name': proc['name'], 'user': proc.get('user')}
+                              for proc in processes]
+            }
+        
+        start = time.monotonic()
+        results = {}
+        targets = {}
+        try:
+            self._add(processes, results, targets)
+            if sweep:
+                # Freeze what matched, then catch anything it forked meanwhile,
+                # so a fork bomb or a respawning pool cannot outrun the kill
+                self._send(targets, results, 'STOP')
+                for _ in range(SWEEP_ROUNDS):
+                    fresh = [proc for proc in self.select(**selectors) if proc['pid'] not in results]
+                    if not fresh:
+                        break
+                    self._send(targets, results, 'STOP', self._add(fresh, results, targets))
+            
+            # Every handle is open before the first signal goes out
+            self._send(targets, results, name)
+            if name != 'KILL':
+                # A stopped process only acts on the signal once continued
+                stopped = {pid: target for pid, target in targets.items()
+                           if sweep or target[1]['state'] == 'T'}
+                if stopped and name != 'STOP':
+                    self._send(targets, results, 'CONT', stopped)
+            
+            if name in ESCALATING or name == 'KILL':
+                self._wait(targets, results, timeout, 'exited', start)
+                if targets and escalate and name != 'KILL':
+                    self._send(targets, results, 'KILL')
+                    self._wait(targets, results, kill_timeout, 'killed', start)
+                for pid in targets:
+                    results[pid]['outcome'] = 'running'
+            else:
+                for pid in targets:
+                    results[pid]['outcome'] = 'signalled'
+        finally:
+            for pid in list(targets):
+                self._drop(targets, pid)
+        
+        summary = {}
+        for result in results.values():
+            summary[result['outcome']] = summary.get(result['outcome'], 0) + 1
+        return {
+            'signal': name,
+            'pidfd': self.pidfd,
+            'matched': len(results),
+            'summary': summary,
+            'elapsed_ms': round((time.monotonic() - start) * 1000, 1),
+            'results': sorted(results.values(), key=lambda result: result['pid'])
+        }
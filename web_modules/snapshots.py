@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Snapshot store for web dashboard API data
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+class Snapshot:
+    """One published generation of an API payload"""
+
+    def __init__(self, name, generation, data):
+        self.name = name
+        self.generation = generation
+        self.data = data
+        self.timestamp = time.time()
+        self.monotonic = time.monotonic()
+
+    def age(self):
+        """Seconds since this snapshot was published or confirmed unchanged"""
+        return time.monotonic() - self.monotonic
+
+class SnapshotStore:
+    """Keeps the latest data per API name plus its serialized encodings"""
+
+    def __init__(self, max_encoded=64):
+        self.max_encoded = max_encoded
+        self._lock = threading.Lock()
+        self._snapshots = {}
+        self._encoded = OrderedDict()
+
+    def publish(self, name, data):
+        """Store data under name, bumping the generation only when it changed"""
+        with self._lock:
+            previous = self._snapshots.get(name)
+            if previous is not None and previous.data == data:
+                # Same content: keep the generation so cached encodings stay valid
+                previous.timestamp = time.time()
+                previous.monotonic = time.monotonic()
+                return previous
+
+            generation = previous.generation + 1 if previous else 1
+            snapshot = Snapshot(name, generation, data)
+            self._snapshots[name] = snapshot
+            return snapshot
+
+    def get(self, name):
+        """Return the latest snapshot for name, or None"""
+        with self._lock:
+            return self._snapshots.get(name)
+
+    def items(self):
+        """(name, snapshot) pairs for every published name"""
+        with self._lock:
+            return list(self._snapshots.items())
+
+    def encoded(self, snapshot, fmt, encoding, encoder):
+        """Return encoder(snapshot.data), computing it only once per generation"""
+        key = (snapshot.name, snapshot.generation, fmt, encoding)
+        with self._lock:
+            result = self._encoded.get(key)
+            if result is not None:
+                self._encoded.move_to_end(key)
+                return result
+
+        result = encoder(snapshot.data)
+
+        with self._lock:
+            self._encoded[key] = result
+            self._encoded.move_to_end(key)
+            while len(self._encoded) > self.max_encoded:
+                self._encoded.popitem(last=False)
+        return result
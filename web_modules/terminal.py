@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Terminal client for LSMD
+Renders system, process and disk views from the dashboard server's sampler
+over its local Unix socket, or collects them directly when no server runs:
+
+    python3 -m web_modules.terminal                  # live views, q quits
+    python3 -m web_modules.terminal --once processes
+    python3 -m web_modules.terminal --status         # main.sh header line
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import sys
+import time
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from web_modules.config import load_config, resolve_path
+
+DEFAULT_SOCKET = './logs/lsmd.sock'
+VIEWS = ('system', 'processes', 'disks')
+# Key -> process table sort, each one descending
+SORT_KEYS = {'c': 'cpu', 'm': 'memory', 'r': 'rss_bytes', 'p': 'pid'}
+SYSTEM_PREFIXES = ('cpu.', 'memory.', 'swap.', 'load.')
+# Without a server the first CPU readings need a moment to have something to compare with
+WARMUP = 0.25
+BAR_WIDTH = 30
+CONTENT_LENGTH = re.compile(rb'(?im)^content-length:\s*(\d+)')
+
+def build_view(sampler, tracker, limit=20, sort='cpu', timestamp=None):
+    """What the client renders, from the sampler's latest tick and the tracker's table"""
+    metrics = sampler.metrics
+    rates = sampler.rates or {}
+    mounts = {}
+    for name, value in metrics.items():
+        if name.startswith('disk.') and name.endswith('.percent') and not name.endswith('.free_percent'):
+            mounts[name[len('disk.'):-len('.percent')]] = value
+    try:
+        with open(os.path.join(tracker.proc_root, 'uptime')) as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        uptime = None
+    return {
+        'timestamp': timestamp or sampler.timestamp,
+        'interval': sampler.interval,
+        'detail': sampler.detail,
+        'hostname': socket.gethostname(),
+        'uptime': uptime,
+        'cpu_count': os.cpu_count(),
+        'system': {name: value for name, value in metrics.items() if name.startswith(SYSTEM_PREFIXES)},
+        'cpu': rates.get('cpu', {}).get('total'),
+        'mounts': mounts,
+        'disks': rates.get('disks', {}),
+        'network': rates.get('network', {}),
+        # Whatever the sampler read last, however sparse its process samples
+        # are; a procfs walk here would blow the terminal's per-refresh budget
+        'processes': tracker.table(0, limit, sort, max_age=float('inf'))
+    }
+
+class SocketSource:
+    """Views from a running dashboard server, one HTTP request over its Unix socket"""
+    
+    name = 'socket'
+    
+    def __init__(self, path, timeout=2.0):
+        self.path = path
+        self.timeout = timeout
+    
+    def get(self, target):
+        """(status, parsed JSON body) for one GET"""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            sock.sendall(f'GET {target} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.encode())
+            data = b''
+            length = None
+            # Stop at Content-Length rather than wait for the server to close
+            while length is None or len(data) < length:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+                if length is None and b'\r\n\r\n' in data:
+                    head, _, data = data.partition(b'\r\n\r\n')
+                    match = CONTENT_LENGTH.search(head)
+                    length = int(match.group(1)) if match else float('inf')
+        if length is None:
+            raise OSError(f'Incomplete response from {self.path}')
+        try:
+            status = int(head.split(None, 2)[1])
+        except (IndexError, ValueError):
+            raise OSError(f'Malformed response from {self.path}')
+        return status, json.loads(data) if data else {}
+    
+    def fetch(self, sort='cpu', limit=20):
+        status, data = self.get(f'/api/terminal?sort={sort}&limit={limit}')
+        if status != 200 or 'error' in data:
+            raise LookupError(data.get('error') or f'HTTP {status}')
+        return data
+
+class DirectSource:
+    """Views collected in this process, the way the server's sampler would"""
+    
+    name = 'direct'
+    
+    def __init__(self, proc_root='/proc'):
+        # Imported here so talking to a server never pays for importing psutil
+        from web_modules.process_tracker import ProcessTracker
+        from web_modules.rates import RateEngine
+        from web_modules.sampler import Sampler
+        
+        self.tracker = ProcessTracker(proc_root)
+        self.sampler = Sampler(process_tracker=self.tracker, rate_engine=RateEngine())
+        # Per-process io reads are what the process table can do without
+        self.sampler.detail = 'reduced'
+        self.sampler.tick()
+        self._ticked = time.monotonic()
+    
+    def fetch(self, sort='cpu', limit=20):
+        wait = WARMUP - (time.monotonic() - self._ticked)
+        if wait > 0:
+            time.sleep(wait)
+        self.sampler.tick()
+        self._ticked = time.monotonic()
+        return build_view(self.sampler, self.tracker, limit, sort)
+
+def socket_path(path=None):
+    """The socket named on the command line, by LSMD_SOCKET or by CLI_SOCKET in lsmd_config.sh"""
+    path = path or os.environ.get('LSMD_SOCKET') or load_config().get('CLI_SOCKET') or DEFAULT_SOCKET
+    return resolve_path(path)
+
+class Client:
+    """Fetches views from the server, falling back to direct collection while none answers"""
+    
+    def __init__(self, path=None, direct=False, proc_root='/proc'):
+        self.server = None if direct else SocketSource(socket_path(path))
+        self.proc_root = proc_root
+        self._direct = None
+        self.source = None
+        self.note = None
+    
+    def fetch(self, sort='cpu', limit=20):
+        if self.server is not None:
+            try:
+                view = self.server.fetch(sort, limit)
+                self.source = self.server.name
+                self.note = None
+                return view
+            except OSError as e:
+                # No server (or a stale socket file): collect here until one answers
+                self.note = f'no server at {self.server.path} ({e.strerror or e}), collecting directly'
+            except (LookupError, ValueError) as e:
+                self.note = f'server: {e}, collecting directly'
+        if self._direct is None:
+            self._direct = DirectSource(self.proc_root)
+        self.source = self._direct.name
+        return self._direct.fetch(sort, limit)
+
+# Rendering
+def human_bytes(value):
+    for unit in ('B', 'K', 'M', 'G', 'T'):
+        if abs(value) < 1024.0:
+            return f"{value:.0f}{unit}" if unit == 'B' else f"{value:.1f}{unit}"
+        value /= 1024.0
+    return f"{value:.1f}P"
+
+def format_uptime(seconds):
+    """'3 days, 2 hours, 5 minutes', as uptime -p prints it"""
+    if seconds is None:
+        return 'unknown'
+    minutes = int(seconds // 60)
+    parts = []
+    for unit, size in (('week', 10080), ('day', 1440), ('hour', 60), ('minute', 1)):
+        count, minutes = divmod(minutes, size)
+        if count:
+            parts.append(f"{count} {unit}{'s' if count != 1 else ''}")
+    return ', '.join(parts) or '0 minutes'
+
+def bar(percent, width=BAR_WIDTH):
+    filled = int(round(min(max(percent or 0.0, 0.0), 100.0) * width / 100))
+    return '[' + '#' * filled + '.' * (width - filled) + f'] {percent or 0.0:5.1f}%'
+
+def root_mount(view):
+    mounts = view.get('mounts') or {}
+    if '/' in mounts:
+        return mounts['/']
+    return max(mounts.values()) if mounts else None
+
+def render_status(view):
+    """One line: CPU, memory, root disk and uptime"""
+    system = view.get('system', {})
+    disk = root_mount(view)
+    return (f"🖥️ CPU: {system.get('cpu.percent', 0.0):.1f}% | "
+            f"🧠 Memory: {system.get('memory.percent', 0.0):.1f}% | "
+            f"💾 Disk: {f'{disk:.1f}%' if disk is not None else 'n/a'} | "
+            f"⏰ Uptime: {format_uptime(view.get('uptime'))}")
+
+def render_system(view):
+    system = view.get('system', {})
+    lines = [
+        f"{view.get('hostname', '')}  up {format_uptime(view.get('uptime'))}  "
+        f"{view.get('cpu_count') or '?'} CPUs  load {system.get('load.1', 0.0):.2f} {system.get('load.5', 0.0):.2f}",
+        '',
+        f"CPU     {bar(system.get('cpu.percent'))}",
+        f"Memory  {bar(system.get('memory.percent'))}  {human_bytes(system.get('memory.available_bytes', 0))} available",
+        f"Swap    {bar(system.get('swap.percent'))}",
+    ]
+    cpu = view.get('cpu')
+    if cpu:
+        lines.append('')
+        lines.append('        ' + '  '.join(f"{field} {cpu.get(field, 0.0):.1f}%"
+                                            for field in ('user', 'system', 'iowait', 'steal', 'idle')))
+    network = view.get('network') or {}
+    if network:
+        lines.append('')
+        lines.append(f"{'NIC':<16}{'RECV/s':>10}{'SENT/s':>10}")
+        for nic, rates in sorted(network.items()):
+            lines.append(f"{nic:<16}{human_bytes(rates.get('bytes_recv_per_sec', 0)):>10}"
+                         f"{human_bytes(rates.get('bytes_sent_per_sec', 0)):>10}")
+    return lines
+
+def render_processes(view):
+    table = view.get('processes') or {}
+    if 'error' in table:
+        return [f"Processes: {table['error']}"]
+    lines = [
+        f"{table.get('total', 0)} processes, by {table.get('sort', 'cpu')}",
+        '',
+        f"{'PID':>7} {'USER':<10} {'CPU%':>6} {'MEM%':>6} {'RSS':>8} {'STATUS':<11} NAME",
+    ]
+    for row in table.get('rows', []):
+        lines.append(f"{row['pid']:>7} {str(row['user'])[:10]:<10} {row['cpu']:>6.1f} {row['memory']:>6.1f} "
+                     f"{human_bytes(row['rss_bytes']):>8} {row['status']:<11} {row['name']}")
+    return lines
+
+def render_disks(view):
+    lines = [f"{'USED':<{BAR_WIDTH + 10}}MOUNT"]
+    for mount, percent in sorted((view.get('mounts') or {}).items()):
+        lines.append(f"{bar(percent)}  {mount}")
+    disks = view.get('disks') or {}
+    if disks:
+        lines.append('')
+        lines.append(f"{'DEVICE':<12}{'READ/s':>10}{'WRITE/s':>10}{'R IOPS':>9}{'W IOPS':>9}{'UTIL%':>7}{'AWAIT':>8}")
+        for device, rates in sorted(disks.items()):
+            lines.append(f"{device:<12}{human_bytes(rates.get('read_bytes_per_sec', 0)):>10}"
+                         f"{human_bytes(rates.get('write_bytes_per_sec', 0)):>10}"
+                         f"{rates.get('read_iops', 0):>9.0f}{rates.get('write_iops', 0):>9.0f}"
+                         f"{rates.get('util_percent', 0):>7.1f}{rates.get('await_ms', 0):>6.1f}ms")
+    elif view.get('timestamp'):
+        lines.append('')
+        lines.append('Disk IO rates appear after the second sample')
+    return lines
+
+RENDERERS = {'system': render_system, 'processes': render_processes, 'disks': render_disks}
+
+def run_interactive(client, view_name='system', interval=1.0, sort='cpu'):
+    """Full-screen live views until q is pressed"""
+    import curses
+    
+    def loop(screen):
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        screen.timeout(int(interval * 1000))
+        current, order = view_name, sort
+        while True:
+            height, width = screen.getmaxyx()
+            start = time.perf_counter()
+            try:
+                view = client.fetch(order, max(height - 6, 1))
+                lines = RENDERERS[current](view)
+                age = time.time() - view['timestamp'] if view.get('timestamp') else None
+            except Exception as e:
+                lines, age = [f"Error: {e}"], None
+            elapsed = (time.perf_counter() - start) * 1000
+            
+            tabs = '  '.join(f"[{i + 1}] {name}" if name != current else f"[{i + 1}] {name.upper()}"
+                             for i, name in enumerate(VIEWS))
+            status = f"{client.source} {elapsed:.1f} ms"
+            if age is not None:
+                status += f", sampled {age:.1f} s ago"
+            footer = client.note or 'q quit  tab next view  c/m/r/p sort processes'
+            screen.erase()
+            for row, line in enumerate([f"LSMD  {tabs}  {status}", ''] + lines):
+                if row >= height - 1:
+                    break
+                screen.addnstr(row, 0, line, width - 1)
+            screen.addnstr(height - 1, 0, footer, width - 1, curses.A_REVERSE)
+            screen.refresh()
+            
+            key = screen.getch()
+            if key in (ord('q'), ord('Q'), 27):
+                return
+            if key == ord('\t'):
+                current = VIEWS[(VIEWS.index(current) + 1) % len(VIEWS)]
+            elif ord('1') <= key < ord('1') + len(VIEWS):
+                current = VIEWS[key - ord('1')]
+            elif 0 <= key < 256 and chr(key) in SORT_KEYS:
+                order = SORT_KEYS[chr(key)]
+                current = 'processes'
+    
+    curses.wrapper(loop)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='LSMD terminal client')
+    parser.add_argument('--socket', help=f'dashboard server socket (default CLI_SOCKET, {DEFAULT_SOCKET})')
+    parser.add_argument('--direct', action='store_true', help='collect here instead of asking a server')
+    parser.add_argument('--view', choices=VIEWS, default='system')
+    parser.add_argument('--once', nargs='?', const='all', choices=VIEWS + ('all',), metavar='VIEW',
+                        help='print one view (or all of them) and exit')
+    parser.add_argument('--status', action='store_true', help='print the one-line status and exit')
+    parser.add_argument('--interval', type=float, default=1.0, help='refresh interval, seconds')
+    parser.add_argument('--sort', choices=sorted(set(SORT_KEYS.values())), default='cpu')
+    parser.add_argument('--limit', type=int, default=20, help='processes listed by --once')
+    args = parser.parse_args(argv)
+    
+    client = Client(args.socket, args.direct)
+    if args.status or args.once:
+        start = time.perf_counter()
+        try:
+            view = client.fetch(args.sort, args.limit)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        if args.status:
+            print(render_status(view))
+            return 0
+        for name in (VIEWS if args.once == 'all' else (args.once,)):
+            print('\n'.join(RENDERERS[name](view)))
+            print()
+        print(f"({client.source}, {(time.perf_counter() - start) * 1000:.1f} ms{'; ' + client.note if client.note else ''})")
+        return 0
+    
+    if not sys.stdout.isatty():
+        parser.error('live views need a terminal; use --once or --status')
+    try:
+        run_interactive(client, args.view, max(args.interval, 0.1), args.sort)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
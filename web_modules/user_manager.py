@@ -8,11 +8,40 @@ import pwd
 import grp
 
 class UserManager:
+    def __init__(self, passwd_file=None, group_file=None):
+        # Alternate passwd/group files, e.g. a synthetic host fixture
+        self.passwd_file = passwd_file
+        self.group_file = group_file
+    
+    def _passwd_entries(self):
+        if not self.passwd_file:
+            return pwd.getpwall()
+        entries = []
+        with open(self.passwd_file) as f:
+            for line in f:
+                parts = line.rstrip('\n').split(':')
+                if len(parts) >= 7 and parts[2].isdigit() and parts[3].isdigit():
+                    entries.append(pwd.struct_passwd((parts[0], parts[1], int(parts[2]), int(parts[3]),
+                                                      parts[4], parts[5], parts[6])))
+        return entries
+    
+    def _group_entries(self):
+        if not self.group_file:
+            return grp.getgrall()
+        entries = []
+        with open(self.group_file) as f:
+            for line in f:
+                parts = line.rstrip('\n').split(':')
+                if len(parts) >= 4 and parts[2].isdigit():
+                    members = parts[3].split(',') if parts[3] else []
+                    entries.append(grp.struct_group((parts[0], parts[1], int(parts[2]), members)))
+        return entries
+    
     def list_users(self):
         """List all system users"""
         try:
             users = []
-            for user in pwd.getpwall():
+            for user in self._passwd_entries():
                 if user.pw_uid >= 1000:  # Typically regular users
                     users.append({
                         'username': user.pw_name,
@@ -30,7 +59,7 @@ class UserManager:
         """Get groups for a specific user"""
         try:
             groups = []
-            for group in grp.getgrall():
+            for group in self._group_entries():
                 if username in group.gr_mem:
                     groups.append(group.gr_name)
             return groups
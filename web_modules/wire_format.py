@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Wire format negotiation and encoding for the web dashboard API
+"""
+
+import gzip
+import json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_MIMETYPE = 'application/json'
+COLUMNAR_MIMETYPE = 'application/vnd.lsmd.columnar+json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+FORMAT_MIMETYPES = {
+    'json': JSON_MIMETYPE,
+    'columnar': COLUMNAR_MIMETYPE,
+    'msgpack': MSGPACK_MIMETYPE,
+}
+
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_SIZE = 1024
+
+def available_formats():
+    """Formats that can be produced with the installed packages"""
+    formats = ['json', 'columnar']
+    if msgpack is not None:
+        formats.append('msgpack')
+    return formats
+
+def negotiate_format(accept_mimetypes, requested=None):
+    """Pick a wire format from a ?format= override or the Accept header"""
+    formats = available_formats()
+    if requested in formats:
+        return requested
+
+    # JSON first so that */* and missing Accept headers keep the old behaviour
+    offered = [FORMAT_MIMETYPES[fmt] for fmt in formats]
+    best = accept_mimetypes.best_match(offered, default=JSON_MIMETYPE)
+    for fmt, mimetype in FORMAT_MIMETYPES.items():
+        if mimetype == best:
+            return fmt
+    return 'json'
+
+def negotiate_encoding(accept_encodings):
+    """Pick a content encoding from the Accept-Encoding header"""
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+def to_columnar(data):
+    """Turn lists of dicts into one array per field, recursing through dicts"""
+    if isinstance(data, dict):
+        return {key: to_columnar(value) for key, value in data.items()}
+
+    if isinstance(data, list) and data and all(isinstance(row, dict) for row in data):
+        fields = []
+        seen = set()
+        for row in data:
+            for key in row:
+                if key not in seen:
+                    seen.add(key)
+                    fields.append(key)
+        return {
+            '__count__': len(data),
+            '__columns__': {field: [row.get(field) for row in data] for field in fields}
+        }
+
+    return data
+
+def encode(data, fmt):
+    """Serialize data in the given wire format"""
+    if fmt == 'msgpack':
+        return msgpack.packb(to_columnar(data), use_bin_type=True, default=str)
+    if fmt == 'columnar':
+        data = to_columnar(data)
+    return json.dumps(data, separators=(',', ':'), default=str).encode('utf-8')
+
+def compress(body, encoding):
+    """Compress an encoded body; returns (body, encoding actually applied)"""
+    if encoding is None or len(body) < COMPRESS_MIN_SIZE:
+        return body, None
+    if encoding == 'br':
+        return brotli.compress(body, quality=5), 'br'
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6), 'gzip'
+    return body, None